@@ -0,0 +1,50 @@
+"""
+Benchmark: one groupby per table vs the single-pass grouping-sets engine.
+
+Command: python -m benchmarks.bench_aggregates --rows 1000000
+
+Builds a synthetic dataset with generate_data.py's vectorized generator,
+cleans it once, then times compute_tables_groupby() (the original Section
+3/4 code) against compute_tables() and checks the tables are identical.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from generate_data import generate_chunk
+from retail_sales.aggregates import assert_tables_equal, compute_tables, compute_tables_groupby
+from retail_sales.cleaning import clean
+
+
+def best_of(fn, arg, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(arg)
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print(f"{'Rows':>12} {'per-groupby (s)':>16} {'single-pass (s)':>16} {'speedup':>8}")
+    print("-" * 56)
+    for n_rows in args.rows:
+        raw = generate_chunk(np.random.default_rng(args.seed), n_rows).to_frame()
+        df_clean, _, _ = clean(raw)
+
+        t_ref, ref = best_of(compute_tables_groupby, df_clean, args.repeat)
+        t_new, new = best_of(compute_tables, df_clean, args.repeat)
+        assert_tables_equal(ref, new)
+
+        print(f"{n_rows:>12,} {t_ref:>16.3f} {t_new:>16.3f} {t_ref / t_new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
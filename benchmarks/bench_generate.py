@@ -0,0 +1,61 @@
+"""
+Benchmark: partitioned data generation throughput by worker count.
+
+Command: python -m benchmarks.bench_generate --rows 10000000 --partitions 32 --workers 1 2 4 8 16 32
+
+Writes the same partitioned dataset (generate_data.write_partitioned, fixed
+seed and partition count) once per worker count into a scratch directory,
+reports rows/s and the speedup over one worker, and checks that every run
+produced byte-identical files.
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+import generate_data
+
+
+def digest(out_dir):
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(out_dir)):
+        with open(os.path.join(out_dir, name), 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--partitions', type=int, default=max(cpus, 8))
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1))))
+    parser.add_argument('--chunk-size', type=int, default=generate_data.DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print(f"{cpus} CPUs, {args.rows:,} rows in {args.partitions} partitions")
+    print(f"{'Workers':>8} {'time (s)':>10} {'rows/s':>12} {'speedup':>8}")
+    print("-" * 42)
+    first = base = None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory(prefix='bench_gen_') as out_dir:
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_data.write_partitioned(out_dir, args.rows, args.partitions, workers,
+                                                args.chunk_size, args.seed)
+            wall = time.perf_counter() - t0
+            files = digest(out_dir)
+        first = first or files
+        assert files == first, f"{workers} workers wrote different files"
+        base = base or wall
+        print(f"{workers:>8} {wall:>10.2f} {args.rows / wall:>12,.0f} {base / wall:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
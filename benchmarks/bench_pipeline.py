@@ -0,0 +1,177 @@
+"""
+Benchmark: every pipeline stage at scaled row counts, against a stored baseline.
+
+Command: python -m benchmarks.bench_pipeline --rows 10000 1000000 10000000 50000000
+
+Each dataset is drawn with generate_data.py's vectorized generator (same
+product, city, channel and segment distributions as the real data) and kept
+in benchmarks/data/ for the next run. Every row count then runs in its own
+process - peak RSS is a per-process high-water mark - which times the
+pipeline stages with the profiler from retail_sales.profiling:
+
+    load        CSV read + schema validation (step 1.1)
+    clean       Section 2 (steps 2.1 - 2.3)
+    aggregates  Section 3/4 KPIs and tables
+    pareto      Pareto cutoff over the product table
+    charts      Section 5 (all six charts)
+    export      Section 7 Excel report + clean CSV
+
+and reports rows/s and peak RSS per stage. Results are compared with
+benchmarks/baseline.json (``--save-baseline`` rewrites it); a stage more than
+``--tolerance`` (and ``--min-time`` seconds) slower than its baseline is
+flagged as a regression.
+
+The Clean_Data sheet is linked rather than written by default
+(``--clean-data sheet`` to include it): at ~2k rows/s, writing 10M rows to
+xlsx would dominate every other number in the table.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+import generate_data
+from retail_sales import profiling
+from retail_sales.aggregates import pareto_cutoff
+from retail_sales.pipeline import Run, run_stages
+
+DATA_DIR      = os.path.join(os.path.dirname(__file__), 'data')
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_ROWS  = [10_000, 1_000_000, 10_000_000, 50_000_000]
+
+# benchmark stage → profiler rows summed into it
+STAGE_STEPS = {
+    'load':       ['1.1 load'],
+    'clean':      ['stage clean'],
+    'aggregates': ['stage kpis', 'stage aggregates'],
+    'pareto':     ['4.6 pareto'],
+    'charts':     ['stage charts'],
+    'export':     ['stage export'],
+}
+
+
+def dataset(n_rows, seed):
+    """Path of the generated CSV for ``n_rows``, creating it on first use."""
+    path = os.path.join(DATA_DIR, f"sales_{n_rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f"Generating {n_rows:,} rows → {path}")
+        generate_data.write_vectorized(path + '.tmp', n_rows, seed=seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def measure(csv_path, clean_data, chart_workers):
+    """Run every stage on ``csv_path`` in a scratch directory; returns {stage: metrics}."""
+    csv_path = os.path.abspath(csv_path)
+    profiler = profiling.Profiler()
+    with tempfile.TemporaryDirectory(prefix='bench_') as work:
+        os.chdir(work)                   # outputs/ and charts/ land in the scratch dir
+        os.makedirs('outputs')
+        run = Run(raw_path=csv_path, use_cache=False, clean_data=clean_data,
+                  chart_workers=chart_workers)
+        profiling.activate(profiler)
+        try:
+            run_stages(run, ['kpis', 'aggregates'])
+            pareto_cutoff(run.tables['product_analysis'], run.kpis['total_revenue'])
+            run_stages(run, ['charts', 'export'])
+        finally:
+            profiling.activate(None)
+
+    steps = profiler.table().set_index('step')
+    rows = int(steps.loc['1.1 load', 'rows'])
+    results = {}
+    for stage, names in STAGE_STEPS.items():
+        wall = float(steps.loc[names, 'wall_s'].sum())
+        results[stage] = {
+            'wall_s':      round(wall, 4),
+            'rows_per_s':  round(rows / wall) if wall else None,
+            'peak_rss_mb': round(float(steps.loc[names, 'peak_rss_mb'].max()), 1),
+        }
+    return rows, results
+
+
+def run_scale(n_rows, args):
+    """Measure one row count in a fresh interpreter, so peak RSS starts from zero."""
+    csv_path = dataset(n_rows, args.seed)
+    cmd = [sys.executable, '-m', 'benchmarks.bench_pipeline', '--worker', csv_path,
+           '--clean-data', args.clean_data]
+    if args.chart_workers:
+        cmd += ['--chart-workers', str(args.chart_workers)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'machine': None, 'results': {}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--clean-data', choices=['sheet', 'link', 'none'], default='link',
+                        help="how the Excel export handles row-level data (default: %(default)s)")
+    parser.add_argument('--chart-workers', type=int, default=None)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="slowdown vs baseline reported as a regression (default: %(default)s)")
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many seconds (timer noise)")
+    parser.add_argument('--worker', metavar='CSV', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        rows, results = measure(args.worker, args.clean_data, args.chart_workers)
+        print(json.dumps({'rows': rows, 'stages': results}))
+        return
+
+    baseline = load_baseline(args.baseline)
+    machine = {'platform': platform.platform(), 'python': platform.python_version(),
+               'cpus': os.cpu_count()}
+    if baseline['machine'] and baseline['machine'] != machine:
+        print(f"note: baseline was recorded on {baseline['machine']}")
+
+    print(f"{'Rows':>12} {'Stage':<11} {'Time (s)':>9} {'Rows/s':>12} {'Peak RSS':>10} {'vs base':>8}")
+    print("-" * 67)
+    measured, regressions = {}, []
+    for n_rows in args.rows:
+        stages = run_scale(n_rows, args)['stages']
+        measured[str(n_rows)] = stages
+        base = baseline['results'].get(str(n_rows), {})
+        for stage, m in stages.items():
+            ratio = ''
+            if stage in base and base[stage]['wall_s']:
+                change = m['wall_s'] / base[stage]['wall_s']
+                ratio = f"{change:.2f}x"
+                if change > 1 + args.tolerance and m['wall_s'] - base[stage]['wall_s'] > args.min_time:
+                    ratio += ' !'
+                    regressions.append((n_rows, stage, change))
+            rate = f"{m['rows_per_s']:,}" if m['rows_per_s'] else '-'
+            print(f"{n_rows:>12,} {stage:<11} {m['wall_s']:>9.3f} {rate:>12} "
+                  f"{m['peak_rss_mb']:>8,.0f}MB {ratio:>8}")
+
+    if args.save_baseline:
+        baseline = {'machine': machine, 'results': {**baseline['results'], **measured}}
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=1)
+        print(f"\nBaseline saved: {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.tolerance:.0%}:")
+        for n_rows, stage, change in regressions:
+            print(f"   {n_rows:,} rows, {stage}: {change:.2f}x")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
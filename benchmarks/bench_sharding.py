@@ -0,0 +1,68 @@
+"""
+Benchmark: single-core Sections 2-4 vs hash-sharded cleaning + aggregation.
+
+Command: python -m benchmarks.bench_sharding --rows 10000000 --workers 1 2 4 8 16 32
+
+Builds a synthetic typed frame with generate_data.py's vectorized generator,
+then times cleaning.clean() + partial_aggregates() + finalize_tables() on
+one core against sharding.clean_and_aggregate() + finalize_tables() on each
+worker count. The sharded time includes packing the columns into shared
+memory and rebuilding df_clean. The tables are checked against the
+single-core ones every time.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from generate_data import generate_chunk
+from retail_sales.aggregates import assert_tables_equal, finalize_tables, partial_aggregates
+from retail_sales.cleaning import clean
+from retail_sales.sharding import clean_and_aggregate
+
+
+def single_core(df):
+    df_clean, _, _ = clean(df)
+    return finalize_tables(partial_aggregates(df_clean))
+
+
+def sharded(df, workers):
+    return finalize_tables(clean_and_aggregate(df, workers).partials)
+
+
+def best_of(fn, args, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1))))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'Rows':>12} {'Workers':>8} {'time (s)':>10} {'rows/s':>12} {'speedup':>8}")
+    print("-" * 54)
+    for n_rows in args.rows:
+        df = generate_chunk(np.random.default_rng(args.seed), n_rows).to_frame()
+
+        t_ref, ref = best_of(single_core, (df,), args.repeat)
+        print(f"{n_rows:>12,} {'1 core':>8} {t_ref:>10.3f} {n_rows / t_ref:>12,.0f} {1:>7.1f}x")
+        for workers in args.workers:
+            t_new, new = best_of(sharded, (df, workers), args.repeat)
+            assert_tables_equal(ref, new)
+            print(f"{n_rows:>12,} {workers:>8} {t_new:>10.3f} {n_rows / t_new:>12,.0f} {t_ref / t_new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
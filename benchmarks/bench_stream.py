@@ -0,0 +1,73 @@
+"""
+Benchmark: serial --stream vs the pipelined stream (reading, cleaning and writing overlapped).
+
+Command: python -m benchmarks.bench_stream --rows 10000000 --chunksize 250000
+
+Streams the generated CSV for each row count (benchmarks/data/, shared with
+bench_pipeline) through stream_tables() with the clean CSV written, once
+serially and once with ``pipeline=True``. Besides the end-to-end time it
+prints the time spent in each stage (read, clean + aggregate, write) from
+the profiler: serially the run takes their sum, pipelined it should get
+close to the slowest of them.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import dataset
+from retail_sales import profiling
+from retail_sales.streaming import PIPELINE_DEPTH, stream_tables
+
+# stage → profiler steps summed into it
+STAGES = {
+    'read':  ['1.1 load'],
+    'clean': ['1.2 quality profile', '2.1 date parsing', '2.2 null fills', '2.3 derived columns',
+              '4.1 base cuboid', '4.1 daily totals', '4.1 store cuboid', '4.3 merge partials'],
+    'write': ['7 clean csv'],
+}
+
+
+def measure(csv_path, chunksize, pipeline, depth):
+    profiler = profiling.Profiler()
+    with tempfile.TemporaryDirectory(prefix='bench_') as work:
+        profiling.activate(profiler)
+        try:
+            t0 = time.perf_counter()
+            stream_tables(csv_path, chunksize, clean_csv_path=os.path.join(work, 'clean.csv'),
+                          pipeline=pipeline, depth=depth)
+            wall = time.perf_counter() - t0
+        finally:
+            profiling.activate(None)
+    steps = profiler.table().set_index('step')['wall_s']
+    rollups = steps[steps.index.str.startswith('4.2 rollup')].sum()
+    stages = {name: float(steps.reindex(names).sum()) for name, names in STAGES.items()}
+    stages['clean'] += float(rollups)
+    return wall, stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--chunksize', type=int, default=250_000)
+    parser.add_argument('--depth', type=int, default=PIPELINE_DEPTH)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} CPUs, {args.chunksize:,} rows per chunk, queue depth {args.depth}")
+    print(f"{'Rows':>12} {'mode':>10} {'read':>8} {'clean':>8} {'write':>8} "
+          f"{'sum':>8} {'wall (s)':>9} {'speedup':>8}")
+    print("-" * 80)
+    for n_rows in args.rows:
+        csv_path = dataset(n_rows, args.seed)
+        serial = None
+        for mode, pipeline in (('serial', False), ('pipelined', True)):
+            wall, stages = measure(csv_path, args.chunksize, pipeline, args.depth)
+            serial = serial or wall
+            print(f"{n_rows:>12,} {mode:>10} {stages['read']:>8.2f} {stages['clean']:>8.2f} "
+                  f"{stages['write']:>8.2f} {sum(stages.values()):>8.2f} {wall:>9.2f} "
+                  f"{serial / wall:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
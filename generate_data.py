@@ -1,15 +1,44 @@
 """
 Run this FIRST to generate your dataset.
 Command: python generate_data.py
+
+Options:
+  --rows N          number of orders to generate (default 5,500)
+  --vectorized      draw every column as a NumPy array, in fixed-size chunks
+  --chunk-size N    rows per chunk in vectorized mode (default 1,000,000)
+  --seed N          random seed (default 42)
+  --partitions N    vectorized, split into N files generated in parallel
+  --workers N       processes for --partitions (default: one per CPU)
+  --output PATH     CSV destination (default data/retail_sales_raw.csv), or
+                    with --partitions a directory (default data/retail_sales_parts/)
+
+The default (row-by-row) mode reproduces the original 5,500-row dataset
+exactly. Use --vectorized for load-test datasets of millions of rows: memory
+stays flat because each chunk is appended to the CSV before the next is drawn.
+
+--partitions spreads a vectorized run over a process pool. Partition i gets
+its own generator, seeded from child i of ``np.random.SeedSequence(seed)``
+(independent streams, no shared state), and its own order_id range. It writes
+part-0000i.csv in the output directory, which sales_analysis.py --input reads
+as partitioned input. Each partition's rows depend only on the seed, the
+partition count and the chunk size, not on the number of workers or the
+order they finish in. So the same settings always give byte-identical
+files, and throughput grows with the cores available.
+
+Both modes write orders into a retail_sales.records.OrderBuffer (typed
+column arrays with integer label codes) instead of a list of dicts, and
+``generate_orders`` keeps every order in one buffer for in-memory use.
 """
 import pandas as pd
 import numpy as np
 import random
 import os
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
-random.seed(42)
-np.random.seed(42)
+from retail_sales.records import MISSING, Catalog, OrderBuffer
 
 products = [
     ("P001","Laptop Pro 15","Electronics",75000,0.15),
@@ -49,63 +78,288 @@ payment_methods = ["Credit Card","Debit Card","UPI","Net Banking","Cash on Deliv
 channels        = ["Online","In-Store","Mobile App"]
 segments        = ["Consumer","Corporate","Home Office"]
 
-rows = []
-order_id   = 1000
-start_date = datetime(2023, 1, 1)
-end_date   = datetime(2024, 12, 31)
-date_range = (end_date - start_date).days
-
-for _ in range(5500):
-    city_data  = random.choices(cities,    weights=[c[2]  for c in cities])[0]
-    prod_w     = [3,3,2,2,2,2,2,2,1,2,1,1,1,1,1,1,1,1,1,2]
-    prod_data  = random.choices(products,  weights=prod_w)[0]
-
-    order_date = start_date + timedelta(days=random.randint(0, date_range))
-    month      = order_date.month
-    qty_max    = 5 if month in [10,11,12] else (3 if month in [6,7,8] else 4)
-    quantity   = random.randint(1, qty_max)
-    base_price = prod_data[4]
-
-    disc_pct   = round(random.uniform(0, prod_data[4]) * random.choice([0,0,0,1]), 2)
-    disc_amt   = round(base_price * disc_pct, 2)
-    sale_price = round(base_price - disc_amt, 2)
-    revenue    = round(sale_price * quantity, 2)
-
-    if random.random() < 0.03: disc_pct = None
-    city_val   = city_data[0] if random.random() > 0.02 else None
-
-    rows.append({
-        "order_id":          f"ORD-{order_id}",
-        "order_date":        order_date.strftime("%Y-%m-%d"),
-        "product_id":        prod_data[0],
-        "product_name":      prod_data[1],
-        "category":          prod_data[2],
-        "city":              city_val,
-        "state":             city_data[1] if city_val else None,
-        "customer_segment":  random.choices(segments,        weights=[50,30,20])[0],
-        "quantity":          quantity,
-        "unit_price":        base_price,
-        "discount_pct":      disc_pct,
-        "discount_amt":      disc_amt,
-        "sale_price":        sale_price,
-        "revenue":           revenue,
-        "payment_method":    random.choices(payment_methods, weights=[25,20,30,15,10])[0],
-        "channel":           random.choices(channels,        weights=[50,30,20])[0],
-        "is_returned":       1 if random.random() < 0.05 else 0,
-    })
-    order_id += 1
-
-df = pd.DataFrame(rows)
-os.makedirs('data', exist_ok=True)
-df.to_csv('data/retail_sales_raw.csv', index=False)
-
-print("=" * 50)
-print("  DATA GENERATED SUCCESSFULLY!")
-print("=" * 50)
-print(f"  Rows:       {len(df):,}")
-print(f"  Columns:    {len(df.columns)}")
-print(f"  Date Range: {df['order_date'].min()} → {df['order_date'].max()}")
-print(f"  Saved to:   data/retail_sales_raw.csv")
-print("=" * 50)
-print("  Now run: python sales_analysis.py")
-print("=" * 50)
+# Sampling weights, shared by both generation modes
+prod_w          = [3,3,2,2,2,2,2,2,1,2,1,1,1,1,1,1,1,1,1,2]
+city_w          = [c[2] for c in cities]
+segment_w       = [50,30,20]
+payment_w       = [25,20,30,15,10]
+channel_w       = [50,30,20]
+
+CATALOG = Catalog([p[:3] for p in products], [c[:2] for c in cities],
+                  segments, payment_methods, channels)
+
+COLUMNS = [
+    "order_id", "order_date", "product_id", "product_name", "category",
+    "city", "state", "customer_segment", "quantity", "unit_price",
+    "discount_pct", "discount_amt", "sale_price", "revenue",
+    "payment_method", "channel", "is_returned",
+]
+
+FIRST_ORDER_ID = 1000
+start_date     = datetime(2023, 1, 1)
+end_date       = datetime(2024, 12, 31)
+date_range     = (end_date - start_date).days
+
+DEFAULT_ROWS       = 5500
+DEFAULT_CHUNK_SIZE = 1_000_000
+DEFAULT_OUTPUT     = 'data/retail_sales_raw.csv'
+DEFAULT_PARTS_DIR  = 'data/retail_sales_parts/'
+
+
+# ══════════════════════════════════════════════════════════════════
+# ROW-BY-ROW MODE (original generator, reproduces the committed dataset)
+# ══════════════════════════════════════════════════════════════════
+def generate_rows(n_rows=DEFAULT_ROWS, seed=42):
+    random.seed(seed)
+    np.random.seed(seed)
+
+    buffer = OrderBuffer(CATALOG, capacity=n_rows)
+    order_id = FIRST_ORDER_ID
+
+    # Draws are made by position, in the same order as the original
+    # dict-per-row code, so the random streams (and the data) are unchanged
+    for _ in range(n_rows):
+        city_code  = random.choices(range(len(cities)),   weights=city_w)[0]
+        prod_code  = random.choices(range(len(products)), weights=prod_w)[0]
+        prod_data  = products[prod_code]
+
+        order_date = start_date + timedelta(days=random.randint(0, date_range))
+        month      = order_date.month
+        qty_max    = 5 if month in [10,11,12] else (3 if month in [6,7,8] else 4)
+        quantity   = random.randint(1, qty_max)
+        base_price = prod_data[4]
+
+        disc_pct   = round(random.uniform(0, prod_data[4]) * random.choice([0,0,0,1]), 2)
+        disc_amt   = round(base_price * disc_pct, 2)
+        sale_price = round(base_price - disc_amt, 2)
+        revenue    = round(sale_price * quantity, 2)
+
+        if random.random() < 0.03: disc_pct = None
+        if random.random() <= 0.02: city_code = MISSING
+
+        buffer.append(
+            order_no       = order_id,
+            order_date     = order_date,
+            product        = prod_code,
+            city           = city_code,
+            segment        = random.choices(range(len(segments)),        weights=segment_w)[0],
+            quantity       = quantity,
+            unit_price     = base_price,
+            discount_pct   = disc_pct,
+            discount_amt   = disc_amt,
+            sale_price     = sale_price,
+            revenue        = revenue,
+            payment_method = random.choices(range(len(payment_methods)), weights=payment_w)[0],
+            channel        = random.choices(range(len(channels)),        weights=channel_w)[0],
+            is_returned    = 1 if random.random() < 0.05 else 0,
+        )
+        order_id += 1
+
+    return buffer.to_frame()
+
+
+# ══════════════════════════════════════════════════════════════════
+# VECTORIZED MODE (whole-column NumPy draws, one chunk at a time)
+# ══════════════════════════════════════════════════════════════════
+def _probs(weights):
+    w = np.asarray(weights, dtype=float)
+    return w / w.sum()
+
+
+_PROD_PRICE = np.array([p[4] for p in products])   # same price column as generate_rows()
+
+# Max quantity per calendar month (index 0 unused): festive Q4 → 5, summer → 3
+_QTY_MAX = np.array([0, 4, 4, 4, 4, 4, 3, 3, 3, 4, 5, 5, 5])
+
+
+def generate_chunk(rng, n_rows, first_order_id=FIRST_ORDER_ID, buffer=None):
+    """Draw ``n_rows`` orders as whole arrays into ``buffer`` (a new one if None).
+
+    Returns the buffer; ``buffer.to_frame()`` gives the orders as a DataFrame.
+    """
+    if buffer is None:
+        buffer = OrderBuffer(CATALOG, capacity=n_rows)
+    city_idx = rng.choice(len(cities),   size=n_rows, p=_probs(city_w))
+    prod_idx = rng.choice(len(products), size=n_rows, p=_probs(prod_w))
+
+    order_date = (np.datetime64(start_date.date(), 'D')
+                  + rng.integers(0, date_range + 1, size=n_rows))
+    month      = order_date.astype('datetime64[M]').astype(int) % 12 + 1
+    quantity   = rng.integers(1, _QTY_MAX[month] + 1)
+    base_price = _PROD_PRICE[prod_idx]
+
+    # One order in four gets a discount, drawn uniformly up to the product cap
+    disc_on    = rng.integers(0, 4, size=n_rows) == 3
+    disc_pct   = np.round(rng.uniform(0, 1, size=n_rows) * base_price * disc_on, 2)
+    disc_amt   = np.round(base_price * disc_pct, 2)
+    sale_price = np.round(base_price - disc_amt, 2)
+    revenue    = np.round(sale_price * quantity, 2)
+
+    disc_pct   = np.where(rng.random(n_rows) < 0.03, np.nan, disc_pct)
+    city_code  = np.where(rng.random(n_rows) <= 0.02, MISSING, city_idx)
+
+    buffer.extend(
+        order_no       = np.arange(first_order_id, first_order_id + n_rows),
+        order_date     = order_date,
+        product        = prod_idx,
+        city           = city_code,
+        segment        = rng.choice(len(segments), size=n_rows, p=_probs(segment_w)),
+        quantity       = quantity,
+        unit_price     = base_price,
+        discount_pct   = disc_pct,
+        discount_amt   = disc_amt,
+        sale_price     = sale_price,
+        revenue        = revenue,
+        payment_method = rng.choice(len(payment_methods), size=n_rows, p=_probs(payment_w)),
+        channel        = rng.choice(len(channels), size=n_rows, p=_probs(channel_w)),
+        is_returned    = rng.random(n_rows) < 0.05,
+    )
+    return buffer
+
+
+def generate_orders(n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """Every order of a vectorized run held in memory, as one OrderBuffer.
+
+    Same rows as ``write_vectorized`` with the same seed and chunk size, at
+    about 50 bytes per order.
+    """
+    rng = np.random.default_rng(seed)
+    buffer = OrderBuffer(CATALOG, capacity=n_rows)
+    while len(buffer) < n_rows:
+        generate_chunk(rng, min(chunk_size, n_rows - len(buffer)),
+                       FIRST_ORDER_ID + len(buffer), buffer)
+    return buffer
+
+
+def _write_chunks(path, rng, n_rows, first_order_id, chunk_size, progress=True):
+    """Draw ``n_rows`` orders from ``rng`` chunk by chunk and write them to ``path``."""
+    buffer = OrderBuffer(CATALOG, capacity=min(chunk_size, n_rows))
+    written, min_date, max_date = 0, None, None
+
+    while written < n_rows:
+        n = min(chunk_size, n_rows - written)
+        buffer.clear()                       # the arrays are reused for every chunk
+        chunk = generate_chunk(rng, n, first_order_id + written, buffer).to_frame()
+        chunk.to_csv(path, index=False, mode='w' if written == 0 else 'a',
+                     header=(written == 0))
+
+        lo, hi = chunk['order_date'].min(), chunk['order_date'].max()
+        min_date = lo if min_date is None else min(min_date, lo)
+        max_date = hi if max_date is None else max(max_date, hi)
+        written += n
+        if progress:
+            print(f"  ... {written:,} / {n_rows:,} rows written")
+
+    return written, min_date.date(), max_date.date()
+
+
+def write_vectorized(path, n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """Stream ``n_rows`` orders to ``path`` in chunks; returns (rows, min_date, max_date)."""
+    return _write_chunks(path, np.random.default_rng(seed), n_rows, FIRST_ORDER_ID, chunk_size)
+
+
+# ══════════════════════════════════════════════════════════════════
+# PARTITIONED MODE (vectorized partitions on a process pool)
+# ══════════════════════════════════════════════════════════════════
+def partition_sizes(n_rows, partitions):
+    """Rows per partition: as even as possible, the first ones one row larger."""
+    base, extra = divmod(n_rows, partitions)
+    return [base + (i < extra) for i in range(partitions)]
+
+
+def _write_partition(path, seed_seq, n_rows, first_order_id, chunk_size):
+    return _write_chunks(path, np.random.default_rng(seed_seq), n_rows, first_order_id,
+                         chunk_size, progress=False)
+
+
+def write_partitioned(out_dir, n_rows, partitions, workers=None,
+                      chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """Write ``n_rows`` orders as ``partitions`` CSVs in ``out_dir``, generated in parallel.
+
+    Partition i draws from ``SeedSequence(seed).spawn(partitions)[i]`` and
+    numbers its orders from where partition i-1 stops. part-*.csv files
+    left in ``out_dir`` by an earlier run are removed first, so they are not
+    read together with the new ones. Returns (rows, min_date, max_date).
+    """
+    if not 0 < partitions <= n_rows:
+        raise ValueError(f"--partitions must be between 1 and the row count ({n_rows:,})")
+    os.makedirs(out_dir, exist_ok=True)
+    for old in glob.glob(os.path.join(out_dir, 'part-*.csv')):
+        os.remove(old)
+
+    sizes  = partition_sizes(n_rows, partitions)
+    firsts = FIRST_ORDER_ID + np.concatenate([[0], np.cumsum(sizes[:-1])])
+    jobs = [(os.path.join(out_dir, f"part-{i:05d}.csv"), seq, size, int(first), chunk_size)
+            for i, (seq, size, first) in enumerate(zip(np.random.SeedSequence(seed).spawn(partitions),
+                                                       sizes, firsts))]
+
+    workers = min(workers or os.cpu_count() or 1, partitions)
+    if workers == 1:
+        results = [_write_partition(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_write_partition, *zip(*jobs)))
+    print(f"  ... {partitions:,} partitions written by {workers} worker(s)")
+
+    return (sum(r[0] for r in results), min(r[1] for r in results), max(r[2] for r in results))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the synthetic retail sales dataset.")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help="number of orders to generate (default: %(default)s)")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="use the chunked NumPy generator (for large row counts)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per chunk in vectorized mode (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="random seed (default: %(default)s)")
+    parser.add_argument('--partitions', type=int, default=None,
+                        help="vectorized: write N partition files in parallel, each from its own seed stream")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes for --partitions (default: one per CPU)")
+    parser.add_argument('--output', default=None,
+                        help=f"CSV destination (default: {DEFAULT_OUTPUT}), or the directory "
+                             f"for --partitions (default: {DEFAULT_PARTS_DIR})")
+    args = parser.parse_args(argv)
+    if args.rows < 1:
+        parser.error("--rows must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.partitions is not None and not 0 < args.partitions <= args.rows:
+        parser.error(f"--partitions must be between 1 and --rows ({args.rows:,})")
+    if args.output is None:
+        args.output = DEFAULT_PARTS_DIR if args.partitions else DEFAULT_OUTPUT
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+
+    if args.partitions:
+        n_rows, min_date, max_date = write_partitioned(
+            args.output, args.rows, args.partitions, args.workers, args.chunk_size, args.seed)
+    elif args.vectorized:
+        n_rows, min_date, max_date = write_vectorized(
+            args.output, args.rows, args.chunk_size, args.seed)
+    else:
+        df = generate_rows(args.rows, args.seed)
+        df.to_csv(args.output, index=False)
+        n_rows, min_date, max_date = len(df), df['order_date'].min(), df['order_date'].max()
+
+    print("=" * 50)
+    print("  DATA GENERATED SUCCESSFULLY!")
+    print("=" * 50)
+    print(f"  Rows:       {n_rows:,}")
+    print(f"  Columns:    {len(COLUMNS)}")
+    print(f"  Date Range: {min_date} → {max_date}")
+    print(f"  Saved to:   {args.output}")
+    print("=" * 50)
+    print("  Now run: python sales_analysis.py"
+          + (f" --input {args.output}" if args.partitions or args.output != DEFAULT_OUTPUT else ""))
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    main()
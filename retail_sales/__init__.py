@@ -0,0 +1,15 @@
+"""
+Retail sales analysis as an importable library.
+
+``pipeline`` runs the analysis as stages (load, clean, kpis, aggregates,
+timeseries, charts, export) over a ``Run``; ``report`` prints the console
+report and ``cli`` is the command line behind sales_analysis.py and
+``python -m retail_sales``. The other modules hold the logic the stages and
+execution modes share (schema, data-quality profile, cleaning, cost model,
+aggregation, top-k ranking, streaming, partitioned input, hash-sharded
+multi-process cleaning, cache, incremental state, rolling windows, charts,
+export); ``store`` answers ad-hoc slicing queries from the aggregates saved
+by the last run, ``preview`` estimates the headline figures from a sample
+(--preview), and ``service`` keeps the tables warm behind a local HTTP/JSON
+endpoint.
+"""
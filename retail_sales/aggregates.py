@@ -0,0 +1,568 @@
+"""
+KPI and group tables for Sections 3 and 4.
+
+``partial_aggregates(chunk)`` reduces any slice of rows to additive sums
+(sums and counts, never means) for every grouping set, ``merge_partials``
+adds two of those together (``merge_all`` any number), and
+``finalize_tables`` turns the merged sums into the report tables. Means are
+carried as sum/count pairs so partials from different chunks merge exactly.
+
+All grouping sets come from a single scan: the rows are grouped once at the
+base grain (the union of every grouping set's keys), and each report table is
+rolled up from that small base cuboid instead of from the rows again.
+``compute_tables(df_clean)`` is the in-memory entry point built on this;
+``compute_tables_groupby`` keeps the original one-groupby-per-table code as
+the reference implementation for benchmarks and conformance checks.
+"""
+import functools
+import operator
+
+import numpy as np
+import pandas as pd
+
+from . import profiling, ranking
+from .timeseries import SERIES_DIMS, SERIES_MEASURES
+
+DOW_ORDER   = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MONTH_ORDER = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Grouping sets needed by the report, keyed by the name used in partials
+GROUPING_SETS = {
+    'yoy':       ['year'],
+    'category':  ['category'],
+    'city':      ['city'],
+    'monthly':   ['year', 'month', 'month_name'],
+    'quarterly': ['year', 'quarter_label'],
+    'product':   ['product_id', 'product_name', 'category'],
+    'channel':   ['channel'],
+    'discount':  ['is_high_discount'],
+    'dow':       ['day_of_week'],
+    'segment':   ['customer_segment'],
+    'heatmap':   ['month_name', 'category'],
+}
+
+# Base grain: every column any grouping set needs, in one groupby
+BASE_GRAIN = list(dict.fromkeys(k for keys in GROUPING_SETS.values() for k in keys))
+
+# Grain of the queryable aggregate store (retail_sales.store): one cell per
+# day x product x city x channel x segment x payment method. product_name,
+# category and state depend on product_id / city, so they add no cells.
+STORE_GRAIN = ['order_date', 'product_id', 'product_name', 'category', 'city', 'state',
+               'channel', 'customer_segment', 'payment_method']
+
+# Additive measures kept for every grouping set
+MEASURES = {
+    'revenue':    ('revenue',       'sum'),
+    'revenue_n':  ('revenue',       'count'),
+    'orders':     ('order_id',      'count'),
+    'units':      ('quantity',      'sum'),
+    'profit':     ('profit',        'sum'),
+    'margin_sum': ('profit_margin', 'sum'),
+    'margin_n':   ('profit_margin', 'count'),
+    'disc_sum':   ('discount_pct',  'sum'),
+    'disc_n':     ('discount_pct',  'count'),
+}
+STORE_MEASURES = {**MEASURES, 'returned': ('is_returned', 'sum')}
+# Daily totals behind the rolling-window series (retail_sales.timeseries)
+DAILY_MEASURES = {m: MEASURES[m] for m in SERIES_MEASURES}
+
+STORE_MERGE_BATCH = 16           # chunk cuboids collected before they are merged
+
+
+# ══════════════════════════════════════════════════════════════════
+# REFERENCE PATH (one groupby per table)
+# ══════════════════════════════════════════════════════════════════
+def compute_kpis(df_clean):
+    return {
+        'total_revenue':   df_clean['revenue'].sum(),
+        'total_orders':    len(df_clean),
+        'total_profit':    df_clean['profit'].sum(),
+        'avg_order_value': df_clean['revenue'].mean(),
+        'total_units':     df_clean['quantity'].sum(),
+        'avg_margin':      df_clean['profit_margin'].mean(),
+        'return_rate':     df_clean['is_returned'].mean() * 100,
+        'discount_rate':   (df_clean['discount_pct'] > 0).mean() * 100,
+    }
+
+
+def compute_tables_groupby(df_clean):
+    """Build every Section 3/4 table with one groupby per table (reference path)."""
+    kpis = compute_kpis(df_clean)
+    total_revenue = kpis['total_revenue']
+
+    yoy = df_clean.groupby('year', observed=True).agg(
+        revenue      = ('revenue', 'sum'),
+        orders       = ('order_id', 'count'),
+        profit       = ('profit', 'sum'),
+        avg_order    = ('revenue', 'mean'),
+        units        = ('quantity', 'sum')
+    ).round(2)
+    yoy['revenue_growth'] = yoy['revenue'].pct_change() * 100
+    yoy['order_growth']   = yoy['orders'].pct_change() * 100
+
+    cat_analysis = df_clean.groupby('category', observed=True).agg(
+        total_revenue  = ('revenue', 'sum'),
+        total_orders   = ('order_id', 'count'),
+        total_units    = ('quantity', 'sum'),
+        avg_order_val  = ('revenue', 'mean'),
+        avg_margin     = ('profit_margin', 'mean'),
+        total_profit   = ('profit', 'sum')
+    ).round(2).sort_values('total_revenue', ascending=False)
+    cat_analysis['revenue_share_pct'] = (cat_analysis['total_revenue'] / total_revenue * 100).round(1)
+
+    city_analysis = df_clean[df_clean['city'] != 'Unknown'].groupby('city', observed=True).agg(
+        total_revenue = ('revenue', 'sum'),
+        total_orders  = ('order_id', 'count'),
+        avg_order_val = ('revenue', 'mean'),
+        avg_margin    = ('profit_margin', 'mean')
+    ).round(2).sort_values('total_revenue', ascending=False)
+    city_analysis['revenue_share_pct'] = (city_analysis['total_revenue'] / total_revenue * 100).round(1)
+
+    monthly = df_clean.groupby(['year', 'month', 'month_name'], observed=True).agg(
+        revenue = ('revenue', 'sum'),
+        orders  = ('order_id', 'count')
+    ).reset_index().sort_values(['year', 'month'])
+    monthly['mom_growth'] = monthly['revenue'].pct_change() * 100
+
+    quarterly = df_clean.groupby(['year', 'quarter_label'], observed=True).agg(
+        revenue = ('revenue', 'sum'),
+        orders  = ('order_id', 'count'),
+        profit  = ('profit', 'sum')
+    ).reset_index()
+    quarterly['profit_margin_pct'] = (quarterly['profit'] / quarterly['revenue'] * 100).round(1)
+
+    product_analysis = df_clean.groupby(['product_id', 'product_name', 'category'], observed=True).agg(
+        total_revenue = ('revenue', 'sum'),
+        total_units   = ('quantity', 'sum'),
+        total_orders  = ('order_id', 'count'),
+        avg_margin    = ('profit_margin', 'mean')
+    ).reset_index().sort_values('total_revenue', ascending=False)
+    product_analysis['revenue_rank'] = range(1, len(product_analysis) + 1)
+
+    channel_analysis = df_clean.groupby('channel', observed=True).agg(
+        revenue    = ('revenue', 'sum'),
+        orders     = ('order_id', 'count'),
+        avg_order  = ('revenue', 'mean'),
+        avg_margin = ('profit_margin', 'mean')
+    ).round(2).sort_values('revenue', ascending=False)
+    channel_analysis['revenue_share'] = (channel_analysis['revenue'] / total_revenue * 100).round(1)
+
+    discount_analysis = df_clean.groupby('is_high_discount', observed=True).agg(
+        orders        = ('order_id', 'count'),
+        total_revenue = ('revenue', 'sum'),
+        avg_revenue   = ('revenue', 'mean'),
+        avg_margin    = ('profit_margin', 'mean'),
+        avg_discount  = ('discount_pct', 'mean')
+    ).round(2)
+    discount_analysis.index = ['No High Discount', 'High Discount (>20%)']
+
+    dow = df_clean.groupby('day_of_week', observed=True).agg(
+        revenue = ('revenue', 'sum'),
+        orders  = ('order_id', 'count')
+    ).reindex(DOW_ORDER).round(2)
+
+    seg = df_clean.groupby('customer_segment', observed=True).agg(
+        revenue   = ('revenue', 'sum'),
+        orders    = ('order_id', 'count'),
+        avg_order = ('revenue', 'mean'),
+        margin    = ('profit_margin', 'mean')
+    ).round(2).sort_values('revenue', ascending=False)
+    seg['revenue_share'] = (seg['revenue'] / total_revenue * 100).round(1)
+
+    pivot_heat = df_clean.groupby(['month_name', 'category'], observed=True)['revenue'].sum().unstack()
+    pivot_heat = pivot_heat.reindex(MONTH_ORDER)
+
+    return {
+        'kpis':              kpis,
+        'yoy':               yoy,
+        'cat_analysis':      cat_analysis,
+        'city_analysis':     city_analysis,
+        'monthly':           monthly,
+        'quarterly':         quarterly,
+        'product_analysis':  product_analysis,
+        'channel_analysis':  channel_analysis,
+        'discount_analysis': discount_analysis,
+        'dow':               dow,
+        'seg':               seg,
+        'pivot_heat':        pivot_heat,
+    }
+
+
+# ══════════════════════════════════════════════════════════════════
+# SINGLE-PASS PATH (base cuboid + rollups)
+# ══════════════════════════════════════════════════════════════════
+def kpi_partials(df_clean):
+    """Additive totals behind the overall KPIs (no grouping)."""
+    return pd.Series({
+        'rows':       len(df_clean),
+        'revenue':    df_clean['revenue'].sum(),
+        'revenue_n':  df_clean['revenue'].count(),
+        'profit':     df_clean['profit'].sum(),
+        'units':      df_clean['quantity'].sum(),
+        'margin_sum': df_clean['profit_margin'].sum(),
+        'margin_n':   df_clean['profit_margin'].count(),
+        'returned':   df_clean['is_returned'].sum(),
+        'returned_n': df_clean['is_returned'].count(),
+        'discounted': (df_clean['discount_pct'] > 0).sum(),
+    }, dtype=float)
+
+
+def partial_aggregates(df_clean, kpis=None, store=False):
+    """Reduce a cleaned frame (or chunk) to additive totals per grouping set.
+
+    ``kpis`` may pass in an already computed ``kpi_partials(df_clean)``.
+    The daily totals for the rolling windows are always included; the
+    aggregate-store cuboid, which has about as many cells as there are
+    rows, only with ``store``.
+    """
+    with profiling.step('4.1 base cuboid', rows=len(df_clean)):
+        cuboid = base_cuboid(df_clean)
+    partials = rollup(*cuboid)
+    partials['kpis'] = kpi_partials(df_clean) if kpis is None else kpis
+    with profiling.step('4.1 daily totals', rows=len(df_clean)):
+        partials['daily'] = daily_partials(df_clean)
+    if store:
+        with profiling.step('4.1 store cuboid', rows=len(df_clean)):
+            partials['cuboid'] = store_cuboid(df_clean)
+    return partials
+
+
+def daily_partials(df_clean):
+    """DAILY_MEASURES per day and value of each SERIES_DIMS column: {dim: frame}.
+
+    At most days x values rows per dimension, so they merge as cheaply as
+    the grouping sets. Rows with a missing value are dropped, as by groupby.
+    """
+    daily = {}
+    for dim in SERIES_DIMS:
+        codes, uniques, measures = base_cuboid(df_clean, ['order_date', dim], DAILY_MEASURES)
+        frame = pd.DataFrame({'order_date': uniques[0].take(codes[0]),
+                              dim:          uniques[1].take(codes[1]), **measures})
+        daily[dim] = frame.dropna(subset=['order_date', dim]).sort_values(['order_date', dim],
+                                                                         ignore_index=True)
+    return daily
+
+
+def _merge_daily(dailies):
+    return {dim: pd.concat([d[dim] for d in dailies], ignore_index=True)
+                   .groupby(['order_date', dim], observed=True).sum().reset_index()
+            for dim in dailies[0]}
+
+
+def store_cuboid(df_clean):
+    """STORE_MEASURES summed at STORE_GRAIN, as a frame with one row per non-empty cell."""
+    codes, uniques, measures = base_cuboid(df_clean, STORE_GRAIN, STORE_MEASURES)
+    cells = {col: uniques[i].take(codes[i]) for i, col in enumerate(STORE_GRAIN)}
+    return pd.DataFrame({**cells, **measures})
+
+
+def merge_cuboids(cuboids):
+    """Sum store cuboids into one (a single concat and groupby over all of them)."""
+    if len(cuboids) == 1:
+        return cuboids[0]
+    both = pd.concat(cuboids, ignore_index=True)
+    merged = both.groupby(STORE_GRAIN, observed=True, dropna=False, sort=False).sum().reset_index()
+    # concat turns categoricals with different categories into plain strings
+    return merged.astype({col: 'category' for col in STORE_GRAIN if col != 'order_date'})
+
+
+class CuboidBatches:
+    """Store cuboids of successive chunks, merged ``batch`` at a time.
+
+    Merging the cuboid into the running partials after every chunk would
+    re-group the whole history each time. Here chunk cuboids are only
+    collected; every ``batch`` of them is folded into the running cuboid in
+    one merge_cuboids call, and ``result`` merges whatever is left.
+    """
+
+    def __init__(self, batch=STORE_MERGE_BATCH):
+        self.batch   = batch
+        self.pending = []
+
+    def add(self, cuboid):
+        self.pending.append(cuboid)
+        if len(self.pending) > self.batch:
+            self.pending = [merge_cuboids(self.pending)]
+
+    def result(self):
+        return merge_cuboids(self.pending) if self.pending else None
+
+
+_KEY_LIMIT = 2 ** 62
+
+
+def _group_ids(codes, sizes):
+    """Pack per-column integer codes into one dense group id per row.
+
+    Returns (group_id, rep): ``rep[g]`` is the position of some row of group
+    ``g``, which is enough to recover that group's key codes.
+    """
+    key, space = np.zeros(len(codes[0]), dtype=np.int64), 1
+    for c, size in zip(codes, sizes):
+        size = max(size, 1)
+        if space * size >= _KEY_LIMIT:             # re-compress before overflow
+            key, packed = pd.factorize(key)
+            space = len(packed)
+        key = key * size + c
+        space *= size
+    group_id, groups = pd.factorize(key)
+
+    rep = np.empty(len(groups), dtype=np.intp)
+    rep[group_id] = np.arange(len(group_id))
+    return group_id, rep
+
+
+def _sum_measures(group_id, n_groups, values):
+    """Sum each measure array per group; integer/boolean inputs stay int64."""
+    out = {}
+    for name, v in values.items():
+        summed = np.bincount(group_id, weights=v, minlength=n_groups)
+        out[name] = summed.astype(np.int64) if v.dtype.kind in 'biu' else summed
+    return out
+
+
+def base_cuboid(df_clean, grain=BASE_GRAIN, measures=MEASURES):
+    """Aggregate every MEASURE at BASE_GRAIN (or ``grain``) in a single scan of the rows.
+
+    Each key column is factorized once into integer codes, the codes are
+    packed into one int64 group id, and every measure is a ``np.bincount``
+    over that id. Missing keys get their own code (like ``dropna=False``),
+    so a row is only dropped from the grouping sets that use the missing key.
+
+    Returns (codes, uniques, measures): per-key code arrays and measure
+    arrays with one entry per cuboid cell, plus the values behind each code.
+    """
+    codes, uniques = [], []
+    for col in grain:
+        c, u = pd.factorize(df_clean[col], use_na_sentinel=False)
+        codes.append(c)
+        uniques.append(u)
+
+    group_id, rep = _group_ids(codes, [len(u) for u in uniques])
+
+    values = {}
+    for name, (col, how) in measures.items():
+        v = df_clean[col]
+        valid = v.notna().to_numpy()
+        if how == 'count':
+            values[name] = valid
+        elif pd.api.types.is_integer_dtype(v):
+            values[name] = v.to_numpy()
+        else:
+            values[name] = np.where(valid, v.to_numpy(dtype=float, na_value=0), 0)
+    measures = _sum_measures(group_id, len(rep), values)
+
+    return [c[rep] for c in codes], uniques, measures
+
+
+def rollup(codes, uniques, measures):
+    """Roll the base cuboid up to every grouping set in GROUPING_SETS."""
+    position = {col: i for i, col in enumerate(BASE_GRAIN)}
+    partials = {}
+    for name, keys in GROUPING_SETS.items():
+        with profiling.step(f"4.2 rollup {name}", rows=len(codes[0])):
+            idx = [position[k] for k in keys]
+            group_id, rep = _group_ids([codes[i] for i in idx], [len(uniques[i]) for i in idx])
+            sums = _sum_measures(group_id, len(rep), measures)
+
+            index = pd.MultiIndex.from_arrays(
+                [uniques[i].take(codes[i][rep]) for i in idx], names=keys)
+            table = pd.DataFrame(sums, index=index)
+            if len(keys) == 1:
+                table.index = table.index.get_level_values(0)
+            # Like groupby(dropna=True): groups with a missing key are dropped
+            table = table[~index.to_frame().isna().any(axis=1).to_numpy()]
+            partials[name] = table.sort_index()
+    return partials
+
+
+def merge_partials(left, right):
+    """Add two partial-aggregate dicts together; either side may be None."""
+    return merge_all([left, right])
+
+
+def merge_all(parts):
+    """Add any number of partial-aggregate dicts together (None entries are skipped).
+
+    Each table is concatenated and summed once, so merging n partitions
+    costs one groupby per table instead of n - 1 pairwise merges.
+    """
+    parts = [p for p in parts if p is not None]
+    if len(parts) <= 1:
+        return parts[0] if parts else None
+
+    merged = {'kpis': functools.reduce(operator.add, [p['kpis'] for p in parts])}
+    for name in GROUPING_SETS:
+        both = pd.concat([p[name] for p in parts])
+        merged[name] = both.groupby(level=list(range(both.index.nlevels))).sum()
+    if all('daily' in p for p in parts):       # state saved before the daily totals has none
+        merged['daily'] = _merge_daily([p['daily'] for p in parts])
+    if all('cuboid' in p for p in parts):      # only runs that asked for the store have one
+        merged['cuboid'] = merge_cuboids([p['cuboid'] for p in parts])
+    return merged
+
+
+def _mean(g, total, count):
+    return g[total] / g[count].replace(0, np.nan)
+
+
+def finalize_kpis(k):
+    """Overall KPI dict from ``kpi_partials`` totals."""
+    return {
+        'total_revenue':   k['revenue'],
+        'total_orders':    int(k['rows']),
+        'total_profit':    k['profit'],
+        'avg_order_value': k['revenue'] / k['revenue_n'],
+        'total_units':     int(k['units']),
+        'avg_margin':      k['margin_sum'] / k['margin_n'],
+        'return_rate':     k['returned'] / k['returned_n'] * 100,
+        'discount_rate':   k['discounted'] / k['rows'] * 100,
+    }
+
+
+def finalize_tables(partials):
+    """Turn merged partial aggregates into the same tables as compute_tables_groupby()."""
+    kpis = finalize_kpis(partials['kpis'])
+    total_revenue = kpis['total_revenue']
+
+    g = partials['yoy'].sort_index()
+    yoy = pd.DataFrame({
+        'revenue':   g['revenue'],
+        'orders':    g['orders'],
+        'profit':    g['profit'],
+        'avg_order': _mean(g, 'revenue', 'revenue_n'),
+        'units':     g['units'],
+    }).round(2)
+    yoy['revenue_growth'] = yoy['revenue'].pct_change() * 100
+    yoy['order_growth']   = yoy['orders'].pct_change() * 100
+
+    g = partials['category'].sort_index()
+    cat_analysis = pd.DataFrame({
+        'total_revenue': g['revenue'],
+        'total_orders':  g['orders'],
+        'total_units':   g['units'],
+        'avg_order_val': _mean(g, 'revenue', 'revenue_n'),
+        'avg_margin':    _mean(g, 'margin_sum', 'margin_n'),
+        'total_profit':  g['profit'],
+    }).round(2).sort_values('total_revenue', ascending=False)
+    cat_analysis['revenue_share_pct'] = (cat_analysis['total_revenue'] / total_revenue * 100).round(1)
+
+    g = partials['city'].sort_index()
+    g = g[g.index != 'Unknown']
+    city_analysis = pd.DataFrame({
+        'total_revenue': g['revenue'],
+        'total_orders':  g['orders'],
+        'avg_order_val': _mean(g, 'revenue', 'revenue_n'),
+        'avg_margin':    _mean(g, 'margin_sum', 'margin_n'),
+    }).round(2).sort_values('total_revenue', ascending=False)
+    city_analysis['revenue_share_pct'] = (city_analysis['total_revenue'] / total_revenue * 100).round(1)
+
+    g = partials['monthly'].sort_index()
+    monthly = g[['revenue', 'orders']].reset_index().sort_values(['year', 'month'])
+    monthly['mom_growth'] = monthly['revenue'].pct_change() * 100
+
+    g = partials['quarterly'].sort_index()
+    quarterly = g[['revenue', 'orders', 'profit']].reset_index()
+    quarterly['profit_margin_pct'] = (quarterly['profit'] / quarterly['revenue'] * 100).round(1)
+
+    g = partials['product'].sort_index()
+    product_analysis = pd.DataFrame({
+        'total_revenue': g['revenue'],
+        'total_units':   g['units'],
+        'total_orders':  g['orders'],
+        'avg_margin':    _mean(g, 'margin_sum', 'margin_n'),
+    }).reset_index().sort_values('total_revenue', ascending=False)
+    product_analysis['revenue_rank'] = range(1, len(product_analysis) + 1)
+
+    g = partials['channel'].sort_index()
+    channel_analysis = pd.DataFrame({
+        'revenue':    g['revenue'],
+        'orders':     g['orders'],
+        'avg_order':  _mean(g, 'revenue', 'revenue_n'),
+        'avg_margin': _mean(g, 'margin_sum', 'margin_n'),
+    }).round(2).sort_values('revenue', ascending=False)
+    channel_analysis['revenue_share'] = (channel_analysis['revenue'] / total_revenue * 100).round(1)
+
+    g = partials['discount'].sort_index()
+    discount_analysis = pd.DataFrame({
+        'orders':        g['orders'],
+        'total_revenue': g['revenue'],
+        'avg_revenue':   _mean(g, 'revenue', 'revenue_n'),
+        'avg_margin':    _mean(g, 'margin_sum', 'margin_n'),
+        'avg_discount':  _mean(g, 'disc_sum', 'disc_n'),
+    }).round(2)
+    discount_analysis.index = ['No High Discount', 'High Discount (>20%)']
+
+    g = partials['dow']
+    dow = g[['revenue', 'orders']].reindex(DOW_ORDER).round(2)
+
+    g = partials['segment'].sort_index()
+    seg = pd.DataFrame({
+        'revenue':   g['revenue'],
+        'orders':    g['orders'],
+        'avg_order': _mean(g, 'revenue', 'revenue_n'),
+        'margin':    _mean(g, 'margin_sum', 'margin_n'),
+    }).round(2).sort_values('revenue', ascending=False)
+    seg['revenue_share'] = (seg['revenue'] / total_revenue * 100).round(1)
+
+    pivot_heat = partials['heatmap']['revenue'].sort_index().unstack().reindex(MONTH_ORDER)
+
+    return {
+        'kpis':              kpis,
+        'yoy':               yoy,
+        'cat_analysis':      cat_analysis,
+        'city_analysis':     city_analysis,
+        'monthly':           monthly,
+        'quarterly':         quarterly,
+        'product_analysis':  product_analysis,
+        'channel_analysis':  channel_analysis,
+        'discount_analysis': discount_analysis,
+        'dow':               dow,
+        'seg':               seg,
+        'pivot_heat':        pivot_heat,
+    }
+
+
+def pareto_cutoff(product_analysis, total_revenue, share=80.0):
+    """How many top products make up ``share`` % of revenue (ranking.ParetoCut).
+
+    Same counts as sorting the whole table by revenue and filtering its
+    cumulative share, but only the top products up to the cutoff are
+    selected and summed.
+    """
+    with profiling.step('4.6 pareto', rows=len(product_analysis)):
+        return ranking.pareto_cut(product_analysis['total_revenue'].to_numpy(), total_revenue, share)
+
+
+def compute_tables(df_clean):
+    """Build every Section 3/4 table from a single pass over ``df_clean``."""
+    return finalize_tables(partial_aggregates(df_clean))
+
+
+def assert_tables_equal(left, right, atol=0.01):
+    """Raise AssertionError if two table dicts differ beyond rounding noise.
+
+    Keys and integer columns (orders, units, ranks, the KPI counts) must be
+    equal exactly. Float columns - sums and the means and percentages built
+    from them, rounded to 2 decimals - may differ by ``atol``: sums taken in a
+    different order can differ in the last bits, which may flip the rounded
+    value by one step. There is no relative tolerance.
+    """
+    assert left.keys() == right.keys(), f"table names differ: {left.keys() ^ right.keys()}"
+    for name in left:
+        a, b = left[name], right[name]
+        if name == 'kpis':
+            for key in a:
+                if isinstance(a[key], (int, np.integer)) or isinstance(b[key], (int, np.integer)):
+                    assert a[key] == b[key], f"kpis[{key}]: {a[key]} != {b[key]}"
+                else:
+                    assert np.isclose(a[key], b[key], rtol=0, atol=atol, equal_nan=True), \
+                        f"kpis[{key}]: {a[key]} != {b[key]}"
+            continue
+        pd.testing.assert_index_equal(a.index, b.index, exact=False, check_exact=True, obj=f"{name}.index")
+        assert list(a.columns) == list(b.columns), f"{name}: columns differ"
+        for col in a.columns:
+            exact = a[col].dtype.kind not in 'fc' or b[col].dtype.kind not in 'fc'
+            pd.testing.assert_series_equal(a[col], b[col], check_dtype=False, check_index=False,
+                                           check_exact=exact, rtol=0, atol=0 if exact else atol,
+                                           obj=f"{name}[{col!r}]")
@@ -0,0 +1,167 @@
+"""
+Binary cache of the cleaned dataset (Arrow IPC / Feather v2).
+
+A cache entry is keyed on a fingerprint of the raw CSV - its size, mtime and
+a BLAKE2 hash of the content - plus CLEANING_VERSION, the loader SCHEMA and
+the active cost model, so editing the data, the cleaning logic or the cost
+table all invalidate it. On a hit the
+cleaned table is memory-mapped straight from disk: no CSV parsing, no date
+conversion and no Section 2 work.
+
+Hashing a large file still costs a full read, so the hash from the last run
+is reused when the file's size and mtime are unchanged (the same shortcut
+``git status`` takes). pyarrow is optional: without it every call is a
+cache miss and ``store`` is a no-op.
+"""
+import glob
+import hashlib
+import json
+import os
+
+from . import costs
+from .cleaning import CLEANING_VERSION
+from .config import CACHE_DIR
+from .schema import SCHEMA
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:                      # cache disabled, analysis still runs
+    pa = feather = None
+
+_HASH_BLOCK = 1 << 20
+
+
+class CachedClean:
+    """A cleaned frame loaded from cache, plus the stats saved alongside it."""
+
+    def __init__(self, df, stats, path):
+        self.df    = df
+        self.stats = stats
+        self.path  = path
+
+
+def available():
+    return pa is not None
+
+
+def content_hash(path):
+    """BLAKE2 digest of a file's bytes, read in 1 MB blocks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat_file(cache_dir):
+    return os.path.join(cache_dir, 'fingerprints.json')
+
+
+def fingerprint(path, cache_dir=CACHE_DIR):
+    """Return {size, mtime_ns, content_hash} for ``path``.
+
+    The content hash is only recomputed when size or mtime changed since the
+    last fingerprint of the same path.
+    """
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    try:
+        with open(_stat_file(cache_dir)) as f:
+            known = json.load(f)
+    except (OSError, ValueError):
+        known = {}
+
+    prev = known.get(key)
+    if prev and prev['size'] == st.st_size and prev['mtime_ns'] == st.st_mtime_ns:
+        return prev
+
+    fp = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'content_hash': content_hash(path)}
+    known[key] = fp
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(_stat_file(cache_dir), 'w') as f:
+        json.dump(known, f, indent=1)
+    return fp
+
+
+def cache_key(fp):
+    """Cache key: raw content hash + cleaning logic version + loader schema + cost model."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(fp['content_hash'].encode())
+    h.update(f"cleaning-v{CLEANING_VERSION}".encode())
+    h.update(repr(sorted(SCHEMA.items())).encode())
+    h.update(costs.active().fingerprint().encode())
+    return h.hexdigest()
+
+
+def _entry_paths(raw_path, key, cache_dir):
+    stem = os.path.splitext(os.path.basename(raw_path))[0]
+    base = os.path.join(cache_dir, f"clean_{stem}_{key}")
+    return base + '.arrow', base + '.json', os.path.join(cache_dir, f"clean_{stem}_*")
+
+
+def load(raw_path, cache_dir=CACHE_DIR):
+    """Return a CachedClean for ``raw_path``, or None on a miss."""
+    if pa is None:
+        return None
+    data_path, meta_path, _ = _entry_paths(raw_path, cache_key(fingerprint(raw_path, cache_dir)), cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+
+    with open(meta_path) as f:
+        stats = json.load(f)
+    source = pa.memory_map(data_path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    # split_blocks keeps numeric columns as zero-copy views of the mapping
+    return CachedClean(table.to_pandas(split_blocks=True), stats, data_path)
+
+
+def _csv_file(cache_dir):
+    return os.path.join(cache_dir, 'clean_csv.json')
+
+
+def mark_csv(csv_path, entry_path, cache_dir=CACHE_DIR):
+    """Record that ``csv_path`` was just written from the cache entry ``entry_path``."""
+    st = os.stat(csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(_csv_file(cache_dir), 'w') as f:
+        json.dump({'path': os.path.abspath(csv_path), 'entry': os.path.basename(entry_path),
+                   'size': st.st_size, 'mtime_ns': st.st_mtime_ns}, f, indent=1)
+
+
+def csv_matches(csv_path, entry_path, cache_dir=CACHE_DIR):
+    """True if ``csv_path`` still holds what ``mark_csv`` wrote from ``entry_path``.
+
+    Any other writer of the file (another input, --stream, --append) changes
+    its size or mtime, so a stale CSV is never mistaken for this entry's.
+    """
+    try:
+        with open(_csv_file(cache_dir)) as f:
+            mark = json.load(f)
+        st = os.stat(csv_path)
+    except (OSError, ValueError):
+        return False
+    return mark == {'path': os.path.abspath(csv_path), 'entry': os.path.basename(entry_path),
+                    'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def store(raw_path, df_clean, stats, cache_dir=CACHE_DIR):
+    """Write ``df_clean`` (and JSON-able ``stats``) as the cache entry for ``raw_path``.
+
+    Older entries for the same source file are removed. Returns the entry
+    path, or None when pyarrow is not installed.
+    """
+    if feather is None:
+        return None
+    fp = fingerprint(raw_path, cache_dir)
+    data_path, meta_path, pattern = _entry_paths(raw_path, cache_key(fp), cache_dir)
+
+    for old in glob.glob(pattern):
+        os.remove(old)
+
+    tmp_path = data_path + '.tmp'
+    feather.write_feather(df_clean, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, data_path)
+    with open(meta_path, 'w') as f:
+        json.dump(dict(stats, fingerprint=fp, cleaning_version=CLEANING_VERSION), f, indent=1)
+    return data_path
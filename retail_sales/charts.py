@@ -0,0 +1,266 @@
+"""
+Section 5 charts as independent render jobs.
+
+Each chart is a function of the precomputed aggregate tables only (never of
+``df_clean``), so the six jobs can run on a process pool, one figure per
+worker. ``render_charts`` can also skip charts whose input tables - and
+drawing code - are unchanged since the file on disk was rendered.
+"""
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend
+import matplotlib.pyplot as plt
+import matplotlib.ticker as mticker
+import pandas as pd
+import seaborn as sns
+
+from . import profiling
+
+DPI = 150
+_HASH_FILE = '.chart_inputs.json'
+
+
+def setup_style():
+    """Style settings - makes charts look professional (runs once per worker)."""
+    plt.rcParams['figure.figsize']  = (12, 6)
+    plt.rcParams['font.family']     = 'DejaVu Sans'
+    plt.rcParams['axes.spines.top']    = False
+    plt.rcParams['axes.spines.right']  = False
+    sns.set_palette("husl")
+
+
+def _rupees(x, _):
+    return f'₹{x:,.0f}'
+
+
+def _save(path):
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+# ─── Chart 1: Monthly Revenue Trend ─────────────────────────────
+def chart_monthly_trend(path, monthly, quarterly):
+    fig, axes = plt.subplots(2, 1, figsize=(14, 10))
+
+    for year, grp in monthly.groupby('year'):
+        axes[0].plot(
+            grp['month_name'], grp['revenue'],
+            marker='o', linewidth=2.5, markersize=7, label=str(year)
+        )
+
+    axes[0].set_title('Monthly Revenue Trend (2023 vs 2024)', fontsize=15, fontweight='bold', pad=15)
+    axes[0].set_xlabel('Month')
+    axes[0].set_ylabel('Revenue (₹)')
+    axes[0].yaxis.set_major_formatter(mticker.FuncFormatter(_rupees))
+    axes[0].legend(fontsize=12)
+    axes[0].grid(axis='y', alpha=0.3)
+
+    # Quarterly bar chart
+    qtr_pivot = quarterly.pivot(index='quarter_label', columns='year', values='revenue')
+    qtr_pivot.plot(kind='bar', ax=axes[1], width=0.6, edgecolor='white')
+    axes[1].set_title('Quarterly Revenue Comparison (2023 vs 2024)', fontsize=13, fontweight='bold')
+    axes[1].set_xlabel('Quarter')
+    axes[1].set_ylabel('Revenue (₹)')
+    axes[1].yaxis.set_major_formatter(mticker.FuncFormatter(_rupees))
+    axes[1].legend(['2023', '2024'])
+    axes[1].tick_params(axis='x', rotation=0)
+    axes[1].grid(axis='y', alpha=0.3)
+
+    plt.tight_layout(pad=3)
+    _save(path)
+
+
+# ─── Chart 2: Category Revenue Breakdown ─────────────────────────
+def chart_category_breakdown(path, cat_analysis):
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+
+    # Pie chart
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+    wedges, texts, autotexts = axes[0].pie(
+        cat_analysis['total_revenue'],
+        labels=cat_analysis.index,
+        autopct='%1.1f%%',
+        colors=colors,
+        startangle=90,
+        pctdistance=0.85
+    )
+    for at in autotexts:
+        at.set_fontsize(10)
+        at.set_fontweight('bold')
+    axes[0].set_title('Revenue Share by Category', fontsize=13, fontweight='bold')
+
+    # Horizontal bar chart
+    bars = axes[1].barh(cat_analysis.index, cat_analysis['total_revenue'], color=colors, edgecolor='white')
+    axes[1].set_title('Total Revenue by Category', fontsize=13, fontweight='bold')
+    axes[1].set_xlabel('Revenue (₹)')
+    axes[1].xaxis.set_major_formatter(mticker.FuncFormatter(_rupees))
+    for bar, val in zip(bars, cat_analysis['total_revenue']):
+        axes[1].text(bar.get_width() + 500, bar.get_y() + bar.get_height()/2,
+                     f'₹{val:,.0f}', va='center', fontsize=9)
+
+    plt.tight_layout(pad=3)
+    _save(path)
+
+
+# ─── Chart 3: City Revenue Bar Chart ─────────────────────────────
+def chart_city_performance(path, city_analysis):
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+
+    city_top = city_analysis.head(8)
+    colors_city = sns.color_palette("husl", len(city_top))
+
+    axes[0].bar(city_top.index, city_top['total_revenue'], color=colors_city, edgecolor='white')
+    axes[0].set_title('Revenue by City (Top 8)', fontsize=13, fontweight='bold')
+    axes[0].set_xlabel('City')
+    axes[0].set_ylabel('Revenue (₹)')
+    axes[0].yaxis.set_major_formatter(mticker.FuncFormatter(_rupees))
+    axes[0].tick_params(axis='x', rotation=30)
+    axes[0].grid(axis='y', alpha=0.3)
+
+    # Avg order value by city
+    axes[1].bar(city_top.index, city_top['avg_order_val'], color=colors_city, edgecolor='white')
+    axes[1].set_title('Avg Order Value by City', fontsize=13, fontweight='bold')
+    axes[1].set_xlabel('City')
+    axes[1].set_ylabel('Avg Order Value (₹)')
+    axes[1].yaxis.set_major_formatter(mticker.FuncFormatter(_rupees))
+    axes[1].tick_params(axis='x', rotation=30)
+    axes[1].grid(axis='y', alpha=0.3)
+
+    plt.tight_layout(pad=3)
+    _save(path)
+
+
+# ─── Chart 4: Top Products ────────────────────────────────────────
+def chart_product_performance(path, product_analysis):
+    fig, axes = plt.subplots(1, 2, figsize=(14, 7))
+
+    top10 = product_analysis.head(10).sort_values('total_revenue')
+    colors_prod = sns.color_palette("RdYlGn", len(top10))
+
+    axes[0].barh(top10['product_name'], top10['total_revenue'], color=colors_prod, edgecolor='white')
+    axes[0].set_title('Top 10 Products by Revenue', fontsize=13, fontweight='bold')
+    axes[0].set_xlabel('Revenue (₹)')
+    axes[0].xaxis.set_major_formatter(mticker.FuncFormatter(_rupees))
+    axes[0].grid(axis='x', alpha=0.3)
+
+    # Units sold top 10
+    top10_units = product_analysis.nlargest(10, 'total_units').sort_values('total_units')
+    axes[1].barh(top10_units['product_name'], top10_units['total_units'],
+                 color=sns.color_palette("Blues_r", len(top10_units)), edgecolor='white')
+    axes[1].set_title('Top 10 Products by Units Sold', fontsize=13, fontweight='bold')
+    axes[1].set_xlabel('Units Sold')
+    axes[1].grid(axis='x', alpha=0.3)
+
+    plt.tight_layout(pad=3)
+    _save(path)
+
+
+# ─── Chart 5: Channel & Segment Analysis ─────────────────────────
+def chart_channel_segment(path, channel_analysis, seg):
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+
+    chan_colors = ['#3498db', '#2ecc71', '#e74c3c']
+    axes[0].pie(channel_analysis['revenue'], labels=channel_analysis.index,
+                autopct='%1.1f%%', colors=chan_colors, startangle=90)
+    axes[0].set_title('Revenue by Sales Channel', fontsize=13, fontweight='bold')
+
+    seg_colors = ['#9b59b6', '#f39c12', '#1abc9c']
+    axes[1].pie(seg['revenue'], labels=seg.index,
+                autopct='%1.1f%%', colors=seg_colors, startangle=90)
+    axes[1].set_title('Revenue by Customer Segment', fontsize=13, fontweight='bold')
+
+    plt.tight_layout(pad=3)
+    _save(path)
+
+
+# ─── Chart 6: Heatmap - Revenue by Month & Category ──────────────
+def chart_revenue_heatmap(path, pivot_heat):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.heatmap(pivot_heat, annot=True, fmt='.0f', cmap='YlOrRd',
+                linewidths=0.5, ax=ax, cbar_kws={'label': 'Revenue (₹)'})
+    ax.set_title('Revenue Heatmap: Month vs Category', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('Category', fontsize=11)
+    ax.set_ylabel('Month', fontsize=11)
+    plt.tight_layout()
+    _save(path)
+
+
+# (file name, title, render function, input tables) - in report order
+CHARTS = [
+    ('chart1_monthly_trend.png',      '📈 Chart 1: Monthly Revenue Trend', chart_monthly_trend,       ['monthly', 'quarterly']),
+    ('chart2_category_breakdown.png', '📊 Chart 2: Category Analysis',     chart_category_breakdown,  ['cat_analysis']),
+    ('chart3_city_performance.png',   '🗺️  Chart 3: City Performance',     chart_city_performance,    ['city_analysis']),
+    ('chart4_product_performance.png', '🏆 Chart 4: Product Performance',  chart_product_performance, ['product_analysis']),
+    ('chart5_channel_segment.png',    '📱 Chart 5: Channel & Segment',     chart_channel_segment,     ['channel_analysis', 'seg']),
+    ('chart6_revenue_heatmap.png',    '🔥 Chart 6: Revenue Heatmap',       chart_revenue_heatmap,     ['pivot_heat']),
+]
+
+
+def input_hash(func, inputs):
+    """Digest of a chart's input tables plus its drawing code."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(inspect.getsource(func).encode())
+    for table in inputs:
+        h.update(repr((list(table.columns), list(table.dtypes.astype(str)), table.index.names)).encode())
+        h.update(pd.util.hash_pandas_object(table, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _render(func, path, inputs):
+    """Draw and save one chart; returns its (wall s, cpu s, peak RSS MB) for profiling."""
+    t0, c0 = time.perf_counter(), time.process_time()
+    func(path, *inputs)
+    return time.perf_counter() - t0, time.process_time() - c0, profiling.peak_rss_mb()
+
+
+def render_charts(tables, chart_dir, workers=None, skip_unchanged=False):
+    """Render every chart in CHARTS from ``tables`` into ``chart_dir``.
+
+    ``workers`` is the process-pool size (default: one per CPU, capped at the
+    number of charts); ``workers=1`` renders in this process. With
+    ``skip_unchanged``, a chart whose inputs hash matches the last render and
+    whose file still exists is not redrawn.
+
+    Returns a list of (file name, title, status) in report order, where
+    status is 'saved' or 'unchanged'.
+    """
+    os.makedirs(chart_dir, exist_ok=True)
+    hash_path = os.path.join(chart_dir, _HASH_FILE)
+    try:
+        with open(hash_path) as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    jobs, status, hashes = [], {}, dict(previous)
+    for name, title, func, keys in CHARTS:
+        inputs = [tables[k] for k in keys]
+        digest = input_hash(func, inputs)
+        path = os.path.join(chart_dir, name)
+        if skip_unchanged and previous.get(name) == digest and os.path.exists(path):
+            status[name] = 'unchanged'
+            continue
+        jobs.append((func, path, inputs))
+        hashes[name] = digest
+        status[name] = 'saved'
+
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    if workers == 1:
+        setup_style()
+        measured = [_render(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=setup_style) as pool:
+            # .result() re-raises a worker's exception here
+            measured = [future.result() for future in [pool.submit(_render, *job) for job in jobs]]
+    for (_, path, _), (wall, cpu, rss) in zip(jobs, measured):
+        profiling.record(f"5 chart {os.path.basename(path)}", wall, cpu, peak_rss=rss)
+
+    with open(hash_path, 'w') as f:
+        json.dump(hashes, f, indent=1)
+    return [(name, title, status[name]) for name, title, _, _ in CHARTS]
@@ -0,0 +1,178 @@
+"""
+Command line for the analysis (``python sales_analysis.py`` or
+``python -m retail_sales``).
+
+``--only`` runs a subset of the pipeline stages, e.g. ``--only kpis`` or
+``--only kpis,aggregates``; the load and clean stages they need run too.
+Without ``charts`` in the list, matplotlib and seaborn are never imported.
+
+``--input`` takes a CSV, a directory or a glob of partitioned exports
+(e.g. ``data/orders/year=*/month=*/*.csv``); ``--from``/``--to`` limit the
+report to a range of months and skip partitions outside it. ``--backend
+duckdb`` runs loading, cleaning and aggregation as SQL in DuckDB.
+
+``--pipeline`` streams like ``--stream`` but parses the next chunk and writes
+the cleaned CSV on background threads while the current chunk is cleaned.
+
+``--shard-workers N`` runs the cleaning and partial aggregates of an
+in-memory run on N processes, over hash shards of the rows held in shared
+memory (see retail_sales.sharding).
+
+``--cost-table`` replaces the category cost shares with per-product costs
+from a CSV or Parquet file (see retail_sales.costs).
+
+``--preview`` skips the pipeline: it prints the KPI box, top products, top
+cities and category shares estimated from a random sample of the input, each
+with a confidence interval (see retail_sales.preview).
+"""
+import argparse
+import functools
+import sys
+import warnings
+
+from . import costs, duckdb_backend, incremental, partitions, preview, profiling, report
+from .config import DEFAULT_CHUNKSIZE, PROFILE_DIR, RAW_PATH
+from .pipeline import STAGES, Run, resolve, run_stages
+
+
+def _stage_list(value):
+    stages = [s.strip() for s in value.split(',') if s.strip()]
+    try:
+        resolve(stages)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return stages
+
+
+def _month(value):
+    try:
+        partitions.period(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY or YYYY-MM, got {value!r}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Retail sales performance analysis.")
+    parser.add_argument('--only', type=_stage_list, metavar='STAGES',
+                        help=f"comma-separated stages to run, plus what they need "
+                             f"({', '.join(STAGES)}; default: all)")
+    parser.add_argument('--input', default=RAW_PATH, metavar='PATH',
+                        help="raw CSV, or a directory/glob of partitioned CSVs (default: %(default)s)")
+    parser.add_argument('--from', dest='start', type=_month, metavar='YYYY[-MM]',
+                        help="first month to report on; earlier year=/month= partitions are not read")
+    parser.add_argument('--to', dest='end', type=_month, metavar='YYYY[-MM]',
+                        help="last month to report on; later partitions are not read")
+    parser.add_argument('--ingest-workers', type=int, default=None,
+                        help="processes for reading partitioned input (default: one per CPU; 1 = no pool)")
+    parser.add_argument('--shard-workers', type=int, default=None, metavar='N',
+                        help="clean and aggregate an in-memory run on N processes, rows hash-sharded "
+                             "by order_id through shared memory (default: single process)")
+    parser.add_argument('--backend', choices=['pandas', 'duckdb'], default='pandas',
+                        help="engine for loading, cleaning and aggregating; 'duckdb' runs them as SQL "
+                             "straight over the CSV/Parquet input, out of core (default: %(default)s)")
+    parser.add_argument('--cost-table', metavar='PATH',
+                        help="CSV/Parquet of per-product costs (product_id, cost_pct and/or unit_cost, "
+                             "optional effective_from) instead of the category cost shares")
+    parser.add_argument('--stream', action='store_true',
+                        help="clean and aggregate the CSV chunk by chunk (for files larger than memory)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="--stream with reading, cleaning and CSV writing overlapped on threads "
+                             "joined by bounded queues (implies --stream)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="rows per chunk in --stream mode (default: %(default)s)")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="print per-column memory of the typed load vs plain read_csv")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore the cleaned-data cache and re-run Sections 1-2 from the CSV")
+    parser.add_argument('--append', metavar='NEW_ORDERS_CSV',
+                        help="fold only the orders in this file into the aggregates stored by the last run")
+    parser.add_argument('--store', action='store_true',
+                        help="also save the queryable aggregate store (python -m retail_sales.store); "
+                             "with --append, fold the new orders into it (else it is dropped as stale)")
+    parser.add_argument('--chart-workers', type=int, default=None,
+                        help="processes for rendering charts (default: one per CPU; 1 = no pool)")
+    parser.add_argument('--skip-unchanged-charts', action='store_true',
+                        help="don't redraw charts whose input tables are unchanged since the last render")
+    parser.add_argument('--excel-engine', choices=['auto', 'openpyxl', 'stream'], default='auto',
+                        help="'stream' writes rows in constant memory; 'auto' uses it for large sheets")
+    parser.add_argument('--clean-data', choices=['sheet', 'link', 'none'], default='sheet',
+                        help="put row-level data in the Clean_Data sheet, link to the clean CSV instead, or omit it")
+    parser.add_argument('--preview', action='store_true',
+                        help="estimate KPIs and top-N tables from a sample, with confidence intervals")
+    parser.add_argument('--sample-rows', type=int, default=preview.DEFAULT_SAMPLE_ROWS,
+                        help="rows to sample in --preview mode (default: %(default)s)")
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help="confidence level of the --preview intervals (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="random seed for --preview sampling (default: fresh each run)")
+    parser.add_argument('--profile', nargs='?', const='timing', choices=profiling.MODES,
+                        help=f"record time, CPU, peak RSS and rows per step to {PROFILE_DIR} "
+                             "('tracemalloc' adds Python heap peaks, 'cprofile' a full profile)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+    try:
+        period = partitions.period(args.start, args.end)
+    except ValueError as e:
+        parser.error(str(e))
+    if not 0 < args.confidence < 1:
+        parser.error("--confidence must be between 0 and 1")
+    if args.backend == 'duckdb' and not duckdb_backend.available():
+        parser.error("--backend duckdb needs the 'duckdb' package (pip install duckdb)")
+    if args.pipeline and (args.append or args.backend != 'pandas' or
+                          partitions.is_partitioned(args.input) or period != (None, None)):
+        parser.error("--pipeline applies to streaming one CSV (not --append, duckdb or partitioned input)")
+    if args.shard_workers is not None:
+        if args.shard_workers < 1:
+            parser.error("--shard-workers must be at least 1")
+        if args.stream or args.pipeline or args.append or args.backend != 'pandas' or \
+                partitions.is_partitioned(args.input) or period != (None, None):
+            parser.error("--shard-workers applies to in-memory runs over one CSV "
+                         "(partitioned input has --ingest-workers)")
+    if args.cost_table:
+        if args.backend == 'duckdb':
+            parser.error("--cost-table is not supported with --backend duckdb")
+        try:
+            costs.activate(costs.load_cost_table(args.cost_table))
+        except (FileNotFoundError, ValueError) as e:
+            parser.error(f"--cost-table: {e}")
+
+    run = Run(raw_path=args.input, period=period, ingest_workers=args.ingest_workers,
+              backend=args.backend, shard_workers=args.shard_workers, store=args.store,
+              stream=args.stream or args.pipeline, pipeline=args.pipeline,
+              append=args.append, chunksize=args.chunksize,
+              use_cache=not args.no_cache, chart_workers=args.chart_workers,
+              skip_unchanged_charts=args.skip_unchanged_charts,
+              excel_engine=args.excel_engine, clean_data=args.clean_data)
+
+    profiler = profiling.Profiler(args.profile) if args.profile else None
+    profiling.activate(profiler)
+
+    report.print_banner()
+    try:
+        if args.preview:
+            result = preview.preview(args.input, args.sample_rows, period, args.confidence, args.seed)
+            report.print_preview(result)
+            run.done.append('preview')
+        else:
+            run_stages(run, args.only,
+                       after=functools.partial(report.print_stage, show_memory=args.memory_report))
+    except (FileNotFoundError, partitions.EmptySelection, incremental.AlreadyApplied,
+            incremental.CostModelChanged) as e:
+        sys.exit(f"✗ {e}")
+    finally:
+        profiling.activate(None)
+        costs.activate(None)
+        if profiler is not None:
+            profiler.stop()
+
+    if profiler is not None:
+        paths = profiler.write(PROFILE_DIR, meta={'argv': sys.argv[1:] if argv is None else list(argv),
+                                                  'stages': run.done})
+        report.print_profile(profiler.table(), paths)
+    return run
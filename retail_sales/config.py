@@ -0,0 +1,14 @@
+"""Default file locations shared by the analysis script and its helpers."""
+
+RAW_PATH       = 'data/retail_sales_raw.csv'
+CLEAN_CSV_PATH = 'outputs/retail_sales_clean.csv'
+REJECTED_PATH  = 'outputs/rejected_rows.csv'
+QUALITY_PATH   = 'outputs/quality_report.json'
+OUTPUT_PATH    = 'outputs/Sales_Analysis_Report.xlsx'
+CACHE_DIR      = 'outputs/.cache/'
+STATE_PATH     = 'outputs/.state/aggregates.pkl'
+CHART_DIR      = 'charts/'
+PROFILE_DIR    = 'outputs/profile/'
+DUCKDB_TEMP_DIR = 'outputs/.duckdb/'   # spill space for the duckdb backend
+
+DEFAULT_CHUNKSIZE = 250_000
@@ -0,0 +1,155 @@
+"""
+Cost model behind Step 2.3's cost, profit and profit_margin columns.
+
+By default an order costs a fixed share of its revenue per category
+(COST_PCT). ``load_cost_table`` reads real per-SKU costs instead: a CSV or
+Parquet file keyed by product_id with
+
+* ``cost_pct``  - cost as a share of revenue, and/or
+* ``unit_cost`` - cost per unit sold (times quantity),
+* ``effective_from`` (optional) - the first order date a row applies to; a
+  product can have several rows, each valid until the next one starts.
+
+Orders of products (or dates) the table does not cover fall back to the
+category share. The lookup runs on integer codes: product_id codes map to
+table rows once per distinct product, and (row, date) pairs are resolved by a
+single ``searchsorted`` over packed int64 keys, so no string join or merge
+touches the order rows.
+
+``activate(model)`` makes a model the one Step 2.3 uses (like
+profiling.activate); ``fingerprint()`` identifies it, so cached clean data
+and stored aggregates built with other costs are not mixed in.
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+# Assumed cost as a share of revenue, per category
+COST_PCT = {
+    'Electronics': 0.65,
+    'Furniture':   0.60,
+    'Books':       0.50,
+    'Accessories': 0.45,
+    'Stationery':  0.40,
+}
+
+_PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+
+class CostModel:
+    """Per-order cost: a product table (optionally dated) over the category shares."""
+
+    def __init__(self, table=None, source=None):
+        self.source = source
+        self._table = None
+        if table is not None:
+            self._prepare(table)
+
+    @property
+    def is_default(self):
+        return self._table is None
+
+    def _prepare(self, table):
+        if 'product_id' not in table.columns or not {'cost_pct', 'unit_cost'} & set(table.columns):
+            raise ValueError("cost table needs a product_id column and cost_pct and/or unit_cost")
+        t = pd.DataFrame({'product_id': table['product_id'].astype(str)})
+        for col in ('cost_pct', 'unit_cost'):
+            t[col] = pd.to_numeric(table[col]) if col in table.columns else 0.0
+        if (t[['cost_pct', 'unit_cost']] < 0).any().any():
+            raise ValueError("cost table has negative costs")
+        t[['cost_pct', 'unit_cost']] = t[['cost_pct', 'unit_cost']].fillna(0.0)
+        if 'effective_from' in table.columns:
+            t['effective_from'] = pd.to_datetime(table['effective_from']).fillna(pd.Timestamp.min)
+        else:
+            t['effective_from'] = pd.Timestamp.min
+        t['effective_from'] = t['effective_from'].astype('datetime64[us]')
+        if t.duplicated(['product_id', 'effective_from']).any():
+            raise ValueError("cost table lists a product_id twice for the same effective_from")
+
+        t = t.sort_values(['product_id', 'effective_from'], ignore_index=True)
+        self._table    = t
+        self._products = pd.Index(t['product_id'].unique())
+        self._row_product = self._products.get_indexer(t['product_id'])
+        self._row_start   = t['effective_from'].to_numpy().view(np.int64)
+        self._cost_pct    = t['cost_pct'].to_numpy(dtype=float)
+        self._unit_cost   = t['unit_cost'].to_numpy(dtype=float)
+
+    def fingerprint(self):
+        """Short hash of the model: the category shares, or the whole product table."""
+        h = hashlib.blake2b(digest_size=8)
+        h.update(repr(sorted(COST_PCT.items())).encode())
+        if self._table is not None:
+            h.update(self._table.to_csv(index=False).encode())
+        return h.hexdigest()
+
+    def cost(self, df):
+        """Unrounded cost of every order in ``df`` as a float array."""
+        cost = _codes_lookup(df['category'], COST_PCT)
+        cost *= df['revenue'].to_numpy(dtype=float)
+        if self._table is None:
+            return cost
+
+        # Table row per order: codes of the distinct product_ids → table
+        # products, then the latest row starting on or before the order date
+        codes, uniques = _codes(df['product_id'])
+        product = np.append(self._products.get_indexer(uniques.astype(str)), -1).take(codes)
+        dates = df['order_date'].to_numpy(dtype='datetime64[us]').view(np.int64)
+        row_key, order_key = _pack(self._row_product, self._row_start), _pack(product, dates)
+        row = np.maximum(np.searchsorted(row_key, order_key, side='right') - 1, 0)
+        hit = (product >= 0) & (self._row_product.take(row) == product) & (row_key.take(row) <= order_key)
+
+        revenue  = df['revenue'].to_numpy(dtype=float)
+        quantity = df['quantity'].to_numpy(dtype=float)
+        table_cost = revenue * self._cost_pct.take(row) + quantity * self._unit_cost.take(row)
+        return np.where(hit, table_cost, cost)
+
+
+# Table product numbers go in the high bits of the key and days since the
+# epoch, shifted to be non-negative, in the low bits
+_DAY_BITS = 25
+_DAY_BIAS = np.int64(1) << (_DAY_BITS - 1)
+_US_PER_DAY = 86_400 * 1_000_000
+
+
+def _pack(product, dates):
+    days = np.clip(np.asarray(dates, dtype=np.int64) // _US_PER_DAY, -_DAY_BIAS, _DAY_BIAS - 1)
+    return (np.asarray(product, dtype=np.int64) << _DAY_BITS) | (days + _DAY_BIAS)
+
+
+def _codes(values):
+    """Integer codes (-1 for missing) and the distinct values behind them."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+
+def _codes_lookup(values, mapping):
+    """``values.map(mapping)`` as a float array, looked up once per distinct value."""
+    codes, uniques = _codes(values)
+    return np.array([mapping.get(v, np.nan) for v in uniques] + [np.nan]).take(codes)
+
+
+def load_cost_table(path):
+    """CostModel from a CSV or Parquet cost table (see the module docstring)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"no cost table at {path}")
+    if path.endswith(_PARQUET_SUFFIXES):
+        table = pd.read_parquet(path)
+    else:
+        table = pd.read_csv(path, dtype={'product_id': str})
+    return CostModel(table, source=path)
+
+
+_active = CostModel()
+
+
+def activate(model):
+    """Make ``model`` the cost model Step 2.3 uses (None: back to the category shares)."""
+    global _active
+    _active = model if model is not None else CostModel()
+
+
+def active():
+    return _active
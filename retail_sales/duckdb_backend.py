@@ -0,0 +1,358 @@
+"""
+DuckDB execution backend: Sections 1-4 as SQL over the raw CSV or Parquet.
+
+The pandas path stays the default. With ``--backend duckdb`` the load, clean
+and aggregate stages are one embedded-SQL job instead:
+
+* the raw files are read by DuckDB's parallel CSV/Parquet scanner and checked
+  against the same SCHEMA as ``schema.apply_schema``, with the same reject
+  reasons, into a typed table (spilled to DUCKDB_TEMP_DIR when it does not
+  fit in memory),
+* the Section 2 steps are a view over that table - the same date parts, fills
+  and rounding as retail_sales.cleaning,
+* every GROUPING_SETS table and the KPI totals come from one ``GROUP BY
+  GROUPING SETS`` query (plus small GROUP BYs for the daily series and, when
+  asked for, one for the aggregate-store cuboid), split into the same
+  partial aggregates the pandas engine builds, so ``finalize_tables`` and
+  everything downstream of it (Pareto, charts, export, --append state) are
+  shared.
+
+The result is a StreamResult, as in --stream mode. ``check_conformance``
+runs both backends on one input and asserts the tables match; it is behind
+``python -m retail_sales.duckdb_backend --check [PATH]``.
+
+duckdb is optional and only imported by ``scan``: without it ``available()``
+is False and the CLI refuses ``--backend duckdb``.
+"""
+import argparse
+import importlib.util
+import os
+
+import pandas as pd
+
+from . import costs, partitions, profiling
+from .aggregates import (DAILY_MEASURES, GROUPING_SETS, MEASURES, STORE_GRAIN, STORE_MEASURES,
+                         assert_tables_equal, compute_tables, finalize_tables)
+from .cleaning import DATE_PARTS, HIGH_DISCOUNT, TIER_BINS, TIER_LABELS, clean
+from .config import DUCKDB_TEMP_DIR, RAW_PATH
+from .costs import COST_PCT
+from .schema import DATE_FORMAT, SCHEMA, discard_rejected, load_typed
+from .streaming import StreamResult
+from .timeseries import SERIES_DIMS
+
+try:
+    import pyarrow as pa                 # faster result transfer, optional
+except ImportError:
+    pa = None
+
+_SQL_TYPES = {'str': 'VARCHAR', 'category': 'VARCHAR', 'datetime64': 'DATE',
+              'int8': 'INTEGER', 'float32': 'FLOAT', 'float64': 'DOUBLE'}
+
+# Measures behind the KPI partials, on top of the per-table MEASURES
+_KPI_MEASURES = {
+    'rows':       'COUNT(*)',
+    'returned_n': 'COUNT(is_returned)',
+    'discounted': 'COUNT(*) FILTER (discount_pct > 0)',
+}
+
+# Index of aggregates.kpi_partials()
+_KPI_PARTIALS = ['rows', 'revenue', 'revenue_n', 'profit', 'units', 'margin_sum', 'margin_n',
+                 'returned', 'returned_n', 'discounted']
+
+_CLEAN_COLUMNS = list(SCHEMA) + DATE_PARTS + ['cost', 'profit', 'profit_margin',
+                                              'order_value_tier', 'is_high_discount']
+
+
+def available():
+    """Whether duckdb is installed, without importing it (pandas runs never pay for that)."""
+    return importlib.util.find_spec('duckdb') is not None
+
+
+def _q(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _lit(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _rnd(expr):
+    """``expr`` rounded to 2 decimals the way pandas .round(2) does (half to even)."""
+    return f"(round_even(({expr}) * 100, 0) / 100)"
+
+
+def _scan(files):
+    paths = '[' + ', '.join(_lit(os.path.abspath(p)) for p in files) + ']'
+    if files[0].endswith('.parquet'):
+        return f"read_parquet({paths}, union_by_name = true)"
+    return f"read_csv({paths}, header = true, all_varchar = true, union_by_name = true)"
+
+
+def _typed_sql(files, span):
+    """SELECT of every SCHEMA column cast to its type, plus the reject reason (or NULL).
+
+    Each raw value is parsed once (numbers as DOUBLE, so the integer and
+    range checks see what was written); the raw text is only kept for
+    rejected rows, for the rejected-rows CSV.
+    """
+    numeric = [col for col, spec in SCHEMA.items() if spec.dtype.startswith(('int', 'float'))]
+    parsed = {}
+    for col, spec in SCHEMA.items():
+        if col == 'order_date' and files[0].endswith('.parquet'):
+            parsed[col] = f"TRY_CAST({_q(col)} AS DATE)"
+        elif col == 'order_date':
+            parsed[col] = f"CAST(TRY_STRPTIME({_q(col)}, {_lit(DATE_FORMAT)}) AS DATE)"
+        else:
+            parsed[col] = f"TRY_CAST({_q(col)} AS {'DOUBLE' if col in numeric else 'VARCHAR'})"
+
+    # One WHEN per apply_schema check, in the same order: first reason wins
+    checks = [("raw_order_date IS NOT NULL AND order_date IS NULL", "order_date: not a date")]
+    for col, spec in SCHEMA.items():
+        value = _q(col)
+        if col in numeric:
+            checks.append((f"{_q('raw_' + col)} IS NOT NULL AND {value} IS NULL", f"{col}: not a number"))
+        if not spec.nullable:
+            checks.append((f"{value} IS NULL", f"{col}: missing"))
+        if spec.dtype.startswith('int'):
+            checks.append((f"{value} % 1 <> 0", f"{col}: not an integer"))
+        if spec.min is not None:
+            checks.append((f"{value} < {spec.min}", f"{col}: below {spec.min}"))
+        if spec.max is not None:
+            checks.append((f"{value} > {spec.max}", f"{col}: above {spec.max}"))
+    reason = "CASE " + " ".join(f"WHEN {cond} THEN {_lit(why)}" for cond, why in checks) + " END"
+
+    where = []
+    first, last = span
+    if first is not None:
+        where.append(f"order_date >= DATE {_lit(first.start_time.date())}")
+    if last is not None:
+        where.append(f"order_date <= DATE {_lit(last.end_time.date())}")
+
+    read = ', '.join([f"{expr} AS {_q(col)}" for col, expr in parsed.items()] +
+                     [f"CAST({_q(col)} AS VARCHAR) AS {_q('raw_' + col)}" for col in SCHEMA])
+    typed = ', '.join([f"TRY_CAST({_q(col)} AS {_SQL_TYPES[spec.dtype]}) AS {_q(col)}"
+                       for col, spec in SCHEMA.items()] +
+                      [f"CASE WHEN reject_reason IS NOT NULL THEN {_q('raw_' + col)} END AS {_q('raw_' + col)}"
+                       for col in SCHEMA])
+    return f"""
+        WITH parsed AS (SELECT {read} FROM {_scan(files)}),
+             checked AS (SELECT *, {reason} AS reject_reason FROM parsed
+                         {'WHERE ' + ' AND '.join(where) if where else ''})
+        SELECT {typed}, reject_reason FROM checked"""
+
+
+def _clean_sql():
+    """Section 2 (cleaning.clean) as a SELECT over the valid rows of ``typed``."""
+    cost_pct = "CASE category " + " ".join(
+        f"WHEN {_lit(cat)} THEN {pct}" for cat, pct in COST_PCT.items()) + " END"
+    tiers = "CASE " + " ".join(
+        f"WHEN revenue > {lo} AND revenue <= {hi} THEN {_lit(label)}"
+        for lo, hi, label in zip(TIER_BINS, TIER_BINS[1:], TIER_LABELS) if hi != float('inf')
+    ) + f" WHEN revenue > {TIER_BINS[-2]} THEN {_lit(TIER_LABELS[-1])} END"
+    parts = {
+        'year':          "year(order_date)",
+        'month':         "month(order_date)",
+        'month_name':    "strftime(order_date, '%b')",
+        'quarter':       "quarter(order_date)",
+        'quarter_label': "'Q' || quarter(order_date)",
+        'day_of_week':   "dayname(order_date)",
+        'week_of_year':  "weekofyear(order_date)",
+        'year_month':    "strftime(order_date, '%Y-%m')",
+    }
+    fills = {'city': "COALESCE(city, 'Unknown')", 'state': "COALESCE(state, 'Unknown')",
+             'discount_pct': "COALESCE(discount_pct, 0)"}
+    base = ', '.join(f"{fills.get(col, _q(col))} AS {_q(col)}" for col in SCHEMA)
+    dated = ', '.join(f"{parts[col]} AS {_q(col)}" for col in DATE_PARTS)
+    return f"""
+        WITH filled AS (
+            SELECT {base}, {dated}, {_rnd(f'revenue * ({cost_pct})')} AS cost
+            FROM typed WHERE reject_reason IS NULL
+        ), profit AS (
+            SELECT *, {_rnd('revenue - cost')} AS profit FROM filled
+        )
+        SELECT *, {_rnd('(profit / NULLIF(revenue, 0)) * 100')} AS profit_margin,
+               {tiers} AS order_value_tier,
+               CAST(discount_pct > {HIGH_DISCOUNT} AS INTEGER) AS is_high_discount
+        FROM profit"""
+
+
+def _measure_sql(col, how):
+    if how == 'count':
+        return f"COUNT({_q(col)})"
+    if SCHEMA.get(col, SCHEMA['revenue']).dtype.startswith('int'):
+        return f"CAST(SUM({_q(col)}) AS BIGINT)"        # SUM of integers is HUGEINT
+    return f"SUM({_q(col)})"
+
+
+# Key dtypes of the pandas partials (``.dt`` parts are int32); other keys are categoricals
+_KEY_DTYPES = {'year': 'int32', 'month': 'int32', 'quarter': 'int32', 'week_of_year': 'int64',
+               'is_high_discount': 'int64', 'order_date': 'datetime64[us]'}
+_FILLED = {'city': 'Unknown', 'state': 'Unknown'}
+
+
+def _as_pandas_keys(frame, cols):
+    """Cast key columns to the dtypes the pandas engine produces, so tables compare equal.
+
+    Categories are sorted, except that a fill value added by
+    ``cleaning.fill_missing`` comes last, as ``add_categories`` leaves it.
+    """
+    for col in cols:
+        if col in _KEY_DTYPES:
+            frame[col] = frame[col].astype(_KEY_DTYPES[col])
+            continue
+        values = sorted(frame[col].dropna().unique())
+        if col in _FILLED and _FILLED[col] in values:
+            values.remove(_FILLED[col])
+            values.append(_FILLED[col])
+        frame[col] = pd.Categorical(frame[col], categories=values)
+    return frame
+
+
+def _fetch(con, sql):
+    """Run ``sql`` and return a DataFrame; text columns come back as categoricals via Arrow."""
+    result = con.execute(sql)
+    if pa is None:
+        return result.df()
+    return result.to_arrow_table().to_pandas(strings_to_categorical=True)
+
+
+def _grouping_sets(con):
+    """Every GROUPING_SETS table plus the KPI totals from one GROUPING SETS query."""
+    sets = dict(GROUPING_SETS, kpis=[])
+    keys = list(dict.fromkeys(k for cols in sets.values() for k in cols))
+    select = [f"{_measure_sql(col, how)} AS {_q(name)}" for name, (col, how) in STORE_MEASURES.items()]
+    select += [f"{expr} AS {_q(name)}" for name, expr in _KPI_MEASURES.items()]
+    group_sets = ', '.join('(' + ', '.join(_q(k) for k in cols) + ')' for cols in sets.values())
+    result = con.execute(f"""
+        SELECT {', '.join(_q(k) for k in keys)}, GROUPING({', '.join(_q(k) for k in keys)}) AS gid,
+               {', '.join(select)}
+        FROM clean GROUP BY GROUPING SETS ({group_sets})""").df()
+
+    partials = {}
+    for name, cols in sets.items():
+        # GROUPING() sets a bit for every key *not* in the set, first key highest
+        gid = sum(1 << (len(keys) - 1 - i) for i, k in enumerate(keys) if k not in cols)
+        rows = result[result['gid'] == gid]
+        if name == 'kpis':
+            partials['kpis'] = rows.iloc[0][_KPI_PARTIALS].astype(float).fillna(0).rename(None)
+            continue
+        frame = _as_pandas_keys(rows[cols + list(MEASURES)].reset_index(drop=True), cols)
+        # set_index would widen int32 keys to int64
+        index = (pd.MultiIndex.from_arrays([frame[c] for c in cols]) if len(cols) > 1
+                 else pd.Index(frame[cols[0]]))
+        partials[name] = frame[list(MEASURES)].set_axis(index).sort_index()
+    return partials
+
+
+def _store_cuboid(con):
+    """``aggregates.store_cuboid`` as a GROUP BY; about as many cells as rows, so
+    it is a query of its own rather than one more, mostly-NULL grouping set."""
+    select = [f"{_measure_sql(col, how)} AS {_q(name)}" for name, (col, how) in STORE_MEASURES.items()]
+    keys = ', '.join(_q(k) for k in STORE_GRAIN)
+    cuboid = _fetch(con, f"SELECT {keys}, {', '.join(select)} FROM clean GROUP BY {keys}")
+    return _as_pandas_keys(cuboid, STORE_GRAIN)
+
+
+def _daily_totals(con):
+    """``aggregates.daily_partials``: one small GROUP BY day and value per series dimension."""
+    select = ', '.join(f"{_measure_sql(col, how)} AS {_q(name)}"
+                       for name, (col, how) in DAILY_MEASURES.items())
+    daily = {}
+    for dim in SERIES_DIMS:
+        frame = _fetch(con, f"SELECT order_date, {_q(dim)}, {select} FROM clean "
+                            f"WHERE {_q(dim)} IS NOT NULL GROUP BY ALL ORDER BY ALL")
+        daily[dim] = _as_pandas_keys(frame, ['order_date', dim])
+    return daily
+
+
+def scan(source, span=(None, None), clean_csv_path=None, rejected_csv_path=None,
+         temp_dir=DUCKDB_TEMP_DIR, store=False):
+    """Load, clean and aggregate ``source`` in DuckDB; returns a StreamResult.
+
+    ``source`` is a CSV or Parquet file, or a directory/glob of them; year=/
+    month= partitions outside ``span`` are skipped as in partitions.ingest.
+    Cleaned rows go to ``clean_csv_path`` and rejected rows (with their
+    reason) to ``rejected_csv_path``, if given. ``store`` also builds the
+    aggregate-store cuboid.
+    """
+    if not available():
+        raise RuntimeError("the duckdb backend needs the 'duckdb' package (pip install duckdb)")
+    import duckdb                        # only here: loading it is a noticeable part of startup
+    if not costs.active().is_default:
+        raise ValueError("the duckdb backend only supports the category cost shares, not a cost table")
+    files, _ = partitions.prune(partitions.discover(source, ('.csv', '.parquet')), span)
+    if not files:
+        raise partitions.EmptySelection(f"every partition of {source} is outside the requested period")
+
+    os.makedirs(temp_dir, exist_ok=True)
+    con = duckdb.connect(config={'temp_directory': os.path.abspath(temp_dir)})
+    try:
+        with profiling.step('1.1 load') as info:
+            con.execute(f"CREATE TEMP TABLE typed AS {_typed_sql([p.path for p in files], span)}")
+            con.execute(f"CREATE TEMP VIEW clean AS {_clean_sql()}")
+            stats = con.execute("""
+                SELECT COUNT(*) FILTER (reject_reason IS NULL),
+                       COUNT(*) FILTER (reject_reason IS NOT NULL),
+                       COUNT(*) FILTER (reject_reason IS NULL AND city IS NULL),
+                       COUNT(*) FILTER (reject_reason IS NULL AND discount_pct IS NULL),
+                       MIN(order_date) FILTER (reject_reason IS NULL),
+                       MAX(order_date) FILTER (reject_reason IS NULL)
+                FROM typed""").fetchone()
+            rows, rejected, missing_city, missing_disc, min_date, max_date = stats
+            info['rows'] = rows + rejected
+        if not rows:
+            raise partitions.EmptySelection(f"no valid orders in {source} for the requested period")
+
+        if rejected and rejected_csv_path is not None:
+            raw = ', '.join(f"{_q('raw_' + c)} AS {_q(c)}" for c in SCHEMA)
+            con.execute(f"COPY (SELECT {raw}, reject_reason FROM typed WHERE reject_reason IS NOT NULL) "
+                        f"TO {_lit(rejected_csv_path)} (HEADER, DELIMITER ',')")
+        elif not rejected:
+            discard_rejected(rejected_csv_path)
+
+        with profiling.step('4.1 grouping sets', rows=rows):
+            partials = _grouping_sets(con)
+        with profiling.step('4.1 daily totals', rows=rows):
+            partials['daily'] = _daily_totals(con)
+        if store:
+            with profiling.step('4.1 store cuboid', rows=rows):
+                partials['cuboid'] = _store_cuboid(con)
+
+        if clean_csv_path is not None:
+            with profiling.step('7 clean csv', rows=rows):
+                con.execute(f"COPY (SELECT {', '.join(_q(c) for c in _CLEAN_COLUMNS)} FROM clean) "
+                            f"TO {_lit(clean_csv_path)} (HEADER, DELIMITER ',')")
+    finally:
+        con.close()
+
+    with profiling.step('4.4 finalize tables'):
+        tables = finalize_tables(partials)
+    return StreamResult(tables, partials, rows, rejected, len(SCHEMA), missing_city,
+                        missing_disc, pd.Timestamp(min_date), pd.Timestamp(max_date))
+
+
+def check_conformance(source=RAW_PATH, atol=0.01):
+    """Assert the DuckDB and pandas backends build the same tables from ``source``.
+
+    Returns the number of tables compared; raises AssertionError on a mismatch.
+    """
+    loaded = load_typed(source)
+    df_clean, _, _ = clean(loaded.df)
+    expected = compute_tables(df_clean)
+    actual = scan(source).tables
+    assert_tables_equal(expected, actual, atol=atol)
+    return len(expected)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DuckDB backend checks.")
+    parser.add_argument('--check', nargs='?', const=RAW_PATH, metavar='CSV',
+                        help="compare the DuckDB tables with the pandas ones (default: %(const)s)")
+    args = parser.parse_args(argv)
+    if args.check:
+        n = check_conformance(args.check)
+        print(f"✓ DuckDB and pandas backends agree on all {n} tables for {args.check}")
+
+
+if __name__ == '__main__':
+    main()
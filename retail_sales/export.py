@@ -0,0 +1,180 @@
+"""
+Section 7 Excel report writer.
+
+``pd.DataFrame.to_excel`` through openpyxl builds a Python object for every
+cell of the workbook before saving, which is fine for the summary sheets but
+dominates run time and memory once Clean_Data has hundreds of thousands of
+rows. ``write_report`` offers:
+
+* engine='stream': rows are written in order and flushed as they go -
+  xlsxwriter in ``constant_memory`` mode, or openpyxl's write-only mode if
+  xlsxwriter is not installed. Memory stays flat regardless of row count.
+  (pandas writes cells column by column, which constant_memory cannot
+  accept, so this path formats the rows itself.)
+* engine='openpyxl': the original ``to_excel`` path.
+* engine='auto' (default): 'stream' once any sheet has STREAM_THRESHOLD rows.
+
+Any sheet longer than Excel's 1,048,576-row limit is split into
+``<name>``, ``<name>_2``, ... automatically, and the raw-data sheet can be
+replaced by a hyperlink to the clean CSV (``clean_data_mode='link'``).
+"""
+import os
+
+import pandas as pd
+
+from . import profiling
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+EXCEL_MAX_ROWS   = 1_048_576                 # including the header row
+STREAM_THRESHOLD = 100_000
+_ROW_BATCH       = 50_000                    # rows converted to Python objects at a time
+_DATE_FORMAT     = 'yyyy-mm-dd hh:mm:ss'     # same as pandas' default
+
+
+def kpi_summary(kpis):
+    """The KPI_Summary sheet: one formatted row per headline KPI."""
+    return pd.DataFrame({
+        'Metric': [
+            'Total Revenue (₹)', 'Total Orders', 'Total Profit (₹)',
+            'Avg Order Value (₹)', 'Avg Profit Margin (%)',
+            'Total Units Sold', 'Return Rate (%)', 'Orders with Discount (%)'
+        ],
+        'Value': [
+            f"₹{kpis['total_revenue']:,.0f}", f"{kpis['total_orders']:,}", f"₹{kpis['total_profit']:,.0f}",
+            f"₹{kpis['avg_order_value']:,.2f}", f"{kpis['avg_margin']:.1f}%",
+            f"{kpis['total_units']:,}", f"{kpis['return_rate']:.1f}%", f"{kpis['discount_rate']:.1f}%"
+        ]
+    })
+
+
+def split_sheets(name, df, max_rows=EXCEL_MAX_ROWS):
+    """Yield (sheet name, slice) pairs that each fit under ``max_rows``."""
+    per_sheet = max_rows - 1
+    if len(df) <= per_sheet:
+        yield name, df
+        return
+    for part, start in enumerate(range(0, len(df), per_sheet), start=1):
+        yield (name if part == 1 else f"{name}_{part}"[:31]), df.iloc[start:start + per_sheet]
+
+
+def _rows(df, index):
+    """Header row, then data rows as lists of plain Python values (NaN → None)."""
+    frame = df.reset_index() if index else df
+    yield [str(c) for c in frame.columns]
+    for start in range(0, len(frame), _ROW_BATCH):
+        batch = frame.iloc[start:start + _ROW_BATCH].astype(object)
+        yield from batch.where(batch.notna(), None).to_numpy().tolist()
+
+
+# ─── Streaming backends ──────────────────────────────────────────
+class _XlsxWriterBook:
+    def __init__(self, path):
+        self.book = xlsxwriter.Workbook(path, {'constant_memory': True,
+                                               'default_date_format': _DATE_FORMAT})
+        self.header = self.book.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+
+    def write_frame(self, sheet_name, df, index):
+        ws = self.book.add_worksheet(sheet_name)
+        for r, row in enumerate(_rows(df, index)):
+            ws.write_row(r, 0, row, self.header if r == 0 else None)
+
+    def write_link(self, sheet_name, target, text, note):
+        ws = self.book.add_worksheet(sheet_name)
+        ws.write_url(0, 0, 'external:' + target, string=text)   # local file, not a web URL
+        ws.write_string(1, 0, note)
+
+    def close(self):
+        self.book.close()
+
+
+class _OpenpyxlWriteOnlyBook:
+    def __init__(self, path):
+        from openpyxl import Workbook
+        self.path = path
+        self.book = Workbook(write_only=True)
+
+    def write_frame(self, sheet_name, df, index):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        ws = self.book.create_sheet(sheet_name)
+        for r, row in enumerate(_rows(df, index)):
+            if r == 0:
+                row = [WriteOnlyCell(ws, value=v) for v in row]
+                for cell in row:
+                    cell.font = Font(bold=True)
+            ws.append(row)
+
+    def write_link(self, sheet_name, target, text, note):
+        from openpyxl.cell import WriteOnlyCell
+        ws = self.book.create_sheet(sheet_name)
+        cell = WriteOnlyCell(ws, value=text)
+        cell.hyperlink = target
+        ws.append([cell])
+        ws.append([note])
+
+    def close(self):
+        self.book.save(self.path)
+
+
+class _PandasBook:
+    def __init__(self, path):
+        self.writer = pd.ExcelWriter(path, engine='openpyxl')
+
+    def write_frame(self, sheet_name, df, index):
+        df.to_excel(self.writer, sheet_name=sheet_name, index=index)
+
+    def write_link(self, sheet_name, target, text, note):
+        pd.DataFrame({text: [note]}).to_excel(self.writer, sheet_name=sheet_name, index=False)
+        self.writer.sheets[sheet_name]['A1'].hyperlink = target
+
+    def close(self):
+        self.writer.close()
+
+
+def _open(path, engine):
+    if engine == 'stream':
+        return _XlsxWriterBook(path) if xlsxwriter is not None else _OpenpyxlWriteOnlyBook(path)
+    if engine == 'openpyxl':
+        return _PandasBook(path)
+    raise ValueError(f"unknown Excel engine {engine!r}")
+
+
+def write_report(path, sheets, clean_data=None, clean_data_mode='sheet',
+                 clean_csv_path=None, engine='auto'):
+    """Write the Excel report and return the list of sheet names written.
+
+    ``sheets`` is a list of (sheet name, DataFrame, write index?) in order.
+    ``clean_data`` is written first as Clean_Data when ``clean_data_mode`` is
+    'sheet'; 'link' writes a Clean_Data sheet holding a hyperlink to
+    ``clean_csv_path`` instead, and 'none' leaves it out.
+    """
+    big = max([len(df) for _, df, _ in sheets] + [len(clean_data) if clean_data is not None else 0])
+    if engine == 'auto':
+        engine = 'stream' if big >= STREAM_THRESHOLD else 'openpyxl'
+
+    book, written = _open(path, engine), []
+    try:
+        if clean_data_mode == 'sheet' and clean_data is not None:
+            for name, part in split_sheets('Clean_Data', clean_data):
+                with profiling.step(f"7 sheet {name}", rows=len(part)):
+                    book.write_frame(name, part, index=False)
+                written.append(name)
+        elif clean_data_mode == 'link' and clean_csv_path is not None:
+            target = os.path.relpath(clean_csv_path, os.path.dirname(os.path.abspath(path)))
+            book.write_link('Clean_Data', target, f"Clean data: {target}",
+                            "Row-level data is kept outside the workbook; open the linked file.")
+            written.append('Clean_Data')
+
+        for sheet_name, df, index in sheets:
+            for name, part in split_sheets(sheet_name, df):
+                with profiling.step(f"7 sheet {name}", rows=len(part)):
+                    book.write_frame(name, part, index=index)
+                written.append(name)
+    finally:
+        with profiling.step('7 save workbook'):
+            book.close()
+    return written
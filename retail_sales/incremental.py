@@ -0,0 +1,128 @@
+"""
+Incremental refresh: fold a file of new orders into stored aggregates.
+
+Every full run saves its partial aggregates (per-group sums and counts, with
+means kept as sum/count pairs) to STATE_PATH. ``append`` then loads that
+state, cleans and aggregates only the new file, merges the two and saves the
+result. Derived values - revenue shares, mom_growth, yoy growth, ranks and
+the Pareto shares built from them - are recomputed from the merged sums by
+``finalize_tables``, so a daily refresh costs O(new rows), not O(history).
+The daily series behind the rolling-window metrics (retail_sales.timeseries)
+is stored alongside and only has the new days folded in. The aggregate-store
+cuboid (retail_sales.store) grows with the history, so it is only merged
+when asked for with ``store``; otherwise a stored one, which the new orders
+would make stale, is dropped.
+
+Each applied file is recorded by content hash, so feeding the same file
+twice is refused instead of double-counting its orders. The state also
+records which cost model (retail_sales.costs) its profits were computed
+with, and new orders costed by a different one are refused.
+"""
+import datetime
+import os
+
+import pandas as pd
+
+from . import costs, profiling, timeseries
+from .aggregates import finalize_tables, merge_partials
+from .cache import content_hash
+from .cleaning import CLEANING_VERSION
+from .config import DEFAULT_CHUNKSIZE, STATE_PATH
+from .streaming import stream_tables
+
+
+class AlreadyApplied(Exception):
+    """The new-orders file was already folded into the stored aggregates."""
+
+
+class CostModelChanged(Exception):
+    """The active cost model differs from the one the stored aggregates were built with."""
+
+
+class AppendResult:
+    """Outcome of one ``append``: the new rows' StreamResult plus history info."""
+
+    def __init__(self, stream, series, history_rows, previous_max_date):
+        self.stream       = stream
+        self.tables       = stream.tables          # covers history + new rows
+        self.series       = series                 # timeseries.DailySeries per dimension
+        self.history_rows = history_rows
+        # Orders dated on/before the previous high-water mark are still
+        # counted, but flagged: they usually mean a late or re-sent export
+        self.late = stream.min_date <= previous_max_date
+
+
+def save_state(partials, rows, max_date, applied=None, series=None, path=STATE_PATH):
+    """Persist partial aggregates, daily series and the bookkeeping ``append`` needs."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    pd.to_pickle({
+        'cleaning_version': CLEANING_VERSION,
+        'cost_model':       costs.active().fingerprint(),
+        'partials':         partials,
+        'rows':             int(rows),
+        'max_date':         pd.Timestamp(max_date),
+        'applied':          applied or {},
+        'series':           series,
+    }, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_state(path=STATE_PATH):
+    """Return the stored state dict, or None if there is no usable state."""
+    if not os.path.exists(path):
+        return None
+    state = pd.read_pickle(path)
+    if state.get('cleaning_version') != CLEANING_VERSION:
+        return None                      # aggregates were built by older cleaning logic
+    return state
+
+
+def append(new_path, state_path=STATE_PATH, chunksize=DEFAULT_CHUNKSIZE,
+           clean_csv_path=None, rejected_csv_path=None, store=False):
+    """Fold the orders in ``new_path`` into the stored aggregates.
+
+    Returns an AppendResult whose ``tables`` cover the full history. Cleaned
+    new rows are appended to ``clean_csv_path`` if given. With ``store`` the
+    new orders are also merged into the stored aggregate-store cuboid.
+    """
+    state = load_state(state_path)
+    if state is None:
+        raise FileNotFoundError(
+            f"no stored aggregates at {state_path} - run a full analysis first")
+
+    digest = content_hash(new_path)
+    if digest in state['applied']:
+        raise AlreadyApplied(f"{new_path} was already applied on {state['applied'][digest]['applied_at']}")
+    # States saved before cost tables existed were built with the category shares
+    if state.get('cost_model', costs.CostModel().fingerprint()) != costs.active().fingerprint():
+        raise CostModelChanged(f"the aggregates in {state_path} were built with a different cost model "
+                               "- re-run the full analysis to switch cost tables")
+
+    # The new rows are aggregated on their own first: the daily series only
+    # takes their totals, not the merged history
+    result = stream_tables(new_path, chunksize, clean_csv_path=clean_csv_path,
+                           rejected_csv_path=rejected_csv_path, append_csv=True, store=store)
+    with profiling.step('4.3 merge partials'):
+        merged = merge_partials(state['partials'], result.partials)
+    series = state.get('series')
+    if series is not None:
+        timeseries.update_series(series, result.partials['daily'])
+    elif 'daily' in merged:
+        series = timeseries.build_series(merged['daily'])
+    elif 'cuboid' in state['partials']:      # state saved before the series existed
+        series = timeseries.build_series(timeseries.daily_totals(state['partials']['cuboid']))
+        timeseries.update_series(series, result.partials['daily'])
+    result.partials = merged
+    with profiling.step('4.4 finalize tables'):
+        result.tables = finalize_tables(result.partials)
+
+    applied = dict(state['applied'])
+    applied[digest] = {
+        'path':       os.path.abspath(new_path),
+        'rows':       result.rows,
+        'applied_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    save_state(result.partials, state['rows'] + result.rows,
+               max(state['max_date'], result.max_date), applied, series, state_path)
+    return AppendResult(result, series, state['rows'], state['max_date'])
@@ -0,0 +1,265 @@
+"""
+Partitioned input: a directory or glob of raw CSV exports read as one dataset.
+
+Exports usually arrive as one file per store per day, often filed in
+Hive-style folders::
+
+    data/orders/year=2024/month=03/store=Mumbai-01/2024-03-15.csv
+
+``discover`` expands a directory (searched recursively for *.csv) or a glob
+pattern into Partitions and reads ``key=value`` path segments as partition
+keys. When a report covers only part of the history (``period``, a pair of
+month Periods), ``prune`` drops partitions whose year/month keys fall outside
+it without opening them; rows of the remaining files are filtered by
+order_date, so unkeyed files are still correct, just not skipped.
+
+``ingest`` parses, cleans and aggregates each partition on a process pool
+with the same schema loader, Section 2 steps and partial aggregates as the
+streaming path. Only the small per-partition partials travel back to the
+parent, where they are merged into the usual tables; the result is a
+StreamResult, so the rest of the pipeline treats it like a --stream run.
+"""
+import functools
+import glob
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from . import costs, profiling
+from .aggregates import finalize_tables, merge_all, partial_aggregates
+from .cleaning import add_date_parts, add_derived_columns, fill_missing
+from .quality import QualityProfile, profile as quality_profile
+from .schema import discard_rejected, load_typed
+from .streaming import StreamResult
+
+
+class EmptySelection(ValueError):
+    """No partition (or no order) of the input falls inside the requested period."""
+
+
+class Partition:
+    """One input file plus the ``key=value`` pairs found in its path."""
+
+    def __init__(self, path, keys):
+        self.path = path
+        self.keys = keys
+
+    def months(self):
+        """(first, last) month Period this partition can hold, or None if unkeyed."""
+        try:
+            year = int(self.keys['year'])
+        except (KeyError, ValueError):
+            return None
+        try:
+            month = pd.Period(year=year, month=int(self.keys['month']), freq='M')
+            return month, month
+        except (KeyError, ValueError):
+            return pd.Period(year=year, month=1, freq='M'), pd.Period(year=year, month=12, freq='M')
+
+
+def is_partitioned(source):
+    """True if ``source`` names a directory or a glob pattern rather than one file."""
+    return os.path.isdir(source) or glob.has_magic(source)
+
+
+def partition_keys(path):
+    """Hive-style ``key=value`` directory segments of ``path`` as a dict."""
+    keys = {}
+    for part in os.path.normpath(os.path.dirname(path)).split(os.sep):
+        key, sep, value = part.partition('=')
+        if sep and key:
+            keys[key] = value
+    return keys
+
+
+def discover(source, suffixes=('.csv',)):
+    """Partitions under ``source`` (file, directory or glob), sorted by path.
+
+    A directory is searched recursively for files ending in ``suffixes``.
+    """
+    if os.path.isdir(source):
+        paths = [p for p in glob.glob(os.path.join(source, '**', '*'), recursive=True)
+                 if p.endswith(suffixes) and os.path.isfile(p)]
+    elif glob.has_magic(source):
+        paths = [p for p in glob.glob(source, recursive=True) if os.path.isfile(p)]
+    else:
+        paths = [source] if os.path.exists(source) else []
+    if not paths:
+        raise FileNotFoundError(f"no input files match {source}")
+    return [Partition(path, partition_keys(path)) for path in sorted(paths)]
+
+
+def period(start=None, end=None):
+    """(first, last) month Periods for --from/--to values like '2024' or '2024-03'.
+
+    A bare year means January as ``start`` and December as ``end``.
+    """
+    first = pd.Period(start, freq='M') if start else None
+    last = None
+    if end:
+        last = pd.Period(end, freq='Y').asfreq('M', 'end') if len(end) == 4 else pd.Period(end, freq='M')
+    if first is not None and last is not None and first > last:
+        raise ValueError(f"empty period: {start} is after {end}")
+    return first, last
+
+
+def prune(partitions, span):
+    """Partitions whose year/month keys overlap ``span``; returns (kept, pruned count)."""
+    first, last = span
+    kept = []
+    for p in partitions:
+        months = p.months()
+        if months is not None and ((first is not None and months[1] < first) or
+                                   (last is not None and months[0] > last)):
+            continue
+        kept.append(p)
+    return kept, len(partitions) - len(kept)
+
+
+def in_span(dates, span):
+    """Boolean Series: which ``dates`` fall inside ``span`` (open ends allowed)."""
+    first, last = span
+    keep = pd.Series(True, index=dates.index)
+    if first is not None:
+        keep &= dates >= first.start_time
+    if last is not None:
+        keep &= dates <= last.end_time
+    return keep
+
+
+def _process(path, span, clean_part_path, profile, cost_model, store):
+    """Worker: load, filter, clean and aggregate one partition.
+
+    Returns the partials plus the counts and rejected rows. ``cost_model`` is
+    the parent's active costs.CostModel, passed along because pool workers
+    start from the default one. With ``profile`` (pool workers of a profiled
+    run) the steps are timed by a Profiler of their own and returned for the
+    parent to fold into its report. ``store`` adds the aggregate-store cuboid.
+    """
+    profiler = profiling.Profiler() if profile else None
+    if profiler is not None:
+        profiling.activate(profiler)
+    try:
+        loaded = load_typed(path)
+        chunk = loaded.df
+        columns = len(chunk.columns)
+        keep = in_span(chunk['order_date'], span)
+        skipped = int((~keep).sum())
+        if skipped:
+            chunk = chunk[keep].reset_index(drop=True)
+        with profiling.step('1.2 quality profile', rows=len(chunk)):
+            quality = quality_profile(chunk)
+
+        with profiling.step('2.1 date parsing', rows=len(chunk)):
+            add_date_parts(chunk)
+        with profiling.step('2.2 null fills', rows=len(chunk)):
+            missing_city, missing_disc = fill_missing(chunk)
+        with profiling.step('2.3 derived columns', rows=len(chunk)):
+            add_derived_columns(chunk, cost_model)
+        partials = partial_aggregates(chunk, store=store) if len(chunk) else None
+
+        if clean_part_path is not None:
+            with profiling.step('7 clean csv', rows=len(chunk)):
+                chunk.to_csv(clean_part_path, index=False)
+    finally:
+        if profiler is not None:
+            profiling.activate(None)
+
+    return {
+        'partials':     partials,
+        'quality':      quality,
+        'rows':         len(chunk),
+        'skipped':      skipped,
+        'columns':      columns,
+        'rejected':     loaded.rejected,
+        'missing_city': missing_city,
+        'missing_disc': missing_disc,
+        'min_date':     chunk['order_date'].min() if len(chunk) else None,
+        'max_date':     chunk['order_date'].max() if len(chunk) else None,
+        'steps':        list(profiler.steps.values()) if profiler is not None else [],
+    }
+
+
+class IngestResult(StreamResult):
+    """StreamResult of a partitioned read, plus which files were read."""
+
+    def __init__(self, partitions, pruned, skipped, workers, **stream):
+        super().__init__(**stream)
+        self.partitions = partitions
+        self.pruned     = pruned
+        self.skipped    = skipped        # rows outside the period in files that were read
+        self.workers    = workers
+
+
+def ingest(source, span=(None, None), workers=None, clean_csv_path=None, rejected_csv_path=None,
+           store=False):
+    """Clean and aggregate every partition of ``source`` that overlaps ``span``.
+
+    ``workers`` is the process-pool size (default: one per CPU, capped at the
+    number of partitions); ``workers=1`` reads in this process. Cleaned rows
+    are written to ``clean_csv_path`` in partition order and rejected rows to
+    ``rejected_csv_path``, if given. ``store`` also builds the aggregate-store
+    cuboid.
+    """
+    partitions, pruned = prune(discover(source), span)
+    if not partitions:
+        raise EmptySelection(f"every partition of {source} is outside the requested period")
+
+    parts = [None] * len(partitions)
+    if clean_csv_path is not None:
+        parts = [f"{clean_csv_path}.part{i:05d}" for i in range(len(partitions))]
+    workers = min(workers or os.cpu_count() or 1, len(partitions))
+    # In-process partitions record straight into the active profiler
+    profile = workers > 1 and profiling.active() is not None
+    jobs = [(p.path, span, part, profile, costs.active(), store) for p, part in zip(partitions, parts)]
+
+    if workers == 1:
+        results = [_process(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_process, *zip(*jobs)))
+
+    for r in results:
+        for s in r['steps']:
+            profiling.record(s['step'], s['wall_s'], s['cpu_s'], s['rows'], s['peak_rss_mb'])
+    with profiling.step('4.3 merge partials'):
+        merged = merge_all([r['partials'] for r in results])
+    if merged is None:
+        raise EmptySelection(f"no orders in {source} fall inside the requested period")
+
+    if clean_csv_path is not None:
+        with profiling.step('7 clean csv'):
+            _concat_csv(parts, clean_csv_path)
+    rejected = [r['rejected'] for r in results if len(r['rejected'])]
+    if rejected and rejected_csv_path is not None:
+        pd.concat(rejected, ignore_index=True).to_csv(rejected_csv_path, index=False)
+    elif not rejected:
+        discard_rejected(rejected_csv_path)
+
+    with profiling.step('4.4 finalize tables'):
+        tables = finalize_tables(merged)
+    dated = [r for r in results if r['rows']]
+    return IngestResult(
+        partitions, pruned, sum(r['skipped'] for r in results), workers,
+        tables=tables, partials=merged,
+        rows=sum(r['rows'] for r in results),
+        rejected=sum(len(r['rejected']) for r in results),
+        columns=results[0]['columns'],
+        missing_city=sum(r['missing_city'] for r in results),
+        missing_disc=sum(r['missing_disc'] for r in results),
+        min_date=min(r['min_date'] for r in dated),
+        max_date=max(r['max_date'] for r in dated),
+        quality=functools.reduce(QualityProfile.merge, [r['quality'] for r in results], QualityProfile()))
+
+
+def _concat_csv(parts, path):
+    """Join per-partition CSVs into ``path``, keeping only the first header."""
+    with open(path, 'wb') as out:
+        for i, part in enumerate(parts):
+            with open(part, 'rb') as f:
+                if i:
+                    f.readline()
+                shutil.copyfileobj(f, out)
+            os.remove(part)
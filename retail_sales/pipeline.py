@@ -0,0 +1,323 @@
+"""
+The analysis as a staged pipeline: load → clean → kpis / aggregates →
+timeseries → charts → export.
+
+Each stage is a plain function of a ``Run``, which carries the options and
+everything earlier stages produced, so a caller can run any subset of them
+(``run_stages(run, ['kpis'])`` also runs the load and clean stages it needs)
+and time each one. Nothing here prints; the console report lives in
+retail_sales.report. matplotlib/seaborn are only imported when the charts
+stage actually runs, and the Excel writer only by the export stage, so
+headless callers that just want numbers start fast.
+"""
+import json
+import os
+import time
+
+from . import (aggregates, cache, duckdb_backend, incremental, partitions, profiling, quality,
+               sharding, timeseries)
+from .cleaning import add_date_parts, add_derived_columns, fill_missing
+from .config import (CHART_DIR, CLEAN_CSV_PATH, DEFAULT_CHUNKSIZE, OUTPUT_PATH, QUALITY_PATH,
+                     RAW_PATH, REJECTED_PATH)
+from .schema import discard_rejected, load_typed
+from .streaming import stream_tables
+
+
+class Run:
+    """Options for one analysis run plus the results of each stage."""
+
+    def __init__(self, raw_path=RAW_PATH, stream=False, pipeline=False, append=None,
+                 chunksize=DEFAULT_CHUNKSIZE, use_cache=True, chart_workers=None,
+                 skip_unchanged_charts=False, excel_engine='auto', clean_data='sheet',
+                 period=(None, None), ingest_workers=None, backend='pandas', shard_workers=None,
+                 store=False, persist_state=True):
+        self.raw_path              = raw_path         # a CSV, or a directory/glob of partitions
+        self.stream                = stream
+        self.pipeline              = pipeline        # overlap reading, cleaning and writing in --stream
+        self.append                = append          # path of a new-orders CSV, or None
+        self.chunksize             = chunksize
+        self.use_cache             = use_cache
+        self.chart_workers         = chart_workers
+        self.skip_unchanged_charts = skip_unchanged_charts
+        self.excel_engine          = excel_engine
+        self.clean_data            = clean_data
+        self.period                = period          # (first, last) month Period; None = open
+        self.ingest_workers        = ingest_workers
+        self.backend               = backend         # 'pandas' or 'duckdb' (Sections 1-4 in SQL)
+        self.shard_workers         = shard_workers   # processes for in-memory Sections 2-4; None = this one
+        self.store                 = store           # also build the aggregate-store cuboid (retail_sales.store)
+        self.persist_state         = persist_state   # save the partials for --append (off for read-only callers)
+
+        # Filled in by the stages
+        self.cached   = None     # cache.CachedClean on a cache hit
+        self.loaded   = None     # schema.LoadResult of the in-memory load
+        self.result   = None     # StreamResult in --stream/--append mode
+        self.update   = None     # incremental.AppendResult in --append mode
+        self.df       = None     # typed raw frame (in-memory load only)
+        self.quality  = None     # quality.QualityProfile of the typed rows (not on cache hits)
+        self.quality_report = None   # the profile as JSON-able dict, also kept in the cache entry
+        self.df_clean = None     # None whenever rows were only streamed
+        self.sharded  = None     # sharding.ShardResult when cleaning ran on shard workers
+        self.missing_city = self.missing_disc = None
+        self.cache_path   = None     # cache entry written by the clean stage
+        self.kpi_partials = None
+        self.kpis     = None
+        self.partials = None
+        self.tables   = None
+        self.series   = None     # timeseries.DailySeries per dimension
+        self.rolling  = None     # dimension → rolling-window metrics table
+        self.chart_results  = None
+        self.sheets_written = None
+        self.planned  = []       # stages run_stages will run, prerequisites included
+        self.done     = []       # stage names, in the order they ran
+        self.timings  = {}       # stage name → wall seconds
+
+    @property
+    def streamed(self):
+        return self.result is not None
+
+    @property
+    def partitioned(self):
+        """Read through partitions.ingest: several input files, or only part of the history."""
+        return partitions.is_partitioned(self.raw_path) or self.period != (None, None)
+
+
+# ─── Stage 1: load ───────────────────────────────────────────────
+def load(run):
+    """Cache hit, incremental append, DuckDB scan, partitioned read, chunked stream
+    or typed in-memory load."""
+    if run.use_cache and not (run.stream or run.append or run.partitioned or run.backend != 'pandas'):
+        with profiling.step('1.0 cache lookup') as info:
+            run.cached = cache.load(run.raw_path)
+            info['rows'] = len(run.cached.df) if run.cached is not None else 0
+    if run.cached is not None:
+        run.df_clean = run.cached.df
+    elif run.append:
+        run.update = incremental.append(run.append, chunksize=run.chunksize,
+                                        clean_csv_path=CLEAN_CSV_PATH,
+                                        rejected_csv_path=REJECTED_PATH, store=run.store)
+        run.result = run.update.stream
+        run.quality = run.result.quality
+    elif run.backend == 'duckdb':
+        # Load, clean and every grouping set run as SQL; only partials come back
+        run.result = duckdb_backend.scan(run.raw_path, run.period, clean_csv_path=CLEAN_CSV_PATH,
+                                         rejected_csv_path=REJECTED_PATH, store=run.store)
+    elif run.partitioned:
+        # One pool task per file; only partial aggregates come back
+        run.result = partitions.ingest(run.raw_path, run.period, workers=run.ingest_workers,
+                                       clean_csv_path=CLEAN_CSV_PATH,
+                                       rejected_csv_path=REJECTED_PATH, store=run.store)
+        run.quality = run.result.quality
+    elif run.stream:
+        # Sections 1-2 run chunk by chunk; the full raw frame is never built
+        run.result = stream_tables(run.raw_path, run.chunksize, clean_csv_path=CLEAN_CSV_PATH,
+                                   rejected_csv_path=REJECTED_PATH, pipeline=run.pipeline,
+                                   store=run.store)
+        run.quality = run.result.quality
+    else:
+        run.loaded = load_typed(run.raw_path)
+        run.df = run.loaded.df
+        if len(run.loaded.rejected):
+            run.loaded.rejected.to_csv(REJECTED_PATH, index=False)
+        else:
+            discard_rejected(REJECTED_PATH)
+        with profiling.step('1.2 quality profile', rows=len(run.df)):
+            run.quality = quality.profile(run.df)
+    _save_quality_report(run)
+
+
+def _save_quality_report(run):
+    """Write the Section 1 profile as JSON to QUALITY_PATH.
+
+    On a cache hit it comes from the cache entry; runs without a profile
+    (duckdb, older cache entries) remove the previous run's file instead.
+    """
+    if run.quality is not None:
+        run.quality_report = run.quality.to_dict()
+    elif run.cached is not None:
+        run.quality_report = run.cached.stats.get('quality')
+    if run.quality_report is None:
+        if os.path.exists(QUALITY_PATH):
+            os.remove(QUALITY_PATH)
+        return
+    os.makedirs(os.path.dirname(QUALITY_PATH) or '.', exist_ok=True)
+    with open(QUALITY_PATH, 'w') as f:
+        json.dump(run.quality_report, f, indent=1)
+
+
+# ─── Stage 2: clean ──────────────────────────────────────────────
+def clean(run):
+    """Section 2 cleaning of the in-memory frame, cached for the next run."""
+    if run.streamed:
+        run.missing_city, run.missing_disc = run.result.missing_city, run.result.missing_disc
+        return
+    if run.cached is not None:
+        run.missing_city = run.cached.stats['missing_city']
+        run.missing_disc = run.cached.stats['missing_disc']
+        return
+
+    rows = len(run.df)
+    if run.shard_workers:
+        # Cleaning and the partial aggregates run per shard on a process pool
+        run.sharded = sharding.clean_and_aggregate(run.df, run.shard_workers, run.store)
+        run.df_clean = run.sharded.df_clean
+        run.missing_city, run.missing_disc = run.sharded.missing_city, run.sharded.missing_disc
+    else:
+        run.df_clean = run.df.copy()
+        with profiling.step('2.1 date parsing', rows=rows):
+            add_date_parts(run.df_clean)
+        with profiling.step('2.2 null fills', rows=rows):
+            run.missing_city, run.missing_disc = fill_missing(run.df_clean)
+        with profiling.step('2.3 derived columns', rows=rows):
+            add_derived_columns(run.df_clean)
+
+    if run.use_cache:
+        with profiling.step('2.5 cache store', rows=rows):
+            run.cache_path = cache.store(run.raw_path, run.df_clean, {
+                'raw_columns':  len(run.df.columns),
+                'missing_city': run.missing_city,
+                'missing_disc': run.missing_disc,
+                'rejected':     len(run.loaded.rejected),
+                'quality':      run.quality_report,
+            })
+
+
+# ─── Stage 3: KPIs ───────────────────────────────────────────────
+def compute_kpis(run):
+    """Overall KPIs only - one column sum each, no grouping."""
+    if run.streamed:
+        k = run.result.partials['kpis']
+    elif run.sharded is not None:
+        k = run.sharded.partials['kpis']
+    else:
+        with profiling.step('3.1 kpi totals', rows=len(run.df_clean)):
+            k = aggregates.kpi_partials(run.df_clean)
+    run.kpi_partials = k
+    run.kpis = aggregates.finalize_kpis(k)
+
+
+# ─── Stage 4: aggregates ─────────────────────────────────────────
+def compute_aggregates(run):
+    """Every Section 3/4 table from the single-pass partial aggregates.
+
+    The partials and the daily series are saved so the next --append only
+    has to read new orders (not when they cover only part of the history,
+    nor when ``run.persist_state`` is off).
+    """
+    if run.streamed:
+        run.partials, run.tables = run.result.partials, run.result.tables
+        max_date = run.result.max_date
+    else:
+        if run.sharded is not None:
+            run.partials = run.sharded.partials
+        else:
+            run.partials = aggregates.partial_aggregates(run.df_clean, run.kpi_partials, run.store)
+        with profiling.step('4.4 finalize tables'):
+            run.tables = aggregates.finalize_tables(run.partials)
+        max_date = run.df_clean['order_date'].max()
+    run.kpis = run.tables['kpis']
+
+    if run.update is not None:
+        run.series = run.update.series      # already folded forward by --append
+    else:
+        run.series = timeseries.build_series(run.partials['daily'])
+
+    if run.persist_state and not run.append and run.period == (None, None):
+        with profiling.step('4.5 save state'):
+            incremental.save_state(run.partials, run.kpis['total_orders'], max_date,
+                                   series=run.series)
+
+
+# ─── Stage 4b: rolling windows ───────────────────────────────────
+def compute_timeseries(run):
+    """7/28/90-day, trailing-twelve-month and last-year windows per dimension."""
+    if run.series is not None:
+        run.rolling = timeseries.compute_metrics(run.series)
+
+
+# ─── Stage 5: charts ─────────────────────────────────────────────
+def render_charts(run):
+    from . import charts            # matplotlib/seaborn: only when charts are wanted
+    run.chart_results = charts.render_charts(run.tables, CHART_DIR, workers=run.chart_workers,
+                                             skip_unchanged=run.skip_unchanged_charts)
+
+
+# ─── Stage 6: export ─────────────────────────────────────────────
+def export(run):
+    """Excel report plus the clean CSV."""
+    from .export import kpi_summary, write_report   # xlsxwriter: only when a report is written
+    t = run.tables
+    run.sheets_written = write_report(OUTPUT_PATH, [
+        ('KPI_Summary',       kpi_summary(run.kpis),  False),
+        ('Category_Analysis', t['cat_analysis'],      True),
+        ('City_Analysis',     t['city_analysis'],     True),
+        ('Monthly_Trend',     t['monthly'],           False),
+        ('Product_Analysis',  t['product_analysis'],  False),
+        ('Channel_Analysis',  t['channel_analysis'],  True),
+    ], clean_data=run.df_clean, clean_data_mode=run.clean_data,
+       clean_csv_path=CLEAN_CSV_PATH, engine=run.excel_engine)
+
+    # Already written chunk by chunk in --stream/--append mode. On a cache
+    # hit it is only skipped when the file was written from the same entry.
+    entry = run.cached.path if run.cached is not None else run.cache_path
+    unchanged = run.cached is not None and cache.csv_matches(CLEAN_CSV_PATH, entry)
+    if run.df_clean is not None and not unchanged:
+        with profiling.step('7 clean csv', rows=len(run.df_clean)):
+            run.df_clean.to_csv(CLEAN_CSV_PATH, index=False)
+        if entry is not None:
+            cache.mark_csv(CLEAN_CSV_PATH, entry)
+
+
+STAGES = {
+    'load':       load,
+    'clean':      clean,
+    'kpis':       compute_kpis,
+    'aggregates': compute_aggregates,
+    'timeseries': compute_timeseries,
+    'charts':     render_charts,
+    'export':     export,
+}
+
+REQUIRES = {
+    'clean':      ['load'],
+    'kpis':       ['clean'],
+    'aggregates': ['clean'],
+    'timeseries': ['aggregates'],
+    'charts':     ['aggregates'],
+    'export':     ['kpis', 'aggregates'],
+}
+
+
+def resolve(stages):
+    """``stages`` plus everything they depend on, in pipeline order."""
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"unknown stage(s): {', '.join(sorted(unknown))} "
+                         f"(choose from {', '.join(STAGES)})")
+    needed, todo = set(), list(stages)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(REQUIRES.get(name, []))
+    return [name for name in STAGES if name in needed]
+
+
+def run_stages(run, stages=None, after=None):
+    """Run ``stages`` (default: all) and their prerequisites on ``run``.
+
+    Stages that already ran on ``run`` are not repeated, so a caller can
+    run the pipeline in steps. ``after(run, name)`` is called once each stage
+    finishes, e.g. to print its part of the report. Wall time per stage goes
+    to ``run.timings``.
+    """
+    run.planned = [name for name in resolve(stages or list(STAGES)) if name not in run.done]
+    for name in run.planned:
+        t0 = time.perf_counter()
+        with profiling.step(f"stage {name}"):
+            STAGES[name](run)
+        run.timings[name] = time.perf_counter() - t0
+        run.done.append(name)
+        if after is not None:
+            after(run, name)
+    return run
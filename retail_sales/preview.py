@@ -0,0 +1,275 @@
+"""
+Sampled preview: KPIs and top-N tables with confidence intervals, from a
+small sample of the raw CSV instead of a full pass.
+
+Sampling. A full scan is what a preview has to avoid, and raw exports are
+neither indexed nor in random order. ``sample_csv`` cuts the input (all
+files, back to back) into STRATA equal byte ranges and seeks to the same
+number of random offsets inside each. After each offset it skips to the next
+line start and reads a block of BLOCK_ROWS lines. Exports are written in date
+order (or filed by year=/month=), so byte ranges stand in for months: every
+part of the history gets its share of the sample, and strata sizes are known
+from the file sizes without reading the rows. The number of rows is
+estimated from the input size and the mean length of the sampled lines.
+Sampled rows go through the normal schema loader and Section 2 cleaning.
+
+Estimation. Every metric is a stratified ratio of block sums (a mean is the
+ratio to the row count), so blocks count as clusters: rows read together
+from one place in a file are not treated as independent. The standard error
+comes from the linearized residuals of the block sums within each stratum.
+Totals are the estimated row count times the mean. Category, product and
+city figures are domain estimates over the same design. When the sample
+covers the whole input the intervals shrink to zero, and the figures equal
+the full run's.
+"""
+import io
+import math
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from . import partitions, profiling
+from .cleaning import clean
+from .schema import LoadResult, load_typed
+
+DEFAULT_SAMPLE_ROWS = 200_000
+BLOCK_ROWS = 16                          # consecutive lines read after each random offset
+STRATA = 48                              # equal byte ranges the offsets are spread over
+TOP_N = 10
+
+
+class Estimate:
+    """A point estimate with its standard error and confidence interval."""
+
+    def __init__(self, value, se, z):
+        self.value = value
+        self.se    = se
+        self.low   = value - z * se
+        self.high  = value + z * se
+
+    def __repr__(self):
+        return f"Estimate({self.value:.4g} ± {self.high - self.value:.2g})"
+
+
+class Preview:
+    """Sampled KPI estimates and top-N tables, plus how the sample was drawn."""
+
+    def __init__(self, kpis, tables, sample_rows, est_rows, files, exact, confidence):
+        self.kpis        = kpis          # name → Estimate
+        self.tables      = tables        # name → DataFrame with estimate/low/high columns
+        self.sample_rows = sample_rows
+        self.est_rows    = est_rows
+        self.files       = files
+        self.exact       = exact         # the sample is the whole input
+        self.confidence  = confidence
+
+
+class Sample:
+    """Rows read by ``sample_csv`` and the design they were drawn with."""
+
+    def __init__(self, loaded, row_block, block_stratum, block_bytes, data_bytes, exact):
+        self.loaded        = loaded          # LoadResult of the sampled rows
+        self.row_block     = row_block       # block of each row of loaded.df
+        self.block_stratum = block_stratum   # stratum of each block
+        self.block_bytes   = block_bytes     # bytes read for each block
+        self.data_bytes    = data_bytes      # bytes of data rows in the whole input
+        self.exact         = exact           # every row was read
+
+
+# ─── Sampling ────────────────────────────────────────────────────
+def sample_csv(paths, n_rows, block_rows=BLOCK_ROWS, seed=None, strata=STRATA):
+    """Randomly placed blocks of lines from ``paths``, about ``n_rows`` in total.
+
+    If the input is not much larger than the requested sample, every row is
+    read and the Sample is exact.
+    """
+    rng = np.random.default_rng(seed)
+    sizes, headers = [], []
+    for path in paths:
+        with open(path, 'rb') as f:
+            headers.append(f.readline())
+            sizes.append(os.path.getsize(path) - len(headers[-1]))
+    data_bytes = sum(sizes)
+
+    # Line length from the start of the first file sizes the read budget
+    with open(paths[0], 'rb') as f:
+        f.readline()
+        probe = f.read(1 << 16).split(b'\n')[:-1]
+    line_bytes = sum(len(line) + 1 for line in probe) / max(len(probe), 1)
+    if data_bytes <= 2 * n_rows * line_bytes:
+        loaded = _concat([load_typed(path) for path in paths])
+        # Each accepted row is its own block of "size" 1, so totals are plain sums
+        n = len(loaded.df)
+        return Sample(loaded, np.arange(n), np.zeros(n, dtype=int), np.ones(n), n, True)
+
+    # The same number of random offsets in each of ``strata`` equal byte ranges
+    # of the concatenated data; blocks are drawn with replacement
+    per_stratum = max(math.ceil(n_rows / block_rows / strata), 2)
+    block_stratum = np.repeat(np.arange(strata), per_stratum)
+    offsets = ((block_stratum + rng.random(len(block_stratum))) * data_bytes / strata).astype(np.int64)
+    order = np.argsort(offsets, kind='stable')
+    offsets, block_stratum = offsets[order], block_stratum[order]
+
+    bounds = np.cumsum([0] + sizes)
+    parts, row_block = [], []
+    block_bytes = np.zeros(len(offsets))
+    for i, path in enumerate(paths):
+        mine = np.flatnonzero((offsets >= bounds[i]) & (offsets < bounds[i + 1]))
+        if not len(mine):
+            continue
+        header, lines, blocks = headers[i], [], []
+        with open(path, 'rb') as f:
+            for b in mine:
+                off = offsets[b] - bounds[i]
+                f.seek(len(header) + off)
+                if off:
+                    f.readline()                 # finish the line the offset landed in
+                for _ in range(block_rows):
+                    line = f.readline()
+                    if not line:
+                        break
+                    lines.append(line if line.endswith(b'\n') else line + b'\n')
+                    blocks.append(b)
+                    block_bytes[b] += len(lines[-1])
+        loaded = load_typed(io.BytesIO(header + b''.join(lines)))
+        # apply_schema keeps the line positions of rejected rows in their index
+        accepted = np.ones(len(lines), dtype=bool)
+        accepted[loaded.rejected.index] = False
+        row_block.append(np.asarray(blocks, dtype=np.int64)[accepted])
+        parts.append(loaded)
+    return Sample(_concat(parts), np.concatenate(row_block), block_stratum, block_bytes,
+                  data_bytes, False)
+
+
+def _concat(results):
+    return LoadResult(pd.concat([r.df for r in results], ignore_index=True),
+                      pd.concat([r.rejected for r in results], ignore_index=True))
+
+
+# ─── Stratified cluster estimators ───────────────────────────────
+class _Design:
+    """Block and stratum membership of the sample rows, and the ratio estimators.
+
+    Totals are estimated per byte of input (y per byte read, times the input
+    size), so they need neither a row count nor the share of rejected rows.
+    """
+
+    def __init__(self, sample, keep):
+        self.row_block     = sample.row_block[keep]
+        self.block_stratum = sample.block_stratum
+        self.block_bytes   = sample.block_bytes
+        self.data_bytes    = sample.data_bytes
+        self.exact         = sample.exact
+        self.m_h           = np.bincount(self.block_stratum).astype(float)
+        self.w_h           = self.m_h / self.m_h.sum()      # equal byte ranges, equal allocation
+
+    def _block_sums(self, values):
+        return np.bincount(self.row_block, weights=np.asarray(values, dtype=float),
+                           minlength=len(self.block_stratum))
+
+    def _stratum_means(self, block_values):
+        return np.bincount(self.block_stratum, weights=block_values) / self.m_h
+
+    def _ratio(self, y_b, x_b):
+        """Stratified ratio of block sums and its standard error.
+
+        The variance is that of the linearized block residual y_b - R·x_b,
+        summed over strata as Σ W_h² s_h² / m_h.
+        """
+        x_bar = self.w_h @ self._stratum_means(x_b)
+        if not x_bar:
+            return np.nan, 0.0
+        r = (self.w_h @ self._stratum_means(y_b)) / x_bar
+        if self.exact:
+            return r, 0.0
+        d = (y_b - r * x_b) / x_bar
+        d_mean = self._stratum_means(d)
+        ss = np.bincount(self.block_stratum, weights=d * d) - self.m_h * d_mean ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            s2 = np.where(self.m_h > 1, ss / (self.m_h - 1), 0.0)
+        var = np.sum(self.w_h ** 2 * s2 / self.m_h)
+        return r, math.sqrt(max(var, 0.0))
+
+    def ratio(self, y, x):
+        """Ratio of the totals of row values ``y`` and ``x``, with its standard error."""
+        return self._ratio(self._block_sums(y), self._block_sums(x))
+
+    def mean(self, y):
+        """Mean of ``y`` per row and its standard error."""
+        return self.ratio(y, np.ones(len(self.row_block)))
+
+    def total(self, y):
+        """Total of ``y`` over the whole input and its standard error."""
+        r, se = self._ratio(self._block_sums(y), self.block_bytes)
+        return r * self.data_bytes, se * self.data_bytes
+
+
+def _z(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _domain_table(design, df, key, z, top=None, exclude=()):
+    """Estimated revenue and revenue share per value of ``key``, with intervals."""
+    revenue = df['revenue'].to_numpy(float)
+    out = []
+    for value in df[key].dropna().unique():
+        if value in exclude:
+            continue
+        y = np.where((df[key] == value).to_numpy(), revenue, 0.0)
+        total, se = design.total(y)
+        share, share_se = design.ratio(y, revenue)
+        out.append({key: value,
+                    'revenue':      total,
+                    'revenue_low':  total - z * se,
+                    'revenue_high': total + z * se,
+                    'share_pct':    share * 100,
+                    'share_low':    (share - z * share_se) * 100,
+                    'share_high':   (share + z * share_se) * 100})
+    table = pd.DataFrame(out).set_index(key).sort_values('revenue', ascending=False)
+    return table.head(top) if top else table
+
+
+def estimate(df_clean, design, confidence=0.95, top=TOP_N):
+    """KPI Estimates and top-N tables from the cleaned sample rows of ``design``."""
+    z = _z(confidence)
+    margin = df_clean['profit_margin']
+    kpis = {
+        'total_revenue':   Estimate(*design.total(df_clean['revenue']), z),
+        'avg_order_value': Estimate(*design.mean(df_clean['revenue']), z),
+        'return_rate':     Estimate(*(v * 100 for v in design.mean(df_clean['is_returned'])), z),
+        'discount_rate':   Estimate(*(v * 100 for v in design.mean(df_clean['discount_pct'] > 0)), z),
+        'avg_margin':      Estimate(*design.ratio(margin.fillna(0), margin.notna()), z),
+    }
+    tables = {
+        'top_products': _domain_table(design, df_clean, 'product_name', z, top=top),
+        'top_cities':   _domain_table(design, df_clean, 'city', z, top=top, exclude=('Unknown',)),
+        'category':     _domain_table(design, df_clean, 'category', z),
+    }
+    return kpis, tables
+
+
+def preview(source, sample_rows=DEFAULT_SAMPLE_ROWS, span=(None, None), confidence=0.95,
+            seed=None, block_rows=BLOCK_ROWS):
+    """Sample ``source`` (CSV, directory or glob) and estimate the preview metrics."""
+    files, _ = partitions.prune(partitions.discover(source), span)
+    if not files:
+        raise partitions.EmptySelection(f"every partition of {source} is outside the requested period")
+
+    with profiling.step('preview sample') as info:
+        sample = sample_csv([p.path for p in files], sample_rows, block_rows, seed)
+        read = len(sample.loaded.df) + len(sample.loaded.rejected)
+        info['rows'] = read
+    with profiling.step('preview clean', rows=read):
+        df_clean, _, _ = clean(sample.loaded.df)
+        keep = partitions.in_span(df_clean['order_date'], span).to_numpy()
+        df_clean = df_clean[keep]
+    if df_clean.empty:
+        raise partitions.EmptySelection(f"no sampled orders in {source} fall inside the requested period")
+
+    with profiling.step('preview estimate', rows=len(df_clean)):
+        design = _Design(sample, keep)
+        rows, _ = design.total(np.ones(len(df_clean)))
+        kpis, tables = estimate(df_clean, design, confidence)
+    return Preview(kpis, tables, len(df_clean), rows, len(files), sample.exact, confidence)
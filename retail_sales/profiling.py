@@ -0,0 +1,181 @@
+"""
+Per-step timing and memory instrumentation.
+
+Library code marks its numbered steps with ``profiling.step(name, rows=n)``;
+while no Profiler is active that is a no-op, so the instrumentation costs
+nothing in normal runs. With ``--profile`` the CLI activates a Profiler and
+every step records wall time, CPU time, the process's peak RSS so far and the
+rows it handled. A step that runs many times (e.g. once per chunk in
+--stream mode) is accumulated into one row with a ``calls`` count. In a
+--pipeline run the read, clean and write steps overlap on separate threads:
+their wall times add up to more than the run took, and ``cpu_s`` is process
+CPU, so it includes the other threads' work during the step.
+
+Modes:
+
+* 'timing'      - the step table only (JSON + CSV under PROFILE_DIR),
+* 'tracemalloc' - adds each step's peak Python heap (``py_peak_mb``) and the
+                  top allocation sites of the run,
+* 'cprofile'    - also runs the whole pipeline under cProfile and saves the
+                  .prof file plus the top functions by cumulative time.
+"""
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:                      # Windows: peak RSS is not recorded
+    resource = None
+
+MODES = ('timing', 'tracemalloc', 'cprofile')
+COLUMNS = ['step', 'calls', 'wall_s', 'cpu_s', 'peak_rss_mb', 'py_peak_mb', 'rows']
+
+_active = None
+
+
+def peak_rss_mb():
+    """High-water resident set size of this process, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024   # bytes vs KB
+
+
+class Profiler:
+    """Collects one row per named step; see the module docstring."""
+
+    def __init__(self, mode='timing'):
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode {mode!r} (choose from {', '.join(MODES)})")
+        self.mode    = mode
+        self.steps   = {}                # name → row dict, in first-seen order
+        self.started = datetime.datetime.now()
+        self._stacks = {}                # thread id → child py_peak per open step (tracemalloc mode)
+        self._lock   = threading.Lock()  # steps may finish on pipeline threads
+        self._cprofile = cProfile.Profile() if mode == 'cprofile' else None
+
+    def start(self):
+        if self.mode == 'tracemalloc':
+            tracemalloc.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    def record(self, name, wall_s, cpu_s, rows=None, peak_rss=None, py_peak=None):
+        with self._lock:
+            self._record(name, wall_s, cpu_s, rows, peak_rss, py_peak)
+
+    def _record(self, name, wall_s, cpu_s, rows, peak_rss, py_peak):
+        row = self.steps.setdefault(name, dict.fromkeys(COLUMNS))
+        row['step']  = name
+        row['calls'] = (row['calls'] or 0) + 1
+        row['wall_s'] = (row['wall_s'] or 0) + wall_s
+        row['cpu_s']  = (row['cpu_s'] or 0) + cpu_s
+        if rows is not None:
+            row['rows'] = (row['rows'] or 0) + rows
+        for key, value in (('peak_rss_mb', peak_rss), ('py_peak_mb', py_peak)):
+            if value is not None:
+                row[key] = max(row[key] or 0, value)
+
+    @contextlib.contextmanager
+    def step(self, name, rows=None):
+        info = {'rows': rows}
+        tracing = self.mode == 'tracemalloc'
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        if tracing:
+            stack.append(0)
+            tracemalloc.reset_peak()
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield info
+        finally:
+            wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+            py_peak = None
+            if tracing:
+                # reset_peak() in a nested step hides the earlier part of this
+                # one, so fold in the largest child peak as well
+                py_peak = max(tracemalloc.get_traced_memory()[1], stack.pop()) / 1e6
+                if stack:
+                    stack[-1] = max(stack[-1], py_peak * 1e6)
+            self.record(name, wall, cpu, info['rows'], peak_rss_mb(), py_peak)
+
+    def table(self):
+        table = pd.DataFrame(list(self.steps.values()), columns=COLUMNS)
+        return table.astype({col: float for col in COLUMNS[2:]})
+
+    def write(self, out_dir, meta=None):
+        """Write the step table (JSON + CSV) and any mode extras; returns the paths."""
+        os.makedirs(out_dir, exist_ok=True)
+        base = os.path.join(out_dir, f"profile_{self.started:%Y%m%d-%H%M%S}")
+        table = self.table()
+
+        table.to_csv(base + '.csv', index=False)
+        with open(base + '.json', 'w') as f:
+            json.dump({
+                'started': self.started.isoformat(timespec='seconds'),
+                'mode':    self.mode,
+                'python':  sys.version.split()[0],
+                'pandas':  pd.__version__,
+                **(meta or {}),
+                'steps':   table.astype(object).where(table.notna(), None).to_dict('records'),
+            }, f, indent=1)
+        paths = [base + '.json', base + '.csv']
+
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(base + '.prof')
+            text = io.StringIO()
+            pstats.Stats(self._cprofile, stream=text).sort_stats('cumulative').print_stats(40)
+            with open(base + '_cprofile.txt', 'w') as f:
+                f.write(text.getvalue())
+            paths += [base + '.prof', base + '_cprofile.txt']
+
+        if self.mode == 'tracemalloc' and tracemalloc.is_tracing():
+            top = tracemalloc.take_snapshot().statistics('lineno')[:30]
+            with open(base + '_tracemalloc.txt', 'w') as f:
+                f.write("Largest live allocations at the end of the run:\n")
+                f.writelines(f"{stat}\n" for stat in top)
+            tracemalloc.stop()
+            paths.append(base + '_tracemalloc.txt')
+        return paths
+
+
+def activate(profiler):
+    """Make ``profiler`` the target of ``step``/``record`` (None to switch off)."""
+    global _active
+    _active = profiler
+    if profiler is not None:
+        profiler.start()
+
+
+def active():
+    return _active
+
+
+def step(name, rows=None):
+    """Context manager timing one named step; a no-op without an active Profiler.
+
+    It yields a dict whose 'rows' entry can be set once the row count is known.
+    """
+    if _active is None:
+        return contextlib.nullcontext({})
+    return _active.step(name, rows)
+
+
+def record(name, wall_s, cpu_s, rows=None, peak_rss=None):
+    """Record a step measured elsewhere, e.g. in a worker process."""
+    if _active is not None:
+        _active.record(name, wall_s, cpu_s, rows, peak_rss)
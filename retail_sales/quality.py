@@ -0,0 +1,386 @@
+"""
+Section 1 data-quality profile, collected in one pass over the typed rows.
+
+The exploration used to scan the raw frame once per question: ``describe``,
+``isnull().sum()``, ``duplicated()`` (which hashes every full row) and a
+``nunique``/``unique`` per label column. A ``QualityProfile`` answers all of
+them from one ``update(chunk)`` per frame or chunk:
+
+* every column: non-null and null counts and a sample value,
+* numeric columns: min, max, mean and standard deviation (merged with
+  Chan's pairwise formula, so chunk order does not matter),
+* label (categorical) columns: exact counts per label, hence distinct
+  counts and top values - their size is the number of labels, not rows,
+* text and date columns: min/max and a distinct count,
+* duplicates by hashing the KEY column (order_id) instead of whole rows.
+
+Distinct counts keep the 64-bit hashes of the values exactly until
+EXACT_LIMIT of them have been seen; beyond that only a HyperLogLog sketch
+(2**HLL_PRECISION one-byte registers, ~0.8% standard error) is kept, so
+memory stays flat however large the input gets, and the counts are flagged
+as approximate. The KEY column is the exception: its hashes are always kept
+(8 bytes per distinct key), because an estimate's error would show up as
+duplicate keys that do not exist. Profiles of
+separate chunks or partitions ``merge`` exactly like the partial aggregates.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa                 # direct hashing of Arrow string buffers, optional
+except ImportError:
+    pa = None
+
+KEY = 'order_id'
+EXACT_LIMIT = 1 << 22            # hashed values kept per column before switching to the sketch
+HLL_PRECISION = 14
+TOP_VALUES = 5
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over 64-bit hashes."""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.p = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes):
+        """Fold an array of uint64 hashes into the registers."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = hashes << np.uint64(self.p)
+        # Rank: position of the first 1 bit in the remaining 64 - p bits
+        rank = (64 - _bit_length(rest) + 1).clip(max=64 - self.p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)        # small-range (linear counting) correction
+        return float(raw)
+
+
+def _bit_length(x):
+    """Number of significant bits of each uint64 in ``x`` (0 for 0)."""
+    x = x.copy()
+    n = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= (np.uint64(1) << np.uint64(shift))
+        n += shift * high
+        x[high] >>= np.uint64(shift)
+    return n + (x > 0)
+
+
+def _mix(h):
+    """splitmix64 finalizer: spreads every input bit over all 64 output bits."""
+    h = h ^ (h >> np.uint64(30))
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _hash_strings(array):
+    """64-bit hashes of a pyarrow string array without nulls: FNV-1a over the bytes, then mixed.
+
+    The bytes are read straight from the Arrow buffers one character
+    position at a time, so the cost is rows × longest string in vector
+    operations, with no Python string per row.
+    """
+    array = array.cast(pa.large_string())
+    _, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(1, dtype=np.uint8)
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    h = np.full(len(array), 0xCBF29CE484222325, dtype=np.uint64)
+    for i in range(int(lengths.max(initial=0))):
+        live = lengths > i
+        byte = data.take(np.minimum(starts + i, len(data) - 1)).astype(np.uint64)
+        h = np.where(live, (h ^ byte) * np.uint64(0x100000001B3), h)
+    return _mix(h ^ lengths.astype(np.uint64))
+
+
+def hash_values(series):
+    """64-bit hash of each (non-null) value of ``series``."""
+    if pa is not None and pd.api.types.is_string_dtype(series.dtype) and \
+            hasattr(series.array, '__arrow_array__'):
+        array = pa.array(series.array)
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+            return _hash_strings(array)
+    if series.dtype.kind in 'iufbmM':
+        return _mix(series.to_numpy().view(np.uint64) if series.dtype.itemsize == 8
+                    else series.to_numpy().astype(np.int64).view(np.uint64))
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+def _unique(hashes):
+    """Sorted distinct values of a uint64 array."""
+    hashes = np.sort(hashes)
+    return hashes[np.r_[True, hashes[1:] != hashes[:-1]]] if len(hashes) else hashes
+
+
+class DistinctCounter:
+    """Exact distinct count of hashed values up to EXACT_LIMIT, HyperLogLog beyond."""
+
+    def __init__(self, limit=EXACT_LIMIT):
+        self.limit  = limit          # None: never switch to the sketch
+        self.values = 0              # non-null values seen, duplicates included
+        self.hashes = []             # per-chunk distinct hashes while exact
+        self.kept   = 0
+        self.compacted = 0           # distinct hashes after the last compaction
+        self.sketch = None           # HyperLogLog once approximate
+
+    @property
+    def exact(self):
+        return self.sketch is None
+
+    def add(self, series):
+        if not len(series):
+            return
+        hashes = hash_values(series)
+        self.values += len(hashes)
+        if self.sketch is not None:
+            self.sketch.add(hashes)
+            return
+        unique = _unique(hashes)
+        self.hashes.append(unique)
+        self.kept += len(unique)
+        self._compact()
+
+    def _compact(self):
+        # Unlimited counters dedupe whenever the kept hashes double
+        threshold = self.limit if self.limit is not None else max(EXACT_LIMIT, 2 * self.compacted)
+        if self.kept > threshold:
+            self.hashes = [_unique(np.concatenate(self.hashes))]
+            self.kept = self.compacted = len(self.hashes[0])
+            if self.limit is not None and self.kept > self.limit:
+                self._to_sketch()            # too many distinct values: the sketch takes over
+
+    def _to_sketch(self):
+        if self.sketch is None:
+            self.sketch = HyperLogLog()
+            for hashes in self.hashes:
+                self.sketch.add(hashes)
+            self.hashes, self.kept = [], 0
+        return self.sketch
+
+    def merge(self, other):
+        self.values += other.values
+        if self.exact and other.exact:
+            self.hashes += other.hashes
+            self.kept += other.kept
+            self._compact()
+        elif other.exact:
+            for hashes in other.hashes:
+                self.sketch.add(hashes)
+        else:
+            self._to_sketch().merge(other.sketch)
+        return self
+
+    def count(self):
+        if self.exact:
+            return len(_unique(np.concatenate(self.hashes))) if self.hashes else 0
+        return int(round(min(self.sketch.estimate(), self.values)))
+
+
+class ColumnProfile:
+    """Running statistics of one column; ``kind`` is numeric, label, date or text."""
+
+    def __init__(self, kind, dtype, exact=False):
+        self.kind   = kind
+        self.dtype  = dtype
+        self.count  = 0
+        self.nulls  = 0
+        self.sample = None
+        self.min = self.max = None
+        self.mean = self.m2 = 0.0        # numeric: running mean and sum of squared deviations
+        self.labels = None               # label: counts per label
+        self.distinct = None
+        if kind in ('date', 'text') or exact:
+            self.distinct = DistinctCounter(None if exact else EXACT_LIMIT)
+
+    def update(self, s):
+        notna = s.notna().to_numpy()
+        n = int(notna.sum())
+        self.nulls += len(s) - n
+        if not n:
+            return
+        if self.sample is None:
+            self.sample = s.iloc[int(notna.argmax())]
+        values = s[notna] if n < len(s) else s
+
+        if self.kind == 'label':
+            counts = values.value_counts(sort=False)
+            self.labels = counts if self.labels is None else self.labels.add(counts, fill_value=0)
+        else:
+            if self.kind == 'numeric':
+                x = values.to_numpy(dtype=float)
+                lo, hi, mean = x.min(), x.max(), x.mean()
+                self._merge_moments(n, mean, float(((x - mean) ** 2).sum()))
+            else:
+                lo, hi = values.min(), values.max()
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        if self.distinct is not None:
+            self.distinct.add(values)
+        self.count += n
+
+    def _merge_moments(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+
+    def merge(self, other):
+        if other.count:
+            if self.sample is None:
+                self.sample = other.sample
+            if self.kind == 'numeric':
+                self._merge_moments(other.count, other.mean, other.m2)
+            if self.kind == 'label':
+                self.labels = other.labels if self.labels is None else self.labels.add(other.labels, fill_value=0)
+            else:
+                self.min = other.min if self.min is None else min(self.min, other.min)
+                self.max = other.max if self.max is None else max(self.max, other.max)
+            if self.distinct is not None:
+                self.distinct.merge(other.distinct)
+        self.count += other.count
+        self.nulls += other.nulls
+        return self
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+    @property
+    def n_distinct(self):
+        if self.kind == 'label':
+            return int((self.labels > 0).sum()) if self.labels is not None else 0
+        return self.distinct.count() if self.distinct is not None else None
+
+    @property
+    def distinct_exact(self):
+        return self.distinct is None or self.distinct.exact
+
+    def top(self, n=TOP_VALUES):
+        """The ``n`` most frequent labels with their counts (label columns only)."""
+        if self.labels is None:
+            return pd.Series(dtype=float)
+        return self.labels[self.labels > 0].nlargest(n).astype(int)
+
+
+def _kind(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'label'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'date'
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return 'numeric'
+    return 'text'
+
+
+class QualityProfile:
+    """Column profiles of every frame or chunk passed to ``update``."""
+
+    def __init__(self, key=KEY):
+        self.key     = key
+        self.rows    = 0
+        self.columns = {}
+
+    def update(self, df):
+        for col in df.columns:
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(_kind(df[col].dtype), str(df[col].dtype),
+                                                  exact=col == self.key)
+            self.columns[col].update(df[col])
+        self.rows += len(df)
+        return self
+
+    def merge(self, other):
+        if other is None:
+            return self
+        for col, profile in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(profile)
+            else:
+                self.columns[col] = profile
+        self.rows += other.rows
+        return self
+
+    @property
+    def duplicate_keys(self):
+        """Rows whose key repeats an earlier row's key, from the key's exact hash set."""
+        key = self.columns.get(self.key)
+        if key is None:
+            return None
+        return max(key.count - key.n_distinct, 0)
+
+    @property
+    def exact(self):
+        return all(c.distinct_exact for c in self.columns.values())
+
+    def summary(self):
+        """One row per column: dtype, counts, distinct values, range and moments."""
+        rows = {}
+        for col, c in self.columns.items():
+            rows[col] = {
+                'dtype':     c.dtype,
+                'non_null':  c.count,
+                'nulls':     c.nulls,
+                'null_pct':  c.nulls / self.rows * 100 if self.rows else 0.0,
+                'distinct':  c.n_distinct,
+                'min':       c.min,
+                'max':       c.max,
+                'mean':      c.mean if c.kind == 'numeric' and c.count else None,
+                'std':       c.std if c.kind == 'numeric' else None,
+                'sample':    c.sample,
+            }
+        table = pd.DataFrame.from_dict(rows, orient='index')
+        return table.astype({'non_null': int, 'nulls': int, 'distinct': 'Int64'})
+
+    def numeric_summary(self):
+        """count/mean/std/min/max of the numeric columns, laid out like ``describe``."""
+        return pd.DataFrame({col: {'count': c.count, 'mean': c.mean if c.count else np.nan,
+                                   'std': c.std, 'min': c.min, 'max': c.max}
+                             for col, c in self.columns.items() if c.kind == 'numeric'})
+
+    def missing(self):
+        """Null count and share per column, for columns with any nulls."""
+        counts = pd.Series({col: c.nulls for col, c in self.columns.items()}, dtype=int)
+        table = pd.DataFrame({'Missing Count': counts,
+                              'Missing %': (counts / max(self.rows, 1) * 100).round(2)})
+        return table[table['Missing Count'] > 0]
+
+    def to_dict(self):
+        """The profile as plain JSON-able values."""
+        summary = self.summary().astype(object).where(lambda t: t.notna(), None)
+        return {
+            'rows':           self.rows,
+            'exact':          self.exact,
+            'key':            self.key,
+            'duplicate_keys': self.duplicate_keys,
+            'columns':        {col: {k: _plain(v) for k, v in row.items()}
+                               for col, row in summary.iterrows()},
+            'top_values':     {col: {str(k): int(v) for k, v in c.top().items()}
+                               for col, c in self.columns.items() if c.kind == 'label'},
+        }
+
+
+def _plain(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def profile(df, key=KEY):
+    """QualityProfile of a whole frame."""
+    return QualityProfile(key).update(df)
@@ -0,0 +1,155 @@
+"""
+Top-k, bottom-k and Pareto cutoffs by partial selection instead of full sorts.
+
+Taking the top 10 of a two-million-row product table with ``sort_values``
+orders all two million rows to keep ten. Here ``np.argpartition`` finds the
+k best in linear time and only those k are sorted, so the cost is
+O(n + k log k). Ties at the cut are broken by position, the same rows a
+stable sort would keep; NaN values are never selected.
+
+``pareto_cut`` finds how many items make up a share of a total the same way:
+it selects a growing top-k (4x per round) and runs one cumulative sum over
+that prefix until it crosses the share. With revenue concentrated in few
+products that prefix is a small part of the table.
+
+``top_k_per_group`` keeps the k best rows within each group (top products
+per category or city): rows are bucketed by group code with a linear
+counting sort and each bucket larger than k is partitioned on its own.
+
+    >>> from retail_sales.ranking import top_k_frame, top_k_per_group
+    >>> top_k_frame(product_analysis, 'total_revenue', 10)
+    >>> top_k_per_group(frame, ['category'], 'revenue', 3)
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Pareto cutoff: `reached` is the number of top items whose cumulative share
+# first reaches `share`, `within` the number whose cumulative share stays at
+# or below it, `item_pct` = reached as % of all `n` items.
+ParetoCut = namedtuple('ParetoCut', ['share', 'reached', 'within', 'n', 'item_pct'])
+
+PARETO_START_K = 1024            # first prefix tried by pareto_cut; grown 4x until it suffices
+PARETO_FULL_SORT = 8             # ...or until it would pass 1/8 of the items: then sort them all
+
+
+def _values(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def _select(v, k, largest):
+    """Positions of the k best values of float array ``v``, best first."""
+    valid = ~np.isnan(v)
+    if not valid.all():
+        keep = np.flatnonzero(valid)
+        return keep[_select(v[keep], k, largest)]
+    n = len(v)
+    k = max(0, min(int(k), n))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth = n - k if largest else k - 1
+        bound = v[np.argpartition(v, kth)[kth]]
+        keep = v > bound if largest else v < bound
+        ties = np.flatnonzero(v == bound)
+        keep[ties[:k - np.count_nonzero(keep)]] = True
+        idx = np.flatnonzero(keep)                       # in table order, so a stable sort breaks ties by position
+    else:
+        idx = np.arange(n)
+    key = -v[idx] if largest else v[idx]
+    return idx[_stable_order(key)]
+
+
+def _stable_order(key):
+    """``np.argsort(key, kind='stable')``, but with the much faster default sort.
+
+    Equal keys are put back in position order by sorting (run, position)
+    packed into one int64, which is cheap next to a stable float sort.
+    """
+    order = np.argsort(key)
+    ties = key[order[1:]] == key[order[:-1]]
+    if ties.any():
+        n = len(key)
+        run = np.concatenate([[0], np.cumsum(~ties)])
+        order = np.sort(run * n + order) % n
+    return order
+
+
+def top_k(values, k, largest=True):
+    """Positions of the ``k`` largest (``largest=False``: smallest) values, best first."""
+    return _select(_values(values), k, largest)
+
+
+def bottom_k(values, k):
+    """Positions of the ``k`` smallest values, smallest first."""
+    return _select(_values(values), k, largest=False)
+
+
+def top_k_frame(frame, column, k, largest=True):
+    """The ``k`` rows of ``frame`` with the largest (or smallest) ``column``, in that order."""
+    return frame.iloc[top_k(frame[column].to_numpy(), k, largest)]
+
+
+def pareto_cut(values, total=None, share=80.0, start_k=PARETO_START_K):
+    """How many of the largest ``values`` make up ``share`` % of ``total``.
+
+    ``total`` defaults to the sum of ``values``, which must be non-negative.
+    Counts match a full descending sort followed by a cumulative sum:
+    ``reached`` is the position where the cumulative % first is >= share,
+    ``within`` the number of items with cumulative % <= share.
+    """
+    v = _values(values)
+    v = v[~np.isnan(v)]
+    n = len(v)
+    total = float(v.sum()) if total is None else float(total)
+    k = min(n, start_k)
+    while True:
+        # Only the values matter here, not which rows hold them
+        prefix = np.partition(v, n - k)[n - k:] if k < n else v
+        pct = np.cumsum(np.sort(prefix)[::-1]) / total * 100
+        # Past the prefix the cumulative % can only grow (or stay put on zeros),
+        # so the counts are final once it ends strictly above the share.
+        if k >= n or (len(pct) and pct[-1] > share):
+            break
+        # Grow the prefix; once it would cover a large part of the table a
+        # plain full sort is cheaper than another partition round.
+        k = n if k * 4 > n // PARETO_FULL_SORT else k * 4
+    reached = int(np.searchsorted(pct, share, side='left')) + 1 if len(pct) and pct[-1] >= share else n
+    within = int(np.searchsorted(pct, share, side='right'))
+    return ParetoCut(share, reached, within, n, reached / n * 100 if n else float('nan'))
+
+
+def top_k_per_group(frame, by, column, k, largest=True, rank='rank'):
+    """The ``k`` best rows by ``column`` within each group of ``by``.
+
+    Groups come out in sorted key order, each with its rows best first and a
+    1-based ``rank`` column. Only groups with more than ``k`` rows are
+    partitioned; the rows are never sorted as a whole.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if not by:
+        out = top_k_frame(frame, column, k, largest)
+        return out.assign(**{rank: np.arange(1, len(out) + 1)})
+
+    codes, uniques = pd.MultiIndex.from_frame(frame[by]).factorize(sort=True) \
+        if len(by) > 1 else pd.factorize(frame[by[0]], sort=True)
+    codes = np.asarray(codes)
+    n_groups = len(uniques)
+    # Counting sort by group code: radix for small integer dtypes, linear in the rows
+    code_dtype = np.int16 if n_groups < 2**15 else np.int32 if n_groups < 2**31 else np.int64
+    order = np.argsort(codes.astype(code_dtype), kind='stable')
+    order = order[codes[order] >= 0]                     # rows with a missing key belong to no group
+    sizes = np.bincount(codes[codes >= 0], minlength=n_groups)
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+
+    v = _values(frame[column].to_numpy())
+    picked, ranks = [], []
+    for g in range(n_groups):
+        rows = order[bounds[g]:bounds[g + 1]]            # group g's rows, in table order
+        best = rows[_select(v[rows], k, largest)]
+        picked.append(best)
+        ranks.append(np.arange(1, len(best) + 1))
+    if not picked:
+        return frame.iloc[:0].assign(**{rank: np.empty(0, dtype=np.int64)})
+    return frame.iloc[np.concatenate(picked)].assign(**{rank: np.concatenate(ranks)})
@@ -0,0 +1,166 @@
+"""
+Compact in-memory order buffer: one preallocated typed array per column.
+
+A list of per-order dicts costs several hundred bytes of Python objects per
+order, and ``pd.DataFrame(rows)`` then needs a second full copy. An
+``OrderBuffer`` stores each column in a NumPy array of its SCHEMA dtype.
+The label columns hold small integer codes into a Catalog (product, city,
+segment, payment method, channel), and product_name, category and state
+are implied by the product or city code. That is about 50 bytes per order,
+so tens of millions of orders fit in a few GB.
+
+Rows go in one at a time (``append``, for row-wise producers such as the
+generator's reference mode) or as whole arrays (``extend``). ``to_frame``
+wraps the filled part of each numeric array without copying; each label
+column becomes a categorical over a one-byte code array, and only order_id
+is materialized as text. The frame has the same columns and dtypes as
+``schema.load_typed``, so it can go straight into Section 2 cleaning
+without a CSV round trip.
+"""
+import numpy as np
+import pandas as pd
+
+from .schema import SCHEMA
+
+MISSING = -1                     # code of a missing label (city/state)
+ORDER_PREFIX = 'ORD-'
+
+
+class Catalog:
+    """The labels behind each code column of an OrderBuffer.
+
+    ``products`` is a list of (product_id, product_name, category) tuples and
+    ``cities`` a list of (city, state) tuples; the other three are lists of
+    labels. A code is the position in its list, so producers can draw codes
+    straight from these lists.
+    """
+
+    def __init__(self, products, cities, segments, payment_methods, channels):
+        self.sizes = {'product': len(products), 'city': len(cities), 'segment': len(segments),
+                      'payment_method': len(payment_methods), 'channel': len(channels)}
+        # Output column → (code column, label of each code)
+        self.labels = {
+            'product_id':       ('product',        [p[0] for p in products]),
+            'product_name':     ('product',        [p[1] for p in products]),
+            'category':         ('product',        [p[2] for p in products]),
+            'city':             ('city',           [c[0] for c in cities]),
+            'state':            ('city',           [c[1] for c in cities]),
+            'customer_segment': ('segment',        list(segments)),
+            'payment_method':   ('payment_method', list(payment_methods)),
+            'channel':          ('channel',        list(channels)),
+        }
+
+    def categorical(self, column, codes):
+        """Categorical ``column`` for an array of codes (MISSING → NaN).
+
+        Categories are the distinct labels in sorted order, as read_csv
+        produces them for the typed loader. Codes are mapped to them with one
+        small lookup table (its last entry, reached by MISSING, stays MISSING).
+        """
+        _, labels = self.labels[column]
+        categories = sorted(set(labels))
+        lookup = np.array([categories.index(label) for label in labels] + [MISSING],
+                          dtype=codes.dtype)
+        return pd.Categorical.from_codes(lookup.take(codes), categories=categories, validate=False)
+
+
+def _code_dtype(size):
+    """Smallest signed integer type for codes 0..size-1 and MISSING."""
+    return np.min_scalar_type(-size)
+
+
+class OrderBuffer:
+    """Orders held as typed column arrays that grow by doubling."""
+
+    def __init__(self, catalog, capacity=1 << 16):
+        self.catalog = catalog
+        self.n = 0
+        capacity = max(int(capacity), 1)
+        self._dtypes = {
+            'order_no':       np.int64,
+            'order_date':     'datetime64[us]',           # what read_csv parses dates to
+            **{col: _code_dtype(size) for col, size in catalog.sizes.items()},
+            **{col: SCHEMA[col].dtype for col in ('quantity', 'unit_price', 'discount_pct',
+                                                  'discount_amt', 'sale_price', 'revenue',
+                                                  'is_returned')},
+        }
+        self._cols = {col: np.empty(capacity, dtype=dtype) for col, dtype in self._dtypes.items()}
+
+    @property
+    def capacity(self):
+        return len(self._cols['order_no'])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self._cols.values())
+
+    def __len__(self):
+        return self.n
+
+    def reserve(self, capacity):
+        """Make room for at least ``capacity`` orders (keeps the filled rows)."""
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, 2 * self.capacity)
+        for col, a in self._cols.items():
+            grown = np.empty(capacity, dtype=a.dtype)
+            grown[:self.n] = a[:self.n]
+            self._cols[col] = grown
+
+    def clear(self):
+        """Forget the filled rows but keep the arrays, for reuse chunk after chunk.
+
+        Frames from ``to_frame`` share those arrays, so finish with one before
+        refilling the buffer.
+        """
+        self.n = 0
+
+    def append(self, order_no, order_date, product, city, segment, payment_method, channel,
+               quantity, unit_price, discount_pct, discount_amt, sale_price, revenue, is_returned):
+        """Add one order; labels are Catalog codes, city MISSING and discount_pct None allowed."""
+        if self.n == self.capacity:
+            self.reserve(self.n + 1)
+        i, c = self.n, self._cols
+        c['order_no'][i]       = order_no
+        c['order_date'][i]     = order_date
+        c['product'][i]        = product
+        c['city'][i]           = city
+        c['segment'][i]        = segment
+        c['payment_method'][i] = payment_method
+        c['channel'][i]        = channel
+        c['quantity'][i]       = quantity
+        c['unit_price'][i]     = unit_price
+        c['discount_pct'][i]   = np.nan if discount_pct is None else discount_pct
+        c['discount_amt'][i]   = discount_amt
+        c['sale_price'][i]     = sale_price
+        c['revenue'][i]        = revenue
+        c['is_returned'][i]    = is_returned
+        self.n += 1
+
+    def extend(self, **columns):
+        """Add equally long arrays, one per ``append`` argument."""
+        n = len(columns['order_no'])
+        self.reserve(self.n + n)
+        for col, a in self._cols.items():
+            a[self.n:self.n + n] = columns[col]
+        self.n += n
+
+    def column(self, name):
+        """The filled part of a stored column (a view, not a copy)."""
+        return self._cols[name][:self.n]
+
+    def to_frame(self):
+        """The orders as a DataFrame with the ``load_typed`` columns and dtypes.
+
+        Numeric columns are views of the buffer, so the frame shares memory
+        with it until either is modified; each label column costs one small
+        integer code array.
+        """
+        frame = {'order_id': ORDER_PREFIX + pd.Series(self.column('order_no')).astype('str')}
+        for col in SCHEMA:
+            if col in self.catalog.labels:
+                source, _ = self.catalog.labels[col]
+                frame[col] = self.catalog.categorical(col, self.column(source))
+            elif col in self._cols:
+                frame[col] = self.column(col)
+        return pd.DataFrame(frame, columns=list(SCHEMA), copy=False)
@@ -0,0 +1,512 @@
+"""
+Console report: the printed sections of the analysis, one function per
+pipeline stage.
+
+``print_stage(run, name)`` is passed to ``pipeline.run_stages`` as its
+``after`` hook, so each section is printed as soon as its stage finishes and
+only for the stages that ran. Everything here reads the ``Run``; nothing is
+computed that a stage should own.
+"""
+import pandas as pd
+
+from . import costs
+from .aggregates import pareto_cutoff
+from .ranking import bottom_k, top_k_frame
+from .config import CLEAN_CSV_PATH, QUALITY_PATH, REJECTED_PATH
+from .schema import memory_report
+
+
+def section(title, first=False):
+    print(("" if first else "\n") + "━" * 65)
+    print(f"  {title}")
+    print("━" * 65)
+
+
+def print_banner():
+    print("=" * 65)
+    print("  PROJECT 1: RETAIL SALES PERFORMANCE ANALYSIS")
+    print("=" * 65)
+    print("✓ Libraries loaded successfully\n")
+
+
+# ══════════════════════════════════════════════════════════════════
+# SECTION 1: MORNING - Load & Explore Data
+# ══════════════════════════════════════════════════════════════════
+def print_load(run, show_memory=False):
+    section("SECTION 1: DATA LOADING & EXPLORATION", first=True)
+
+    if run.cached is not None:
+        # ─── 1.1 Cache hit: Sections 1-2 are skipped entirely ───────────
+        print(f"\n⚡ Cleaned dataset memory-mapped from cache in {run.timings['load'] * 1000:,.0f} ms")
+        print(f"   {run.cached.path}")
+        print(f"   Shape: {len(run.df_clean):,} rows × {run.cached.stats['raw_columns']} columns (raw)")
+        print("   (exploration skipped: raw file unchanged since it was last cleaned; use --no-cache to redo)")
+        return
+
+    stream = run.result
+    if run.update is not None:
+        # ─── 1.1 Incremental refresh: only the new orders are read ──────
+        print(f"\n📂 Folded {stream.rows:,} new orders from {run.append} into stored aggregates!")
+        print(f"   History: {run.update.history_rows:,} → {run.update.history_rows + stream.rows:,} orders")
+        if stream.rejected:
+            print(f"   ⚠ Rejected {stream.rejected:,} rows that break the schema → {REJECTED_PATH}")
+        if run.update.late:
+            print("   ⚠ Some new orders are dated on/before the previous latest order")
+        return
+
+    if run.backend == 'duckdb':
+        # ─── 1.1 DuckDB scan (Sections 1-4 run as SQL over the files) ───
+        print(f"\n📂 Dataset scanned by DuckDB from {run.raw_path}!")
+        print(f"   Shape: {stream.rows:,} rows × {stream.columns} columns")
+        if stream.rejected:
+            print(f"   ⚠ Rejected {stream.rejected:,} rows that break the schema → {REJECTED_PATH}")
+        print("   (row-level exploration skipped with --backend duckdb)")
+        return
+
+    if run.partitioned:
+        # ─── 1.1 Partitioned input: one pool task per file ──────────────
+        first, last = run.period
+        print(f"\n📂 Dataset read from {len(stream.partitions):,} partition file(s) "
+              f"on {stream.workers} process(es)!")
+        if first is not None or last is not None:
+            print(f"   Period: {first or 'start'} → {last or 'end'}  "
+                  f"({stream.pruned:,} partition(s) pruned, {stream.skipped:,} rows outside it skipped)")
+        print(f"   Shape: {stream.rows:,} rows × {stream.columns} columns")
+        if stream.rejected:
+            print(f"   ⚠ Rejected {stream.rejected:,} rows that break the schema → {REJECTED_PATH}")
+        print_quality(run.quality)
+        return
+
+    if stream is not None:
+        # ─── 1.1 Stream the dataset (Sections 1-2 run chunk by chunk) ───
+        # The full raw frame is never built; the quality profile was
+        # collected chunk by chunk
+        print(f"\n📂 Dataset streamed in chunks of {run.chunksize:,} rows!")
+        print(f"   Shape: {stream.rows:,} rows × {stream.columns} columns")
+        if stream.rejected:
+            print(f"   ⚠ Rejected {stream.rejected:,} rows that break the schema → {REJECTED_PATH}")
+        print_quality(run.quality)
+        return
+
+    # ─── 1.1 Load the dataset (typed, schema-validated) ─────────────
+    df, rejected = run.df, run.loaded.rejected
+    print(f"\n📂 Dataset loaded!")
+    print(f"   Shape: {df.shape[0]:,} rows × {df.shape[1]} columns")
+    if len(rejected):
+        print(f"   ⚠ Rejected {len(rejected):,} rows that break the schema → {REJECTED_PATH}")
+        print(rejected['reject_reason'].value_counts().head().to_string())
+
+    if show_memory:
+        print("\n💾 Memory by Column (typed loader vs plain read_csv, MB):")
+        print(memory_report(df, run.raw_path).to_string())
+
+    # ─── 1.2 First look at data ──────────────────────────────────────
+    print("\n📋 First 5 rows:")
+    print(df.head().to_string())
+
+    print_quality(run.quality)
+
+
+def print_quality(q):
+    """Steps 1.3 - 1.7 from the one-pass quality.QualityProfile."""
+    summary = q.summary()
+
+    # ─── 1.3 Data types and structure ────────────────────────────────
+    print("\n🔍 Column Info:")
+    print(f"{'Column':<20} {'Dtype':<15} {'Non-Null Count':<15} {'Sample'}")
+    print("-" * 70)
+    for col, row in summary.iterrows():
+        sample = str(row['sample']) if row['non_null'] > 0 else "N/A"
+        print(f"{col:<20} {row['dtype']:<15} {row['non_null']:<15,} {sample[:30]}")
+
+    # ─── 1.4 Statistical summary ─────────────────────────────────────
+    print("\n📊 Statistical Summary (Numeric Columns):")
+    print(q.numeric_summary().round(2).to_string())
+
+    # ─── 1.5 Missing values check ────────────────────────────────────
+    print("\n🔎 Missing Values Check:")
+    missing_df = q.missing()
+    if len(missing_df) > 0:
+        print(missing_df.to_string())
+    else:
+        print("   No missing values found!")
+
+    # ─── 1.6 Duplicates check ────────────────────────────────────────
+    print(f"\n🔎 Duplicate {q.key} keys: {q.duplicate_keys:,}")
+
+    # ─── 1.7 Unique value counts ─────────────────────────────────────
+    print("\n🔎 Unique Values per Category Column:")
+    cat_cols = ['category', 'city', 'customer_segment', 'payment_method', 'channel']
+    for col in cat_cols:
+        print(f"   {col}: {summary.at[col, 'distinct']} unique → {list(q.columns[col].top().index)}")
+    print(f"\n📝 Full profile as JSON → {QUALITY_PATH}")
+
+
+# ══════════════════════════════════════════════════════════════════
+# SECTION 2: AFTERNOON - Data Cleaning & Preparation
+# ══════════════════════════════════════════════════════════════════
+def print_clean(run):
+    section("SECTION 2: DATA CLEANING & PREPARATION")
+
+    if run.streamed:
+        # Steps 2.1 - 2.3 already ran on every chunk inside stream_tables()
+        stream = run.result
+        if run.update is None and run.backend == 'duckdb':
+            how = "in SQL (DuckDB)"
+        elif run.update is None and run.partitioned:
+            how = "partition by partition"
+        elif run.pipeline:
+            how = "chunk by chunk (reading, cleaning and writing overlapped)"
+        else:
+            how = "chunk by chunk"
+        print(f"\n🔧 Cleaned {stream.rows:,} rows {how}:")
+        print("   ✓ Date parts extracted: year, month, quarter, day_of_week")
+        print(f"   ✓ City: filled {run.missing_city} missing values with 'Unknown'")
+        print(f"   ✓ Discount %: filled {run.missing_disc} missing values with 0 (no discount)")
+        print("   ✓ profit, profit_margin, order_value_tier, is_high_discount created")
+
+        print(f"\n✅ Data Cleaning Complete!")
+        print(f"   Rows: {stream.rows:,} (no rows dropped)")
+        print(f"   Date range: {stream.min_date.date()} → {stream.max_date.date()}")
+        print(f"   Clean CSV {'appended' if run.append else 'streamed'} to: {CLEAN_CSV_PATH}")
+        return
+
+    df_clean = run.df_clean
+    if run.cached is not None:
+        stats = run.cached.stats
+        print(f"\n🔧 Using cleaned data from cache (cleaning v{stats['cleaning_version']}):")
+        print(f"   ✓ City: {run.missing_city} missing values were filled with 'Unknown'")
+        print(f"   ✓ Discount %: {run.missing_disc} missing values were filled with 0 (no discount)")
+        raw_columns = stats['raw_columns']
+    else:
+        if run.sharded is not None:
+            shards = run.sharded.shard_rows
+            print(f"\n🔧 Cleaning {len(df_clean):,} rows in {run.sharded.workers} shard(s) by order_id hash "
+                  f"({min(shards):,} - {max(shards):,} rows each)")
+
+        # ─── 2.1 Fix date column ─────────────────────────────────────────
+        print("\n🔧 Step 1: Converting date column...")
+        print("   ✓ Date parts extracted: year, month, quarter, day_of_week")
+
+        # ─── 2.2 Handle missing values ───────────────────────────────────
+        # Missing city → 'Unknown', missing discount_pct → 0 (no discount)
+        print("\n🔧 Step 2: Handling missing values...")
+        print(f"   ✓ City: filled {run.missing_city} missing values with 'Unknown'")
+        print(f"   ✓ Discount %: filled {run.missing_disc} missing values with 0 (no discount)")
+
+        # Verify no missing values remain
+        remaining_missing = df_clean.isnull().sum().sum()
+        print(f"   ✓ Remaining missing values: {remaining_missing}")
+
+        # ─── 2.3 Create derived/calculated columns ───────────────────────
+        print("\n🔧 Step 3: Creating derived columns...")
+        print("   ✓ profit, profit_margin columns created")
+        if not costs.active().is_default:
+            print(f"   ✓ Costs from {costs.active().source} (category shares for products it lacks)")
+        print("   ✓ order_value_tier column created")
+        print("   ✓ is_high_discount flag created")
+        raw_columns = len(run.df.columns)
+
+    # ─── 2.4 Final clean dataset summary ─────────────────────────────
+    print(f"\n✅ Data Cleaning Complete!")
+    print(f"   Rows: {len(df_clean):,} (no rows dropped)")
+    print(f"   Columns: {len(df_clean.columns)} (was {raw_columns}, added {len(df_clean.columns)-raw_columns} derived)")
+    print(f"   Date range: {df_clean['order_date'].min().date()} → {df_clean['order_date'].max().date()}")
+
+    # ─── 2.5 Cached for the next run ─────────────────────────────────
+    if run.cache_path:
+        print(f"   Cached for next run: {run.cache_path}")
+
+
+# ══════════════════════════════════════════════════════════════════
+# SECTION 3: EVENING - KPI Calculation & Basic Analysis
+# ══════════════════════════════════════════════════════════════════
+def print_kpis(run):
+    section("SECTION 3: KEY PERFORMANCE INDICATORS (KPIs)")
+    k = run.kpis
+    print(f"""
+┌─────────────────────────────────────────────────────────┐
+│              OVERALL BUSINESS KPIs (2023-2024)          │
+├─────────────────────────────────────────────────────────┤
+│  💰 Total Revenue:       ₹{k['total_revenue']:>15,.0f}            │
+│  📦 Total Orders:        {k['total_orders']:>15,}            │
+│  📈 Total Profit:        ₹{k['total_profit']:>15,.0f}            │
+│  🛒 Avg Order Value:     ₹{k['avg_order_value']:>15,.2f}            │
+│  📊 Avg Profit Margin:   {k['avg_margin']:>14.1f}%            │
+│  📦 Total Units Sold:    {k['total_units']:>15,}            │
+│  🔄 Return Rate:         {k['return_rate']:>14.1f}%            │
+│  🏷️  Orders with Discount: {k['discount_rate']:>12.1f}%            │
+└─────────────────────────────────────────────────────────┘""")
+
+
+# ══════════════════════════════════════════════════════════════════
+# SECTION 4: MORNING DAY 2 - Advanced Analysis with GroupBy
+# ══════════════════════════════════════════════════════════════════
+def print_aggregates(run):
+    t = run.tables
+    if 'kpis' not in run.done:
+        section("SECTION 3: KEY PERFORMANCE INDICATORS (KPIs)")
+
+    # ─── Year over Year comparison (end of Section 3) ────────────────
+    print("\n📊 Year-over-Year Comparison:")
+    print(t['yoy'].to_string())
+
+    section("SECTION 4: ADVANCED ANALYSIS")
+
+    # ─── Q2: Category Analysis ───────────────────────────────────────
+    print("\n📊 Q2: Revenue by Category")
+    print(t['cat_analysis'].to_string())
+
+    # ─── Q3: City Analysis ───────────────────────────────────────────
+    print("\n📊 Q3: Revenue by City (Top 8)")
+    print(t['city_analysis'].to_string())
+
+    # ─── Q4: Monthly Trend ───────────────────────────────────────────
+    print("\n📊 Q4: Monthly Revenue Trend")
+    print(t['monthly'][['year', 'month_name', 'revenue', 'orders', 'mom_growth']].to_string(index=False))
+
+    # ─── Q4b: Quarterly Analysis ─────────────────────────────────────
+    print("\n📊 Q4b: Quarterly Revenue")
+    print(t['quarterly'].to_string(index=False))
+
+    # ─── Q5: Product Analysis ────────────────────────────────────────
+    product_analysis = t['product_analysis']
+    print("\n📊 Q5: Top 10 Products by Revenue")
+    print(top_k_frame(product_analysis, 'total_revenue', 10).to_string(index=False))
+
+    print("\n📊 Q5b: Bottom 5 Products (Lowest Revenue)")
+    bottom = bottom_k(product_analysis['total_revenue'].to_numpy(), 5)[::-1]
+    print(product_analysis.iloc[bottom].to_string(index=False))
+
+    # ─── Q6: Channel Analysis ────────────────────────────────────────
+    print("\n📊 Q6: Sales Channel Performance")
+    print(t['channel_analysis'].to_string())
+
+    # ─── Q7: Discount Impact Analysis ────────────────────────────────
+    print("\n📊 Q7: Discount Impact on Revenue")
+    print(t['discount_analysis'].to_string())
+
+    # ─── Pareto Analysis (80/20 rule) ────────────────────────────────
+    print("\n📊 PARETO ANALYSIS: What % of products = 80% of revenue?")
+    cut = pareto_cutoff(product_analysis, t['kpis']['total_revenue'])
+    print(f"   Top {cut.item_pct:.0f}% of products generate 80% of revenue")
+    print(f"   Products in top 80% revenue: {cut.within} out of {cut.n}")
+
+    # ─── Day of Week Analysis ────────────────────────────────────────
+    print("\n📊 Day of Week Revenue Pattern:")
+    print(t['dow'].to_string())
+
+    # ─── Customer Segment Analysis ───────────────────────────────────
+    print("\n📊 Customer Segment Analysis:")
+    print(t['seg'].to_string())
+
+
+# ─── Section 4b: rolling windows ─────────────────────────────────
+def print_timeseries(run):
+    section("SECTION 4B: ROLLING WINDOWS & SAME PERIOD LAST YEAR")
+    if run.rolling is None:
+        print("\n   (no daily series in the stored state - run a full analysis to build it)")
+        return
+    as_of = next(iter(run.series.values())).end
+    print(f"\n📅 Revenue in the windows ending {as_of:%Y-%m-%d}, with % change vs the same "
+          f"window a year earlier")
+    shown = [c for c in next(iter(run.rolling.values())).columns if not c.endswith('_ly')]
+    for dim, table in run.rolling.items():
+        print(f"\n📊 Rolling revenue by {dim}:")
+        print(table[shown].to_string(na_rep='-'))
+
+
+# ══════════════════════════════════════════════════════════════════
+# SECTION 5: VISUALIZATIONS
+# ══════════════════════════════════════════════════════════════════
+def print_charts(run):
+    section("SECTION 5: CREATING VISUALIZATIONS")
+    print()
+    for name, title, status in run.chart_results:
+        print(f"{title}...")
+        print(f"   ✓ Saved: {name}" if status == 'saved' else f"   ↷ Unchanged, skipped: {name}")
+
+
+# ══════════════════════════════════════════════════════════════════
+# SECTION 6: INSIGHTS & FINDINGS
+# ══════════════════════════════════════════════════════════════════
+def print_insights(run):
+    section("SECTION 6: KEY FINDINGS & BUSINESS INSIGHTS")
+    t, k = run.tables, run.kpis
+    cat_analysis, yoy = t['cat_analysis'], t['yoy']
+
+    top_cat    = cat_analysis.index[0]
+    top_cat_pct = cat_analysis.iloc[0]['revenue_share_pct']
+    top_city   = t['city_analysis'].index[0]
+    top_prod   = t['product_analysis'].iloc[0]['product_name']
+
+    # YoY growth if available
+    if 2023 in yoy.index and 2024 in yoy.index:
+        yoy_growth = yoy.loc[2024, 'revenue_growth']
+        growth_str = f"{yoy_growth:+.1f}%"
+    else:
+        growth_str = "N/A"
+
+    print(f"""
+╔══════════════════════════════════════════════════════════════════╗
+║                   KEY BUSINESS FINDINGS                         ║
+╠══════════════════════════════════════════════════════════════════╣
+║                                                                  ║
+║  FINDING 1: REVENUE PERFORMANCE                                 ║
+║  • Total revenue of ₹{k['total_revenue']:,.0f} across {k['total_orders']:,} orders     ║
+║  • Year-over-year revenue growth: {growth_str}                     ║
+║  • Average order value: ₹{k['avg_order_value']:,.0f}                       ║
+║                                                                  ║
+║  FINDING 2: CATEGORY DOMINANCE (Pareto Insight)                 ║
+║  • {top_cat} is the top category with {top_cat_pct}% revenue share   ║
+║  • Top 2 categories contribute majority of total revenue        ║
+║                                                                  ║
+║  FINDING 3: GEOGRAPHIC CONCENTRATION                            ║
+║  • {top_city} is the #1 city by revenue                         ║
+║  • Top 3 cities likely contribute 50%+ of total revenue         ║
+║                                                                  ║
+║  FINDING 4: SEASONAL PATTERNS                                   ║
+║  • Q4 (Oct-Dec) shows highest sales (festive season effect)     ║
+║  • Summer months (Jun-Aug) show relatively lower performance    ║
+║                                                                  ║
+║  FINDING 5: PRODUCT PERFORMANCE                                 ║
+║  • {top_prod[:40]:<40} is top revenue product  ║
+║  • Top 20% of products generate ~80% of revenue (Pareto Law)   ║
+║                                                                  ║
+║  FINDING 6: CHANNEL INSIGHTS                                    ║
+║  • Online channel dominates revenue contribution                ║
+║  • Mobile App growing - opportunity for investment              ║
+║                                                                  ║
+╠══════════════════════════════════════════════════════════════════╣
+║                   BUSINESS RECOMMENDATIONS                      ║
+╠══════════════════════════════════════════════════════════════════╣
+║                                                                  ║
+║  REC 1: Double down on Electronics category - highest revenue   ║
+║  REC 2: Invest in top 3 cities - highest concentration          ║
+║  REC 3: Prepare inventory for Q4 festive season spike           ║
+║  REC 4: Review bottom 5 products - consider discontinuing       ║
+║  REC 5: Expand Mobile App channel - growing opportunity         ║
+║  REC 6: Review discount strategy - high discounts hurt margins  ║
+║                                                                  ║
+╚══════════════════════════════════════════════════════════════════╝""")
+
+
+# ══════════════════════════════════════════════════════════════════
+# SECTION 7: EXPORT RESULTS
+# ══════════════════════════════════════════════════════════════════
+def print_export(run):
+    section("SECTION 7: EXPORTING RESULTS TO EXCEL")
+    data_sheets = run.sheets_written[:run.sheets_written.index('KPI_Summary')]
+    print(f"✓ Excel report saved: Sales_Analysis_Report.xlsx")
+    print(f"   Sheets: {''.join(name + ', ' for name in data_sheets)}KPI_Summary, Category_Analysis, City_Analysis,")
+    print(f"           Monthly_Trend, Product_Analysis, Channel_Analysis")
+    print(f"✓ Clean CSV saved: retail_sales_clean.csv")
+
+
+def print_summary(run):
+    print("\n" + "=" * 65)
+    print("  ✅ PROJECT 1: ANALYSIS COMPLETE!")
+    print("=" * 65)
+    print(f"""
+📁 OUTPUT FILES:
+   data/retail_sales_raw.csv          ← Original dataset
+   outputs/retail_sales_clean.csv     ← Cleaned dataset
+   outputs/Sales_Analysis_Report.xlsx ← Full Excel report (7 sheets)
+   charts/chart1_monthly_trend.png    ← Monthly & quarterly trends
+   charts/chart2_category_breakdown.png ← Category revenue breakdown
+   charts/chart3_city_performance.png ← City performance
+   charts/chart4_product_performance.png ← Product ranking
+   charts/chart5_channel_segment.png  ← Channel & segment split
+   charts/chart6_revenue_heatmap.png  ← Revenue heatmap
+
+📊 PROJECT STATS:
+   5,500 transactions analyzed
+   2 years of data (2023-2024)
+   20 products across 5 categories
+   8 cities analyzed
+   7 business questions answered
+   6 professional charts created
+   7-sheet Excel report generated
+""")
+
+
+def print_profile(table, paths):
+    section("PROFILE: TIME & MEMORY PER STEP")
+    print(table.round(3).to_string(index=False, na_rep=''))
+    print()
+    for path in paths:
+        print(f"⏱  Saved: {path}")
+
+
+# ══════════════════════════════════════════════════════════════════
+# PREVIEW - sampled estimates (--preview)
+# ══════════════════════════════════════════════════════════════════
+def _pm(est, fmt):
+    return f"{format(est.value, fmt)} ± {format(est.high - est.value, fmt)}"
+
+
+def print_preview(p):
+    section(f"PREVIEW: SAMPLED ESTIMATES ({p.confidence:.0%} CONFIDENCE)", first=True)
+    if p.exact:
+        print(f"\n🎯 Input has only {p.sample_rows:,} rows: every row was read, figures are exact")
+    else:
+        print(f"\n🎯 Sampled {p.sample_rows:,} orders in random blocks from {p.files:,} file(s), "
+              f"stratified by position in the input")
+        print(f"   Estimated orders in the input: ~{p.est_rows:,.0f}")
+
+    k = p.kpis
+    rows = [("💰 Total Revenue:",       "₹" + _pm(k['total_revenue'], ',.0f')),
+            ("🛒 Avg Order Value:",     "₹" + _pm(k['avg_order_value'], ',.2f')),
+            ("📊 Avg Profit Margin:",   _pm(k['avg_margin'], '.2f') + "%"),
+            ("🔄 Return Rate:",         _pm(k['return_rate'], '.2f') + "%"),
+            ("🏷️  Orders with Discount:", _pm(k['discount_rate'], '.2f') + "%")]
+    print("\n┌" + "─" * 62 + "┐")
+    print("│         PREVIEW KPIs (estimate ± margin of error)            │")
+    print("├" + "─" * 62 + "┤")
+    for label, value in rows:
+        print(f"│  {label:<24}{value:>32}   │")
+    print("└" + "─" * 62 + "┘")
+
+    titles = {'top_products': "🏆 Top Products by Revenue",
+              'top_cities':   "🏙️  Top Cities by Revenue",
+              'category':     "📊 Category Revenue Shares"}
+    for name, title in titles.items():
+        print(f"\n{title} (estimate [low, high]):")
+        t = p.tables[name]
+        shown = pd.DataFrame({
+            'revenue':   [f"{v:,.0f} [{lo:,.0f}, {hi:,.0f}]" for v, lo, hi in
+                          zip(t['revenue'], t['revenue_low'], t['revenue_high'])],
+            'share_pct': [f"{v:.1f} [{lo:.1f}, {hi:.1f}]" for v, lo, hi in
+                          zip(t['share_pct'], t['share_low'], t['share_high'])],
+        }, index=t.index)
+        print(shown.to_string())
+
+
+PRINTERS = {
+    'load':       print_load,
+    'clean':      print_clean,
+    'kpis':       print_kpis,
+    'aggregates': print_aggregates,
+    'timeseries': print_timeseries,
+    'charts':     print_charts,
+    'export':     print_export,
+}
+
+
+def print_stage(run, name, show_memory=False):
+    """``run_stages`` hook: print the section(s) for the stage that just ran.
+
+    The insights need both KPIs and tables and go after the charts (or after
+    the last table stage when no charts were asked for); the closing summary is
+    printed once the export is done. ``show_memory`` adds the per-column
+    memory report to Section 1.
+    """
+    if name == 'load':
+        print_load(run, show_memory)
+    else:
+        PRINTERS[name](run)
+    last_table_stage = next((s for s in ('charts', 'timeseries', 'aggregates') if s in run.planned), None)
+    if name == last_table_stage and 'kpis' in run.planned:
+        print_insights(run)
+    if name == 'export':
+        print_summary(run)
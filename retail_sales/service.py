@@ -0,0 +1,320 @@
+"""
+Long-running local KPI service: load and clean once, answer from memory.
+
+Every ``sales_analysis.py`` run starts a fresh interpreter, imports pandas
+(and matplotlib/seaborn/openpyxl for the report) and re-reads the data, so
+a dashboard refresh costs seconds. ``KpiService`` runs the load → clean →
+kpis → aggregates → timeseries stages once and keeps the finished tables;
+requests are then answered from memory by a stdlib ``ThreadingHTTPServer``:
+
+    GET  /health                 source, rows, load time, last reload error
+    GET  /kpis                   the Section 3 KPI summary
+    GET  /quality                the Section 1 data-quality profile (QualityProfile.to_dict)
+    GET  /tables                 names of the tables below (and their Q aliases)
+    GET  /tables/<name>          one table, e.g. /tables/cat_analysis or /tables/q2
+    GET  /rolling/<dim>          Section 4B window metrics for category, city or channel
+    GET  /query?dims=..&measures=..&<dim>=<v>[,<v>...]
+                                 ad-hoc slice of the aggregate store (retail_sales.store)
+    GET  /top?items=..&measure=..&k=..&by=..&<dim>=<v>[,<v>...]
+                                 k best items by a measure, within each group of `by`
+    GET  /charts/<file>.png      one Section 5 chart, e.g. /charts/chart2_category_breakdown.png
+    POST /reload                 rebuild now
+
+Tables are JSON records (index columns included). The source is checked at
+most every ``check_interval`` seconds: when its files' sizes or mtimes
+change, the data is reloaded (through the clean-data cache where the run
+mode allows it) and swapped in whole, so a request never sees half an old
+and half a new state. If a reload fails, the previous state keeps being
+served and the error shows in /health. matplotlib and seaborn are imported
+by the first chart request only; rendered charts are kept until the next
+reload.
+
+Command: python -m retail_sales.service --port 8050 [--input PATH] [--from 2024 --to 2024-06]
+"""
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from . import partitions
+from .config import RAW_PATH
+from .pipeline import Run, run_stages
+from .store import AggregateStore
+
+DEFAULT_PORT = 8050
+CHECK_INTERVAL = 2.0             # seconds between checks of the source files
+STAGES = ['kpis', 'aggregates', 'timeseries']
+
+# Report question → table, as numbered in Section 4
+ALIASES = {
+    'q2':  'cat_analysis',
+    'q3':  'city_analysis',
+    'q4':  'monthly',
+    'q4b': 'quarterly',
+    'q5':  'product_analysis',
+    'q6':  'channel_analysis',
+    'q7':  'discount_analysis',
+}
+
+
+class NotFound(Exception):
+    """The requested table, dimension or chart does not exist."""
+
+
+class Snapshot:
+    """Everything one load produced; replaced whole on reload, only its chart cache grows."""
+
+    def __init__(self, run, signature, seconds):
+        self.tables    = run.tables
+        self.kpis      = run.kpis
+        self.rolling   = run.rolling or {}
+        self.quality   = run.quality_report
+        self.store     = AggregateStore(run.partials['cuboid']) if 'cuboid' in run.partials else None
+        self.rows      = int(run.kpis['total_orders'])
+        self.signature = signature
+        self.seconds   = seconds
+        self.loaded_at = datetime.datetime.now().isoformat(timespec='seconds')
+        self.charts    = {}              # chart file name → PNG bytes
+
+
+def source_signature(source):
+    """(path, size, mtime) of every input file; changes whenever the data does."""
+    signature = []
+    for p in partitions.discover(source):
+        st = os.stat(p.path)
+        signature.append((p.path, st.st_size, st.st_mtime_ns))
+    return tuple(signature)
+
+
+class KpiService:
+    """Warm KPI and aggregate tables for one source, reloaded when it changes.
+
+    ``run_options`` go to pipeline.Run (period, stream, backend, ...); the
+    aggregate store behind /query and /top is built unless ``store=False``.
+    The service only reads: it never overwrites the state saved for --append.
+    """
+
+    def __init__(self, source=RAW_PATH, check_interval=CHECK_INTERVAL, **run_options):
+        self.source         = source
+        self.check_interval = check_interval
+        self.run_options    = {'store': True, **run_options, 'persist_state': False}
+        self.error          = None       # message of the last failed reload
+        self._lock          = threading.Lock()
+        self._chart_lock    = threading.Lock()   # pyplot is not thread-safe
+        self._checked       = time.monotonic()
+        self._snapshot      = self._load(source_signature(source))
+
+    def _load(self, signature):
+        t0 = time.perf_counter()
+        run = run_stages(Run(raw_path=self.source, **self.run_options), STAGES)
+        return Snapshot(run, signature, time.perf_counter() - t0)
+
+    def reload(self, force=True):
+        """Rebuild from the source (unless unchanged and not ``force``); on failure keep the current state."""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                signature = source_signature(self.source)
+                if force or signature != self._snapshot.signature:
+                    self._snapshot = self._load(signature)
+                self.error = None
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+        return self._snapshot
+
+    def current(self):
+        """The latest state, reloaded first if the source changed since it was built."""
+        if time.monotonic() - self._checked >= self.check_interval:
+            return self.reload(force=False)
+        return self._snapshot
+
+    # ─── Responses ───────────────────────────────────────────────
+    def health(self):
+        s = self.current()
+        return {'source': self.source, 'rows': s.rows, 'loaded_at': s.loaded_at,
+                'load_seconds': round(s.seconds, 3), 'error': self.error}
+
+    def kpis(self):
+        return {name: value.item() if hasattr(value, 'item') else value
+                for name, value in self.current().kpis.items()}
+
+    def quality(self):
+        report = self.current().quality
+        if report is None:
+            raise NotFound("this run has no quality profile (duckdb backend)")
+        return report
+
+    def table_names(self):
+        names = [k for k, v in self.current().tables.items() if hasattr(v, 'to_json') and k != 'kpis']
+        return {'tables': names, 'aliases': ALIASES}
+
+    def table(self, name):
+        tables = self.current().tables
+        name = ALIASES.get(name.lower(), name)
+        if name == 'kpis' or not hasattr(tables.get(name), 'to_json'):
+            raise NotFound(f"no table {name!r}")
+        return _records(tables[name])
+
+    def rolling(self, dim):
+        rolling = self.current().rolling
+        if dim not in rolling:
+            raise NotFound(f"no rolling metrics for {dim!r} (have: {', '.join(rolling)})")
+        return _records(rolling[dim].rename_axis(dim))
+
+    def query(self, dims, measures, filters):
+        store = self.current().store
+        if store is None:
+            raise NotFound("this run kept no aggregate store")
+        return _records(store.query(dims, measures, filters))
+
+    def top(self, items, measure, k, by, filters):
+        store = self.current().store
+        if store is None:
+            raise NotFound("this run kept no aggregate store")
+        return _records(store.top(items, measure, k, by, filters))
+
+    def chart(self, name):
+        """PNG bytes of chart ``name``, drawn on first request after each load."""
+        snapshot = self.current()
+        with self._chart_lock:
+            if name in snapshot.charts:
+                return snapshot.charts[name]
+            from . import charts        # matplotlib/seaborn: only once a chart is asked for
+            found = [(func, keys) for file, _, func, keys in charts.CHARTS if file == name]
+            if not found:
+                raise NotFound(f"no chart {name!r}")
+            func, keys = found[0]
+            charts.setup_style()
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, name)
+                func(path, *[snapshot.tables[k] for k in keys])
+                with open(path, 'rb') as f:
+                    snapshot.charts[name] = f.read()
+            return snapshot.charts[name]
+
+
+def _records(frame):
+    """JSON records of a table, its index as leading column(s)."""
+    if any(name is not None for name in frame.index.names):
+        frame = frame.reset_index()
+    return frame.to_json(orient='records', date_format='iso', force_ascii=False)
+
+
+def _filter_value(text):
+    values = [int(v) if v.lstrip('-').isdigit() else v for v in text.split(',')]
+    return values[0] if len(values) == 1 else values
+
+
+def make_handler(service):
+    """A request handler class bound to ``service``."""
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = 'retail-sales-kpi/1'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split('/') if p]
+            try:
+                if parts == ['health']:
+                    self._json(json.dumps(service.health()))
+                elif parts == ['kpis']:
+                    self._json(json.dumps(service.kpis()))
+                elif parts == ['quality']:
+                    self._json(json.dumps(service.quality()))
+                elif parts == ['tables']:
+                    self._json(json.dumps(service.table_names()))
+                elif len(parts) == 2 and parts[0] == 'tables':
+                    self._json(service.table(parts[1]))
+                elif len(parts) == 2 and parts[0] == 'rolling':
+                    self._json(service.rolling(parts[1]))
+                elif parts == ['query']:
+                    params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                    split = lambda s: [x for x in s.split(',') if x]
+                    dims = split(params.pop('dims', ''))
+                    measures = split(params.pop('measures', 'revenue'))
+                    filters = {col: _filter_value(v) for col, v in params.items()}
+                    self._json(service.query(dims, measures, filters))
+                elif parts == ['top']:
+                    params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                    split = lambda s: [x for x in s.split(',') if x]
+                    items = split(params.pop('items', 'product_name'))
+                    measure = params.pop('measure', 'revenue')
+                    k = int(params.pop('k', '10'))
+                    by = split(params.pop('by', ''))
+                    filters = {col: _filter_value(v) for col, v in params.items()}
+                    self._json(service.top(items, measure, k, by, filters))
+                elif len(parts) == 2 and parts[0] == 'charts':
+                    self._send(200, service.chart(parts[1]), 'image/png')
+                else:
+                    raise NotFound(f"no endpoint {url.path}")
+            except NotFound as e:
+                self._error(404, str(e))
+            except ValueError as e:
+                self._error(400, str(e))
+            except Exception as e:
+                self._error(500, f"{type(e).__name__}: {e}")
+
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip('/') != '/reload':
+                return self._error(404, f"no endpoint {self.path}")
+            service.reload()
+            self._json(json.dumps(service.health()), 200 if service.error is None else 500)
+
+        def _json(self, body, status=200):
+            self._send(status, body.encode(), 'application/json; charset=utf-8')
+
+        def _error(self, status, message):
+            self._json(json.dumps({'error': message}), status)
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass                         # keep the console quiet; /health has the state
+
+    return Handler
+
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT):
+    """Serve ``service`` until interrupted."""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"✓ Serving {service.health()['rows']:,} orders from {service.source} "
+          f"on http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve KPIs and report tables over HTTP/JSON.")
+    parser.add_argument('--input', default=RAW_PATH, metavar='PATH',
+                        help="raw CSV, or a directory/glob of partitioned CSVs (default: %(default)s)")
+    parser.add_argument('--from', dest='start', metavar='YYYY[-MM]', help="first month to serve")
+    parser.add_argument('--to', dest='end', metavar='YYYY[-MM]', help="last month to serve")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--check-interval', type=float, default=CHECK_INTERVAL,
+                        help="seconds between checks for a changed source (default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        period = partitions.period(args.start, args.end)
+        service = KpiService(args.input, args.check_interval, period=period)
+    except (ValueError, FileNotFoundError, partitions.EmptySelection) as e:
+        parser.error(str(e))
+    serve(service, args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+Hash-sharded multi-core cleaning and aggregation of the in-memory frame.
+
+The in-memory path cleans and aggregates ``df`` on one core.
+``clean_and_aggregate`` splits the rows into one shard per worker by a hash
+of order_id (so every row of an order id lands in the same shard) and runs
+Section 2 plus the partial aggregates of each shard on a process pool.
+
+Rows are not pickled to the workers. The parent copies the typed columns once,
+grouped by shard, into a ``multiprocessing.shared_memory`` block: numbers and
+dates as raw arrays, categoricals as their codes, strings as Arrow offset and
+data buffers. Each worker maps the block and wraps its shard's contiguous
+slice of every column without copying. The arithmetic columns that cleaning
+derives (cost, profit, profit_margin, order_value_tier, is_high_discount) go
+back through a second shared block. Only the small partial aggregates, which
+hold means as sum/count pairs, are pickled back. The parent merges them with
+``merge_all`` exactly like --stream chunks or partitioned files, so the
+tables match the single-core run. It rebuilds ``df_clean`` in the original
+row order from the derived columns plus the cheap lookup steps (date parts,
+filled city/state).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from . import costs, profiling
+from .aggregates import merge_all, partial_aggregates
+from .cleaning import TIER_LABELS, add_date_parts, add_derived_columns, fill_missing
+from .quality import KEY, hash_values
+
+ALIGN = 64                       # byte alignment of each buffer in a shared block
+
+# Columns add_derived_columns computes, returned through shared memory
+# (order_value_tier as its category codes)
+DERIVED = {
+    'cost':             np.float64,
+    'profit':           np.float64,
+    'profit_margin':    np.float64,
+    'order_value_tier': np.int8,
+    'is_high_discount': np.int64,
+}
+TIER_DTYPE = pd.CategoricalDtype(TIER_LABELS, ordered=True)
+
+
+class ShardResult:
+    """Cleaned frame, merged partials and Section 2 counts of a sharded run."""
+
+    def __init__(self, df_clean, partials, missing_city, missing_disc, workers, shard_rows):
+        self.df_clean     = df_clean
+        self.partials     = partials
+        self.missing_city = missing_city
+        self.missing_disc = missing_disc
+        self.workers      = workers
+        self.shard_rows   = shard_rows     # rows per shard, in shard order
+
+
+def shard_ids(df, shards, key=KEY):
+    """Shard number of every row: a hash of ``key`` modulo ``shards``."""
+    return (hash_values(df[key]) % np.uint64(shards)).astype(np.int16)
+
+
+# ─── Shared-memory column layout ─────────────────────────────────
+def _aligned(size):
+    return -(-size // ALIGN) * ALIGN
+
+
+def _string_buffers(values):
+    """(offsets int64, UTF-8 data uint8, validity uint8 or None) of a string column."""
+    array = pa.array(values, type=pa.large_string())
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    validity, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64, count=len(array) + 1, offset=array.offset * 8)
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, np.uint8)
+    mask = np.frombuffer(validity, dtype=np.uint8) if array.null_count else None
+    return offsets, data, mask
+
+
+def _column_parts(series, order):
+    """Buffers to store for ``series`` taken in ``order``, plus how to rebuild it."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'codes': series.cat.codes.to_numpy()[order]}, ('category', dtype)
+    if dtype.kind in 'biufmM':
+        return {'values': series.to_numpy()[order]}, ('array', dtype)
+    if pa is None:
+        raise TypeError(f"column {series.name!r} ({dtype}) needs pyarrow to be shared")
+    offsets, data, mask = _string_buffers(series.array.take(order))
+    parts = {'offsets': offsets - offsets[0], 'data': data[offsets[0]:offsets[-1]]}
+    if mask is not None:
+        parts['validity'] = mask
+    return parts, ('string', dtype)
+
+
+class SharedBlock:
+    """Named arrays packed into one shared-memory block; ``layout`` maps them back."""
+
+    def __init__(self, arrays):
+        sizes = {name: _aligned(a.nbytes) for name, a in arrays.items()}
+        self.shm = shared_memory.SharedMemory(create=True, size=max(sum(sizes.values()), 1))
+        self.layout, offset = {}, 0
+        for name, a in arrays.items():
+            view = np.ndarray(a.shape, dtype=a.dtype, buffer=self.shm.buf, offset=offset)
+            view[...] = a
+            self.layout[name] = (offset, a.dtype.str, a.shape)
+            offset += sizes[name]
+            del view
+
+    @classmethod
+    def empty(cls, specs):
+        """A block of zeroed arrays from ``{name: (dtype, length)}``."""
+        return cls({name: np.zeros(n, dtype=dtype) for name, (dtype, n) in specs.items()})
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def views(self):
+        """{name: array} over this block's own mapping."""
+        return _views(self.shm, self.layout)
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(name, layout):
+    """(SharedMemory, {name: array view}) of a block made by SharedBlock."""
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, _views(shm, layout)
+
+
+def _views(shm, layout):
+    return {key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for key, (offset, dtype, shape) in layout.items()}
+
+
+def _rebuild(views, columns, start, stop):
+    """The rows ``start:stop`` of the shared columns as a DataFrame, without copying."""
+    data = {}
+    for col, (kind, dtype) in columns.items():
+        if kind == 'array':
+            data[col] = views[f"{col}.values"][start:stop]
+        elif kind == 'category':
+            data[col] = pd.Categorical.from_codes(views[f"{col}.codes"][start:stop], dtype=dtype)
+        else:
+            offsets = views[f"{col}.offsets"]
+            validity = views.get(f"{col}.validity")
+            array = pa.LargeStringArray.from_buffers(
+                len(offsets) - 1, pa.py_buffer(offsets), pa.py_buffer(views[f"{col}.data"]),
+                pa.py_buffer(validity) if validity is not None else None).slice(start, stop - start)
+            data[col] = pd.array(array, dtype=dtype)
+    return pd.DataFrame(data, copy=False)
+
+
+# ─── Worker ──────────────────────────────────────────────────────
+def _process_shard(block, layout, columns, out_block, out_layout, start, stop, profile, cost_model,
+                   store):
+    """Worker: clean and aggregate rows ``start:stop`` of the shared columns.
+
+    Writes the DERIVED columns into the output block at the same rows and
+    returns the partials and fill counts (plus the worker's profiler steps
+    when ``profile`` is set, as in partitions._process).
+    """
+    profiler = profiling.Profiler() if profile else None
+    if profiler is not None:
+        profiling.activate(profiler)
+    shm, views = attach(block, layout)
+    out_shm, out = attach(out_block, out_layout)
+    try:
+        chunk = _rebuild(views, columns, start, stop)
+        with profiling.step('2.1 date parsing', rows=len(chunk)):
+            add_date_parts(chunk)
+        with profiling.step('2.2 null fills', rows=len(chunk)):
+            missing_city, missing_disc = fill_missing(chunk)
+        with profiling.step('2.3 derived columns', rows=len(chunk)):
+            add_derived_columns(chunk, cost_model)
+        partials = partial_aggregates(chunk, store=store) if len(chunk) else None
+
+        for col in DERIVED:
+            values = chunk[col].cat.codes if col == 'order_value_tier' else chunk[col]
+            out[col][start:stop] = values.to_numpy()
+        del chunk, values
+    finally:
+        views.clear()
+        out.clear()
+        shm.close()
+        out_shm.close()
+        if profiler is not None:
+            profiling.activate(None)
+    return {
+        'partials':     partials,
+        'missing_city': missing_city,
+        'missing_disc': missing_disc,
+        'steps':        list(profiler.steps.values()) if profiler is not None else [],
+    }
+
+
+# ─── Parent ──────────────────────────────────────────────────────
+def clean_and_aggregate(df, workers=None, store=False):
+    """Section 2 and the partial aggregates of ``df`` on ``workers`` processes.
+
+    ``workers`` defaults to one per CPU; ``workers=1`` runs the one shard in
+    this process (same code path, no pool). ``store`` adds the aggregate-store
+    cuboid to the partials. Returns a ShardResult whose ``df_clean`` equals
+    cleaning.clean(df)[0].
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(df) or 1))
+    n = len(df)
+    with profiling.step('2.0 shard rows', rows=n):
+        shard = shard_ids(df, workers)
+        order = np.argsort(shard, kind='stable')            # radix sort of small ints: linear
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(shard, minlength=workers))])
+
+        arrays, columns = {}, {}
+        for col in df.columns:
+            parts, columns[col] = _column_parts(df[col], order)
+            arrays.update({f"{col}.{part}": a for part, a in parts.items()})
+        block = SharedBlock(arrays)
+        del arrays
+    out_block = SharedBlock.empty({col: (dtype, n) for col, dtype in DERIVED.items()})
+
+    try:
+        profile = workers > 1 and profiling.active() is not None
+        jobs = [(block.name, block.layout, columns, out_block.name, out_block.layout,
+                 int(bounds[i]), int(bounds[i + 1]), profile, costs.active(), store)
+                for i in range(workers)]
+        if workers == 1:
+            results = [_process_shard(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_process_shard, *zip(*jobs)))
+
+        for r in results:
+            for s in r['steps']:
+                profiling.record(s['step'], s['wall_s'], s['cpu_s'], s['rows'], s['peak_rss_mb'])
+        with profiling.step('4.3 merge partials'):
+            partials = merge_all([r['partials'] for r in results])
+
+        with profiling.step('2.4 assemble clean frame', rows=n):
+            df_clean = df.copy()
+            add_date_parts(df_clean)
+            fill_missing(df_clean)
+            out = out_block.views()
+            for col in DERIVED:
+                values = np.empty(n, dtype=DERIVED[col])
+                values[order] = out[col]
+                df_clean[col] = pd.Categorical.from_codes(values, dtype=TIER_DTYPE) \
+                    if col == 'order_value_tier' else values
+            out.clear()
+    finally:
+        block.release()
+        out_block.release()
+
+    return ShardResult(df_clean, partials,
+                       sum(r['missing_city'] for r in results),
+                       sum(r['missing_disc'] for r in results),
+                       workers, np.diff(bounds).tolist())
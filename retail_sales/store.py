@@ -0,0 +1,191 @@
+"""
+Queryable aggregate store for ad-hoc slicing without touching row-level data.
+
+A run with ``--store`` keeps, next to its report partials, a cuboid of
+STORE_MEASURES summed at STORE_GRAIN (day × product × city × channel ×
+segment × payment method). It has about as many cells as there are orders,
+so it is only built on request: --stream merges the chunk cuboids in
+batches, ``--append --store`` folds new orders into the stored one, and it
+is saved with the rest of the state, so ``open_store()`` is in step with
+the last run. Queries group and filter that cuboid instead of rescanning
+the clean CSV:
+
+    >>> from retail_sales.store import query
+    >>> query(dims=['category', 'channel'], measures=['revenue', 'profit'],
+    ...       filters={'year': 2024})
+
+Dimensions are the grain columns plus every calendar part of order_date
+(year, month, month_name, quarter, quarter_label, day_of_week, week_of_year,
+year_month). Row-level attributes such as order_value_tier are not in the
+store. Filters take a scalar or a list of allowed values. Results of
+repeated queries come from an LRU cache.
+
+``top`` ranks items within groups, e.g. the best products per city:
+
+    >>> open_store().top(['product_name'], 'revenue', k=3, by=['city'])
+
+Command: python -m retail_sales.store --dims category,channel --measures revenue,profit --filter year=2024
+         python -m retail_sales.store --top 3 --dims product_name --by city
+"""
+import argparse
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import STORE_GRAIN
+from .cleaning import DATE_PARTS, calendar_table
+from .config import STATE_PATH
+from .incremental import load_state
+from .ranking import top_k_per_group
+
+QUERY_CACHE_SIZE = 256
+
+# Sums that can be asked for directly, and ratio measures built from sums
+SUMS = ['revenue', 'orders', 'units', 'profit', 'returned']
+RATIOS = {
+    'avg_order_value': ('revenue',    'revenue_n', 1),
+    'avg_margin':      ('margin_sum', 'margin_n',  1),
+    'avg_discount':    ('disc_sum',   'disc_n',    1),
+    'return_rate':     ('returned',   'orders',    100),
+}
+
+
+class AggregateStore:
+    """A STORE_GRAIN cuboid plus a memoized ``query`` over it."""
+
+    def __init__(self, cuboid, cache_size=QUERY_CACHE_SIZE):
+        self.cuboid = cuboid
+        codes, days = pd.factorize(cuboid['order_date'])
+        self._date_codes = codes
+        self._calendar   = calendar_table(days)
+        self._query = functools.lru_cache(maxsize=cache_size)(self._run_query)
+
+    @property
+    def dimensions(self):
+        return [c for c in STORE_GRAIN] + [c for c in DATE_PARTS if c not in STORE_GRAIN]
+
+    @property
+    def measures(self):
+        return SUMS + list(RATIOS)
+
+    def _column(self, name):
+        if name in DATE_PARTS:
+            return self._calendar[name].array.take(self._date_codes)
+        return self.cuboid[name].array
+
+    def query(self, dims=(), measures=('revenue',), filters=None):
+        """Measures per combination of ``dims``, over cells matching ``filters``.
+
+        Returns a DataFrame indexed by ``dims`` (a one-row frame when ``dims``
+        is empty). Identical queries are answered from the LRU cache.
+        """
+        dims, measures = tuple(dims), tuple(measures)
+        unknown = [d for d in dims + tuple(filters or ()) if d not in self.dimensions]
+        unknown += [m for m in measures if m not in self.measures]
+        if unknown:
+            raise ValueError(f"unknown dimension(s)/measure(s): {unknown}")
+
+        key = tuple(sorted(
+            (col, tuple(v) if isinstance(v, (list, tuple, set)) else v)
+            for col, v in (filters or {}).items()))
+        return self._query(dims, measures, key).copy()
+
+    def _run_query(self, dims, measures, filters):
+        mask = np.ones(len(self.cuboid), dtype=bool)
+        for col, allowed in filters:
+            values = pd.Series(self._column(col))
+            mask &= (values.isin(allowed) if isinstance(allowed, tuple) else values == allowed).to_numpy()
+
+        needed = set(m for m in measures if m in SUMS)
+        for m in measures:
+            if m in RATIOS:
+                needed.update(RATIOS[m][:2])
+        frame = pd.DataFrame({col: self._column(col) for col in dims})
+        for col in sorted(needed):
+            frame[col] = self.cuboid[col].to_numpy()
+        frame = frame[mask]
+
+        if dims:
+            g = frame.groupby(list(dims), observed=True).sum()
+        else:
+            g = frame.sum().to_frame().T
+        for m in measures:
+            if m in RATIOS:
+                total, count, scale = RATIOS[m]
+                g[m] = g[total] / g[count].replace(0, np.nan) * scale
+        return g[list(measures)]
+
+    def top(self, items, measure='revenue', k=10, by=(), filters=None, largest=True):
+        """The ``k`` best ``items`` by ``measure``, within each combination of ``by``.
+
+        ``top(['product_name'], 'revenue', 3, by=['city'])`` gives the three
+        best-selling products of every city, ranked by ranking.top_k_per_group
+        rather than a sort of the whole result.
+        """
+        items, by = list(items), list(by)
+        if not items:
+            raise ValueError("top needs at least one item dimension")
+        g = self.query(by + items, [measure], filters).reset_index()
+        return top_k_per_group(g, by, measure, k, largest).set_index(by + ['rank'])
+
+    def cache_info(self):
+        return self._query.cache_info()
+
+
+@functools.lru_cache(maxsize=4)
+def _open(path, mtime_ns):
+    state = load_state(path)
+    if state is None or 'cuboid' not in state['partials']:
+        raise FileNotFoundError(f"no aggregate store in {path} - run the analysis with --store first")
+    return AggregateStore(state['partials']['cuboid'])
+
+
+def open_store(path=STATE_PATH):
+    """The store saved by the last run (reloaded only when the state file changes)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"no aggregate store in {path} - run the analysis with --store first")
+    return _open(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+def query(dims=(), measures=('revenue',), filters=None, path=STATE_PATH):
+    """``open_store(path).query(dims, measures, filters)``."""
+    return open_store(path).query(dims, measures, filters)
+
+
+def _filter_arg(text):
+    col, _, values = text.partition('=')
+    parsed = [int(v) if v.lstrip('-').isdigit() else v for v in values.split(',')]
+    return col, parsed[0] if len(parsed) == 1 else parsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the stored sales aggregates.")
+    parser.add_argument('--dims', default='', help="comma-separated dimensions to group by")
+    parser.add_argument('--measures', default='revenue', help="comma-separated measures")
+    parser.add_argument('--filter', type=_filter_arg, action='append', default=[],
+                        metavar='COL=V[,V...]', help="keep cells whose COL is one of the values")
+    parser.add_argument('--top', type=int, metavar='K',
+                        help="only the K best --dims combinations by the first measure")
+    parser.add_argument('--by', default='', help="with --top: rank within each of these dimensions")
+    parser.add_argument('--bottom', action='store_true', help="with --top: the K worst instead")
+    parser.add_argument('--state', default=STATE_PATH)
+    args = parser.parse_args(argv)
+    if args.top is None and (args.by or args.bottom):
+        parser.error("--by and --bottom need --top")
+
+    split = lambda s: [x for x in s.split(',') if x]
+    try:
+        if args.top is not None:
+            result = open_store(args.state).top(split(args.dims), split(args.measures)[0], args.top,
+                                                split(args.by), dict(args.filter), not args.bottom)
+        else:
+            result = query(split(args.dims), split(args.measures), dict(args.filter), path=args.state)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+    print(result.round(2).to_string())
+
+
+if __name__ == '__main__':
+    main()
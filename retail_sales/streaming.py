@@ -0,0 +1,232 @@
+"""
+Chunked (streaming) cleaning + aggregation.
+
+Reads the raw CSV ``chunksize`` rows at a time through the typed schema
+loader, cleans each chunk with the same Section 2 steps as the in-memory
+path, folds it into running partial aggregates and optionally appends it to
+the cleaned CSV. Only one chunk and the (small) per-group totals are ever
+held in memory. The Section 1 data-quality profile is collected from the
+same chunks.
+
+With ``pipeline=True`` the three kinds of work overlap instead of taking
+turns: a reader thread parses the next chunks while the current one is
+cleaned and aggregated, and a writer thread appends the cleaned chunks to
+the CSV behind it. They are joined by queues of ``depth`` chunks, so a slow
+stage holds the others back instead of letting chunks pile up in memory
+(a few chunks are held instead of one), and the wall time approaches that
+of the slowest stage. pandas' CSV tokenizer and file writes release the
+GIL, which is what lets the threads run side by side.
+"""
+import queue
+import threading
+
+from . import profiling
+from .aggregates import CuboidBatches, finalize_tables, merge_partials, partial_aggregates
+from .cleaning import add_date_parts, add_derived_columns, fill_missing
+from .config import DEFAULT_CHUNKSIZE
+from .quality import QualityProfile
+from .schema import discard_rejected, iter_typed
+
+PIPELINE_DEPTH = 2               # chunks queued between pipelined stages
+_DONE = object()                 # end-of-stream marker on the queues
+
+
+class StreamResult:
+    """Tables plus the row/fill counts the script prints for Sections 1-2."""
+
+    def __init__(self, tables, partials, rows, rejected, columns, missing_city,
+                 missing_disc, min_date, max_date, quality=None):
+        self.tables       = tables
+        self.partials     = partials
+        self.rows         = rows
+        self.rejected     = rejected
+        self.columns      = columns
+        self.missing_city = missing_city
+        self.missing_disc = missing_disc
+        self.min_date     = min_date
+        self.max_date     = max_date
+        self.quality      = quality        # quality.QualityProfile of the typed rows, if collected
+
+
+class _Failed:
+    """An exception raised on a pipeline thread, carried to the main one."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def prefetch(iterable, depth=PIPELINE_DEPTH):
+    """Iterate ``iterable`` on a background thread, up to ``depth`` items ahead.
+
+    Exceptions from the producer are re-raised in the consumer; when the
+    consumer stops early the producer stops at its next item.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failed(e))
+
+    thread = threading.Thread(target=produce, name='prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class BackgroundWriter:
+    """Runs submitted write calls in order on one thread, ``depth`` calls deep.
+
+    ``submit`` blocks while the queue is full. The first failure is raised
+    from the next ``submit`` or from ``close``, which waits for all writes
+    (``close(raise_error=False)`` drops it, for when another error is already
+    on its way up).
+    """
+
+    def __init__(self, depth=PIPELINE_DEPTH):
+        self._jobs   = queue.Queue(maxsize=depth)
+        self._error  = None
+        self._thread = threading.Thread(target=self._run, name='writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is _DONE:
+                return
+            if self._error is None:
+                try:
+                    job()
+                except BaseException as e:
+                    self._error = e
+
+    def _raise(self):
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, fn, *args, **kwargs):
+        self._raise()
+        self._jobs.put(lambda: fn(*args, **kwargs))
+
+    def close(self, raise_error=True):
+        self._jobs.put(_DONE)
+        self._thread.join()
+        if raise_error:
+            self._raise()
+
+
+def _write_csv(chunk, path, first):
+    with profiling.step('7 clean csv', rows=len(chunk)):
+        chunk.to_csv(path, index=False, mode='w' if first else 'a', header=first)
+
+
+def stream_tables(path, chunksize=DEFAULT_CHUNKSIZE, clean_csv_path=None,
+                  rejected_csv_path=None, initial=None, append_csv=False,
+                  pipeline=False, depth=PIPELINE_DEPTH, store=False):
+    """Clean and aggregate ``path`` chunk by chunk.
+
+    If ``clean_csv_path`` is given, each cleaned chunk is written to it, so
+    the file matches ``df_clean.to_csv(index=False)`` from the in-memory path
+    (with ``append_csv`` the rows are added to the end of an existing file).
+    Rows that fail the schema are written to ``rejected_csv_path`` if given
+    (a file left there by an earlier run is removed when none fail).
+    ``initial`` partials, e.g. from a previous run, are merged into the result.
+    ``pipeline`` overlaps reading, cleaning and writing (see the module docstring).
+    ``store`` also builds the aggregate-store cuboid; the chunk cuboids are
+    merged in batches (aggregates.CuboidBatches), not after every chunk.
+    """
+    partials = initial
+    cuboids = CuboidBatches() if store else None
+    if store and initial is not None and 'cuboid' in initial:
+        partials = dict(initial)
+        cuboids.add(partials.pop('cuboid'))
+    rows = rejected = missing_city = missing_disc = 0
+    columns = None
+    min_date = max_date = None
+    quality = QualityProfile()
+    chunks = iter_typed(path, chunksize)
+    writer = None
+    finished = False
+    if pipeline:
+        chunks = prefetch(chunks, depth)
+        writer = BackgroundWriter(depth) if clean_csv_path is not None else None
+    try:
+        for i, loaded in enumerate(chunks):
+            chunk = loaded.df
+            if columns is None:
+                columns = len(chunk.columns)
+            if len(loaded.rejected) and rejected_csv_path is not None:
+                loaded.rejected.to_csv(rejected_csv_path, index=False,
+                                       mode='a' if rejected else 'w', header=not rejected)
+            rejected += len(loaded.rejected)
+            with profiling.step('1.2 quality profile', rows=len(chunk)):
+                quality.update(chunk)
+
+            with profiling.step('2.1 date parsing', rows=len(chunk)):
+                add_date_parts(chunk)
+            with profiling.step('2.2 null fills', rows=len(chunk)):
+                n_city, n_disc = fill_missing(chunk)
+            with profiling.step('2.3 derived columns', rows=len(chunk)):
+                add_derived_columns(chunk)
+
+            chunk_partials = partial_aggregates(chunk, store=store)
+            with profiling.step('4.3 merge partials'):
+                if store:
+                    cuboids.add(chunk_partials.pop('cuboid'))
+                partials = merge_partials(partials, chunk_partials)
+
+            rows         += len(chunk)
+            missing_city += n_city
+            missing_disc += n_disc
+            lo, hi = chunk['order_date'].min(), chunk['order_date'].max()
+            min_date = lo if min_date is None else min(min_date, lo)
+            max_date = hi if max_date is None else max(max_date, hi)
+
+            if clean_csv_path is not None:
+                first = i == 0 and not append_csv
+                if writer is not None:
+                    writer.submit(_write_csv, chunk, clean_csv_path, first)   # chunk is not touched again
+                else:
+                    _write_csv(chunk, clean_csv_path, first)
+        finished = True
+    finally:
+        if pipeline:
+            chunks.close()           # stops the reader thread if the loop ended early
+        if writer is not None:
+            writer.close(raise_error=finished)   # never mask the error that ended the loop
+
+    if partials is None:
+        raise ValueError(f"{path} contains no rows")
+    if not rejected:
+        discard_rejected(rejected_csv_path)
+    if store:
+        with profiling.step('4.3 merge partials'):
+            partials['cuboid'] = cuboids.result()
+
+    with profiling.step('4.4 finalize tables'):
+        tables = finalize_tables(partials)
+    return StreamResult(tables, partials, rows, rejected, columns,
+                        missing_city, missing_disc, min_date, max_date, quality)
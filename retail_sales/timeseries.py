@@ -0,0 +1,179 @@
+"""
+Rolling-window and same-period-last-year metrics from daily cumulative sums.
+
+The monthly table only has ``mom_growth`` and the yoy table compares whole
+years. Here every dimension in SERIES_DIMS gets a ``DailySeries``: for each
+SERIES_MEASURES column, a days × values array of running totals, one row per
+calendar day (days without orders included). Any window is then two row
+lookups - total(a, b] = cum[b] - cum[a] - so 7/28/90-day, trailing-twelve-
+month and last-year windows cost O(values) each, never a pass over orders.
+
+The series is built from the per-day totals kept in the partial aggregates
+(``aggregates.daily_partials``) and saved with the aggregate state.
+``--append`` adds only the new orders' daily totals (``DailySeries.add``),
+which touches the rows from the first new day onwards: O(new days × values)
+for a normal daily refresh, and only more when late orders land before the
+previous high-water mark. Memory is days × values per measure, independent
+of the number of orders.
+"""
+import numpy as np
+import pandas as pd
+
+from . import profiling
+
+SERIES_DIMS     = ['category', 'city', 'channel']
+SERIES_MEASURES = ['revenue', 'orders']
+
+# Rolling windows in days, plus the trailing twelve months (as_of - 1 year, as_of]
+WINDOWS = {'7d': 7, '28d': 28, '90d': 90}
+TTM = 'ttm'
+
+TOTAL = 'All'
+
+
+class DailySeries:
+    """Running totals per calendar day of SERIES_MEASURES for each value of one dimension.
+
+    ``cum[m][i]`` holds the totals of measure ``m`` over the days before
+    ``start + i days``, so ``cum[m][0]`` is all zeros and the array has one
+    more row than there are days.
+    """
+
+    def __init__(self, dim, start, keys, cum):
+        self.dim   = dim
+        self.start = start           # first day covered
+        self.keys  = keys            # pd.Index of dimension values (array columns)
+        self.cum   = cum             # measure → (days + 1) × keys float array
+
+    @property
+    def days(self):
+        return pd.date_range(self.start, periods=len(self.cum[SERIES_MEASURES[0]]) - 1, freq='D')
+
+    @property
+    def end(self):
+        """Last day covered."""
+        return self.start + pd.Timedelta(days=len(self.cum[SERIES_MEASURES[0]]) - 2)
+
+    @classmethod
+    def empty(cls, dim, start):
+        return cls(dim, start, pd.Index([], dtype=str, name=dim),
+                   {m: np.zeros((1, 0)) for m in SERIES_MEASURES})
+
+    def add(self, daily):
+        """Fold daily totals (columns order_date, ``dim`` and SERIES_MEASURES) into the series.
+
+        Only rows from the earliest day in ``daily`` onwards are updated.
+        """
+        if daily.empty:
+            return self
+        first, last = daily['order_date'].min(), daily['order_date'].max()
+        if first < self.start:
+            self._grow(before=(self.start - first).days)
+        if last > self.end:
+            self._grow(after=(last - self.end).days)
+        values = daily[self.dim].astype(str)
+        new_keys = pd.Index(values.unique(), name=self.dim).difference(self.keys)
+        if len(new_keys):
+            self.keys = self.keys.append(new_keys)
+            for m in SERIES_MEASURES:
+                self.cum[m] = np.hstack([self.cum[m], np.zeros((len(self.cum[m]), len(new_keys)))])
+
+        lo = (first - self.start).days
+        row = (daily['order_date'] - first).dt.days.to_numpy()
+        col = self.keys.get_indexer(values)
+        n_rows = len(self.cum[SERIES_MEASURES[0]]) - 1 - lo
+        for m in SERIES_MEASURES:
+            step = np.zeros((n_rows, len(self.keys)))
+            np.add.at(step, (row, col), daily[m].to_numpy(dtype=float))
+            self.cum[m][lo + 1:] += np.cumsum(step, axis=0)
+        return self
+
+    def _grow(self, before=0, after=0):
+        for m in SERIES_MEASURES:
+            c = self.cum[m]
+            self.cum[m] = np.vstack([np.zeros((before, c.shape[1])), c,
+                                     np.repeat(c[-1:], after, axis=0)])
+        self.start -= pd.Timedelta(days=before)
+
+    def _position(self, day):
+        """Row of ``cum`` holding the totals up to and including ``day``, or None if outside."""
+        i = (pd.Timestamp(day) - self.start).days + 1
+        return i if 0 <= i < len(self.cum[SERIES_MEASURES[0]]) else None
+
+    def window(self, end, days, measure='revenue'):
+        """Totals per value over the ``days`` days ending on ``end`` (NaN if not fully covered)."""
+        hi, lo = self._position(end), self._position(pd.Timestamp(end) - pd.Timedelta(days=days))
+        if hi is None or lo is None:
+            return pd.Series(np.nan, index=self.keys)
+        c = self.cum[measure]
+        return pd.Series(c[hi] - c[lo], index=self.keys)
+
+    def rolling(self, days, measure='revenue'):
+        """Rolling ``days``-day totals for every day (days × values frame, NaN until covered)."""
+        c = self.cum[measure]
+        out = np.full((len(c) - 1, len(self.keys)), np.nan)
+        out[days - 1:] = c[days:] - c[:len(c) - days]
+        return pd.DataFrame(out, index=self.days, columns=self.keys)
+
+
+def daily_totals(cuboid, dims=SERIES_DIMS):
+    """{dim: SERIES_MEASURES per day and value}, from a store cuboid (for states without daily totals)."""
+    return {dim: cuboid.groupby(['order_date', dim], observed=True)[SERIES_MEASURES].sum().reset_index()
+            for dim in dims}
+
+
+def build_series(daily):
+    """A DailySeries per dimension from daily totals ({dim: frame}, see aggregates.daily_partials)."""
+    start = min(frame['order_date'].min() for frame in daily.values())
+    series = {}
+    for dim, frame in daily.items():
+        with profiling.step(f"4.7 daily series {dim}", rows=len(frame)):
+            series[dim] = DailySeries.empty(dim, start).add(frame)
+    return series
+
+
+def update_series(series, daily):
+    """Fold the daily totals of new orders (``daily``, new rows only) into ``series`` in place."""
+    for dim, s in series.items():
+        with profiling.step(f"4.7 daily series {dim}", rows=len(daily[dim])):
+            s.add(daily[dim])
+    return series
+
+
+def _pct(now, before):
+    return (now - before) / before.replace(0, np.nan) * 100
+
+
+def window_metrics(series, as_of=None, measure='revenue'):
+    """Rolling, trailing-twelve-month and same-period-last-year totals per value.
+
+    Each window in WINDOWS and TTM ends on ``as_of`` (default: the last day
+    in the series). ``<w>_ly`` is the same window one year earlier and
+    ``<w>_yoy`` the change against it in percent; windows reaching before the
+    first day are NaN. The last row (TOTAL) covers all values together.
+    TTM is a calendar year on both sides, (as_of - 1 year, as_of] against
+    (as_of - 2 years, as_of - 1 year], so the two can differ by a Feb 29.
+    """
+    as_of = series.end if as_of is None else pd.Timestamp(as_of)
+    last_year = as_of - pd.DateOffset(years=1)
+    lengths    = {**WINDOWS, TTM: (as_of - last_year).days}
+    lengths_ly = {**WINDOWS, TTM: (last_year - (last_year - pd.DateOffset(years=1))).days}
+
+    table = pd.DataFrame(index=series.keys)
+    for name, days in lengths.items():
+        table[name]          = series.window(as_of, days, measure)
+        table[f"{name}_ly"]  = series.window(last_year, lengths_ly[name], measure)
+    table.loc[TOTAL] = table.sum(min_count=1)
+    for name in lengths:
+        table[f"{name}_yoy"] = _pct(table[name], table[f"{name}_ly"])
+    table = table[[f"{name}{suffix}" for name in lengths for suffix in ('', '_ly', '_yoy')]]
+    # Largest first by the longest window the series covers
+    by = next((name for name in reversed(lengths) if table[name].notna().any()), TTM)
+    order = table.drop(index=TOTAL).sort_values(by, ascending=False).index.append(pd.Index([TOTAL]))
+    return table.reindex(order).round(2)
+
+
+def compute_metrics(series, as_of=None):
+    """``window_metrics`` for every dimension in ``series``."""
+    with profiling.step('4.8 window metrics'):
+        return {dim: window_metrics(s, as_of) for dim, s in series.items()}
@@ -15,634 +15,9 @@ Q6. How do different sales channels compare?
 Q7. What is the impact of discounts on revenue?
 """
 
-# ══════════════════════════════════════════════════════════════════
-# SECTION 0: SETUP - Import libraries
-# ══════════════════════════════════════════════════════════════════
-import pandas as pd
-import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import seaborn as sns
-import warnings
-warnings.filterwarnings('ignore')
+# The analysis itself lives in the retail_sales package as a staged pipeline
+# (retail_sales/pipeline.py); the printed report is in retail_sales/report.py.
+from retail_sales.cli import main
 
-# Style settings - makes charts look professional
-plt.rcParams['figure.figsize']  = (12, 6)
-plt.rcParams['font.family']     = 'DejaVu Sans'
-plt.rcParams['axes.spines.top']    = False
-plt.rcParams['axes.spines.right']  = False
-sns.set_palette("husl")
-
-print("=" * 65)
-print("  PROJECT 1: RETAIL SALES PERFORMANCE ANALYSIS")
-print("=" * 65)
-print("✓ Libraries loaded successfully\n")
-
-
-# ══════════════════════════════════════════════════════════════════
-# SECTION 1: MORNING - Load & Explore Data
-# ══════════════════════════════════════════════════════════════════
-print("━" * 65)
-print("  SECTION 1: DATA LOADING & EXPLORATION")
-print("━" * 65)
-
-# ─── 1.1 Load the dataset ────────────────────────────────────────
-df = pd.read_csv('data/retail_sales_raw.csv')
-
-print(f"\n📂 Dataset loaded!")
-print(f"   Shape: {df.shape[0]:,} rows × {df.shape[1]} columns")
-
-# ─── 1.2 First look at data ──────────────────────────────────────
-print("\n📋 First 5 rows:")
-print(df.head().to_string())
-
-# ─── 1.3 Data types and structure ────────────────────────────────
-print("\n🔍 Column Info:")
-print(f"{'Column':<20} {'Dtype':<15} {'Non-Null Count':<15} {'Sample'}")
-print("-" * 70)
-for col in df.columns:
-    dtype    = str(df[col].dtype)
-    non_null = df[col].count()
-    sample   = str(df[col].dropna().iloc[0]) if non_null > 0 else "N/A"
-    print(f"{col:<20} {dtype:<15} {non_null:<15,} {sample[:30]}")
-
-# ─── 1.4 Statistical summary ─────────────────────────────────────
-print("\n📊 Statistical Summary (Numeric Columns):")
-print(df.describe().round(2).to_string())
-
-# ─── 1.5 Missing values check ────────────────────────────────────
-print("\n🔎 Missing Values Check:")
-missing = df.isnull().sum()
-missing_pct = (missing / len(df) * 100).round(2)
-missing_df = pd.DataFrame({'Missing Count': missing, 'Missing %': missing_pct})
-missing_df = missing_df[missing_df['Missing Count'] > 0]
-if len(missing_df) > 0:
-    print(missing_df.to_string())
-else:
-    print("   No missing values found!")
-
-# ─── 1.6 Duplicates check ────────────────────────────────────────
-dupes = df.duplicated().sum()
-print(f"\n🔎 Duplicate Rows: {dupes:,}")
-
-# ─── 1.7 Unique value counts ─────────────────────────────────────
-print("\n🔎 Unique Values per Category Column:")
-cat_cols = ['category', 'city', 'customer_segment', 'payment_method', 'channel']
-for col in cat_cols:
-    uniq = df[col].nunique()
-    vals = df[col].dropna().unique()[:5]
-    print(f"   {col}: {uniq} unique → {list(vals)}")
-
-
-# ══════════════════════════════════════════════════════════════════
-# SECTION 2: AFTERNOON - Data Cleaning & Preparation
-# ══════════════════════════════════════════════════════════════════
-print("\n" + "━" * 65)
-print("  SECTION 2: DATA CLEANING & PREPARATION")
-print("━" * 65)
-
-df_clean = df.copy()
-
-# ─── 2.1 Fix date column ─────────────────────────────────────────
-print("\n🔧 Step 1: Converting date column...")
-df_clean['order_date'] = pd.to_datetime(df_clean['order_date'])
-
-# Extract date parts - very useful for analysis!
-df_clean['year']          = df_clean['order_date'].dt.year
-df_clean['month']         = df_clean['order_date'].dt.month
-df_clean['month_name']    = df_clean['order_date'].dt.strftime('%b')
-df_clean['quarter']       = df_clean['order_date'].dt.quarter
-df_clean['quarter_label'] = 'Q' + df_clean['quarter'].astype(str)
-df_clean['day_of_week']   = df_clean['order_date'].dt.day_name()
-df_clean['week_of_year']  = df_clean['order_date'].dt.isocalendar().week.astype(int)
-df_clean['year_month']    = df_clean['order_date'].dt.to_period('M').astype(str)
-print("   ✓ Date parts extracted: year, month, quarter, day_of_week")
-
-# ─── 2.2 Handle missing values ───────────────────────────────────
-print("\n🔧 Step 2: Handling missing values...")
-
-# Missing city → fill with 'Unknown'
-missing_city = df_clean['city'].isnull().sum()
-df_clean['city']  = df_clean['city'].fillna('Unknown')
-df_clean['state'] = df_clean['state'].fillna('Unknown')
-print(f"   ✓ City: filled {missing_city} missing values with 'Unknown'")
-
-# Missing discount_pct → fill with 0 (no discount)
-missing_disc = df_clean['discount_pct'].isnull().sum()
-df_clean['discount_pct'] = df_clean['discount_pct'].fillna(0)
-print(f"   ✓ Discount %: filled {missing_disc} missing values with 0 (no discount)")
-
-# Verify no missing values remain
-remaining_missing = df_clean.isnull().sum().sum()
-print(f"   ✓ Remaining missing values: {remaining_missing}")
-
-# ─── 2.3 Create derived/calculated columns ───────────────────────
-print("\n🔧 Step 3: Creating derived columns...")
-
-# Profit margin (assume 35% base cost for Electronics, 60% for others)
-cost_pct = df_clean['category'].map({
-    'Electronics': 0.65,
-    'Furniture':   0.60,
-    'Books':       0.50,
-    'Accessories': 0.45,
-    'Stationery':  0.40
-})
-df_clean['cost']          = (df_clean['revenue'] * cost_pct).round(2)
-df_clean['profit']        = (df_clean['revenue'] - df_clean['cost']).round(2)
-df_clean['profit_margin'] = ((df_clean['profit'] / df_clean['revenue']) * 100).round(2)
-
-# Revenue bins for customer value segmentation
-df_clean['order_value_tier'] = pd.cut(
-    df_clean['revenue'],
-    bins   = [0, 1000, 5000, 20000, float('inf')],
-    labels = ['Low (<₹1K)', 'Medium (₹1K-5K)', 'High (₹5K-20K)', 'Premium (>₹20K)']
-)
-
-# Flag high-discount orders (>20% discount)
-df_clean['is_high_discount'] = (df_clean['discount_pct'] > 0.20).astype(int)
-
-print("   ✓ profit, profit_margin columns created")
-print("   ✓ order_value_tier column created")
-print("   ✓ is_high_discount flag created")
-
-# ─── 2.4 Final clean dataset summary ─────────────────────────────
-print(f"\n✅ Data Cleaning Complete!")
-print(f"   Rows: {len(df_clean):,} (no rows dropped)")
-print(f"   Columns: {len(df_clean.columns)} (was {len(df.columns)}, added {len(df_clean.columns)-len(df.columns)} derived)")
-print(f"   Date range: {df_clean['order_date'].min().date()} → {df_clean['order_date'].max().date()}")
-
-
-# ══════════════════════════════════════════════════════════════════
-# SECTION 3: EVENING - KPI Calculation & Basic Analysis
-# ══════════════════════════════════════════════════════════════════
-print("\n" + "━" * 65)
-print("  SECTION 3: KEY PERFORMANCE INDICATORS (KPIs)")
-print("━" * 65)
-
-total_revenue   = df_clean['revenue'].sum()
-total_orders    = len(df_clean)
-total_profit    = df_clean['profit'].sum()
-avg_order_value = df_clean['revenue'].mean()
-total_units     = df_clean['quantity'].sum()
-avg_margin      = df_clean['profit_margin'].mean()
-return_rate     = df_clean['is_returned'].mean() * 100
-discount_rate   = (df_clean['discount_pct'] > 0).mean() * 100
-
-print(f"""
-┌─────────────────────────────────────────────────────────┐
-│              OVERALL BUSINESS KPIs (2023-2024)          │
-├─────────────────────────────────────────────────────────┤
-│  💰 Total Revenue:       ₹{total_revenue:>15,.0f}            │
-│  📦 Total Orders:        {total_orders:>15,}            │
-│  📈 Total Profit:        ₹{total_profit:>15,.0f}            │
-│  🛒 Avg Order Value:     ₹{avg_order_value:>15,.2f}            │
-│  📊 Avg Profit Margin:   {avg_margin:>14.1f}%            │
-│  📦 Total Units Sold:    {total_units:>15,}            │
-│  🔄 Return Rate:         {return_rate:>14.1f}%            │
-│  🏷️  Orders with Discount: {discount_rate:>12.1f}%            │
-└─────────────────────────────────────────────────────────┘""")
-
-# ─── Year over Year comparison ───────────────────────────────────
-print("\n📊 Year-over-Year Comparison:")
-yoy = df_clean.groupby('year').agg(
-    revenue      = ('revenue', 'sum'),
-    orders       = ('order_id', 'count'),
-    profit       = ('profit', 'sum'),
-    avg_order    = ('revenue', 'mean'),
-    units        = ('quantity', 'sum')
-).round(2)
-yoy['revenue_growth'] = yoy['revenue'].pct_change() * 100
-yoy['order_growth']   = yoy['orders'].pct_change() * 100
-print(yoy.to_string())
-
-
-# ══════════════════════════════════════════════════════════════════
-# SECTION 4: MORNING DAY 2 - Advanced Analysis with GroupBy
-# ══════════════════════════════════════════════════════════════════
-print("\n" + "━" * 65)
-print("  SECTION 4: ADVANCED ANALYSIS")
-print("━" * 65)
-
-# ─── Q2: Category Analysis ───────────────────────────────────────
-print("\n📊 Q2: Revenue by Category")
-cat_analysis = df_clean.groupby('category').agg(
-    total_revenue  = ('revenue', 'sum'),
-    total_orders   = ('order_id', 'count'),
-    total_units    = ('quantity', 'sum'),
-    avg_order_val  = ('revenue', 'mean'),
-    avg_margin     = ('profit_margin', 'mean'),
-    total_profit   = ('profit', 'sum')
-).round(2).sort_values('total_revenue', ascending=False)
-
-cat_analysis['revenue_share_pct'] = (cat_analysis['total_revenue'] / total_revenue * 100).round(1)
-print(cat_analysis.to_string())
-
-# ─── Q3: City Analysis ───────────────────────────────────────────
-print("\n📊 Q3: Revenue by City (Top 8)")
-city_analysis = df_clean[df_clean['city'] != 'Unknown'].groupby('city').agg(
-    total_revenue = ('revenue', 'sum'),
-    total_orders  = ('order_id', 'count'),
-    avg_order_val = ('revenue', 'mean'),
-    avg_margin    = ('profit_margin', 'mean')
-).round(2).sort_values('total_revenue', ascending=False)
-
-city_analysis['revenue_share_pct'] = (city_analysis['total_revenue'] / total_revenue * 100).round(1)
-print(city_analysis.to_string())
-
-# ─── Q4: Monthly Trend ───────────────────────────────────────────
-print("\n📊 Q4: Monthly Revenue Trend")
-monthly = df_clean.groupby(['year', 'month', 'month_name']).agg(
-    revenue = ('revenue', 'sum'),
-    orders  = ('order_id', 'count')
-).reset_index().sort_values(['year', 'month'])
-monthly['mom_growth'] = monthly['revenue'].pct_change() * 100
-
-print(monthly[['year', 'month_name', 'revenue', 'orders', 'mom_growth']].to_string(index=False))
-
-# ─── Q4b: Quarterly Analysis ─────────────────────────────────────
-print("\n📊 Q4b: Quarterly Revenue")
-quarterly = df_clean.groupby(['year', 'quarter_label']).agg(
-    revenue = ('revenue', 'sum'),
-    orders  = ('order_id', 'count'),
-    profit  = ('profit', 'sum')
-).reset_index()
-quarterly['profit_margin_pct'] = (quarterly['profit'] / quarterly['revenue'] * 100).round(1)
-print(quarterly.to_string(index=False))
-
-# ─── Q5: Product Analysis ────────────────────────────────────────
-print("\n📊 Q5: Top 10 Products by Revenue")
-product_analysis = df_clean.groupby(['product_id', 'product_name', 'category']).agg(
-    total_revenue = ('revenue', 'sum'),
-    total_units   = ('quantity', 'sum'),
-    total_orders  = ('order_id', 'count'),
-    avg_margin    = ('profit_margin', 'mean')
-).reset_index().sort_values('total_revenue', ascending=False)
-product_analysis['revenue_rank'] = range(1, len(product_analysis) + 1)
-print(product_analysis.head(10).to_string(index=False))
-
-print("\n📊 Q5b: Bottom 5 Products (Lowest Revenue)")
-print(product_analysis.tail(5).to_string(index=False))
-
-# ─── Q6: Channel Analysis ────────────────────────────────────────
-print("\n📊 Q6: Sales Channel Performance")
-channel_analysis = df_clean.groupby('channel').agg(
-    revenue    = ('revenue', 'sum'),
-    orders     = ('order_id', 'count'),
-    avg_order  = ('revenue', 'mean'),
-    avg_margin = ('profit_margin', 'mean')
-).round(2).sort_values('revenue', ascending=False)
-channel_analysis['revenue_share'] = (channel_analysis['revenue'] / total_revenue * 100).round(1)
-print(channel_analysis.to_string())
-
-# ─── Q7: Discount Impact Analysis ────────────────────────────────
-print("\n📊 Q7: Discount Impact on Revenue")
-discount_analysis = df_clean.groupby('is_high_discount').agg(
-    orders        = ('order_id', 'count'),
-    total_revenue = ('revenue', 'sum'),
-    avg_revenue   = ('revenue', 'mean'),
-    avg_margin    = ('profit_margin', 'mean'),
-    avg_discount  = ('discount_pct', 'mean')
-).round(2)
-discount_analysis.index = ['No High Discount', 'High Discount (>20%)']
-print(discount_analysis.to_string())
-
-# ─── Pareto Analysis (80/20 rule) ────────────────────────────────
-print("\n📊 PARETO ANALYSIS: What % of products = 80% of revenue?")
-prod_rev = product_analysis.sort_values('total_revenue', ascending=False)
-prod_rev['cumulative_revenue']    = prod_rev['total_revenue'].cumsum()
-prod_rev['cumulative_revenue_pct'] = prod_rev['cumulative_revenue'] / total_revenue * 100
-prod_rev['product_pct']           = (np.arange(1, len(prod_rev)+1) / len(prod_rev)) * 100
-
-eighty_pct_threshold = prod_rev[prod_rev['cumulative_revenue_pct'] >= 80].iloc[0]
-print(f"   Top {eighty_pct_threshold['product_pct']:.0f}% of products generate 80% of revenue")
-print(f"   Products in top 80% revenue: {prod_rev[prod_rev['cumulative_revenue_pct'] <= 80].shape[0]} out of {len(prod_rev)}")
-
-# ─── Day of Week Analysis ────────────────────────────────────────
-print("\n📊 Day of Week Revenue Pattern:")
-dow_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-dow = df_clean.groupby('day_of_week').agg(
-    revenue = ('revenue', 'sum'),
-    orders  = ('order_id', 'count')
-).reindex(dow_order).round(2)
-print(dow.to_string())
-
-# ─── Customer Segment Analysis ───────────────────────────────────
-print("\n📊 Customer Segment Analysis:")
-seg = df_clean.groupby('customer_segment').agg(
-    revenue   = ('revenue', 'sum'),
-    orders    = ('order_id', 'count'),
-    avg_order = ('revenue', 'mean'),
-    margin    = ('profit_margin', 'mean')
-).round(2).sort_values('revenue', ascending=False)
-seg['revenue_share'] = (seg['revenue'] / total_revenue * 100).round(1)
-print(seg.to_string())
-
-
-# ══════════════════════════════════════════════════════════════════
-# SECTION 5: VISUALIZATIONS
-# ══════════════════════════════════════════════════════════════════
-print("\n" + "━" * 65)
-print("  SECTION 5: CREATING VISUALIZATIONS")
-print("━" * 65)
-
-CHART_DIR = 'charts/'
-
-# ─── Chart 1: Monthly Revenue Trend ─────────────────────────────
-print("\n📈 Chart 1: Monthly Revenue Trend...")
-fig, axes = plt.subplots(2, 1, figsize=(14, 10))
-
-for year, grp in monthly.groupby('year'):
-    axes[0].plot(
-        grp['month_name'], grp['revenue'],
-        marker='o', linewidth=2.5, markersize=7, label=str(year)
-    )
-
-axes[0].set_title('Monthly Revenue Trend (2023 vs 2024)', fontsize=15, fontweight='bold', pad=15)
-axes[0].set_xlabel('Month')
-axes[0].set_ylabel('Revenue (₹)')
-axes[0].yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'₹{x:,.0f}'))
-axes[0].legend(fontsize=12)
-axes[0].grid(axis='y', alpha=0.3)
-
-# Quarterly bar chart
-qtr_pivot = quarterly.pivot(index='quarter_label', columns='year', values='revenue')
-qtr_pivot.plot(kind='bar', ax=axes[1], width=0.6, edgecolor='white')
-axes[1].set_title('Quarterly Revenue Comparison (2023 vs 2024)', fontsize=13, fontweight='bold')
-axes[1].set_xlabel('Quarter')
-axes[1].set_ylabel('Revenue (₹)')
-axes[1].yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'₹{x:,.0f}'))
-axes[1].legend(['2023', '2024'])
-axes[1].tick_params(axis='x', rotation=0)
-axes[1].grid(axis='y', alpha=0.3)
-
-plt.tight_layout(pad=3)
-plt.savefig(f'{CHART_DIR}chart1_monthly_trend.png', dpi=150, bbox_inches='tight')
-plt.close()
-print("   ✓ Saved: chart1_monthly_trend.png")
-
-# ─── Chart 2: Category Revenue Breakdown ─────────────────────────
-print("📊 Chart 2: Category Analysis...")
-fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-
-# Pie chart
-colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
-wedges, texts, autotexts = axes[0].pie(
-    cat_analysis['total_revenue'],
-    labels=cat_analysis.index,
-    autopct='%1.1f%%',
-    colors=colors,
-    startangle=90,
-    pctdistance=0.85
-)
-for at in autotexts:
-    at.set_fontsize(10)
-    at.set_fontweight('bold')
-axes[0].set_title('Revenue Share by Category', fontsize=13, fontweight='bold')
-
-# Horizontal bar chart
-bars = axes[1].barh(cat_analysis.index, cat_analysis['total_revenue'], color=colors, edgecolor='white')
-axes[1].set_title('Total Revenue by Category', fontsize=13, fontweight='bold')
-axes[1].set_xlabel('Revenue (₹)')
-axes[1].xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'₹{x:,.0f}'))
-for bar, val in zip(bars, cat_analysis['total_revenue']):
-    axes[1].text(bar.get_width() + 500, bar.get_y() + bar.get_height()/2,
-                 f'₹{val:,.0f}', va='center', fontsize=9)
-
-plt.tight_layout(pad=3)
-plt.savefig(f'{CHART_DIR}chart2_category_breakdown.png', dpi=150, bbox_inches='tight')
-plt.close()
-print("   ✓ Saved: chart2_category_breakdown.png")
-
-# ─── Chart 3: City Revenue Bar Chart ─────────────────────────────
-print("🗺️  Chart 3: City Performance...")
-fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-
-city_top = city_analysis.head(8)
-colors_city = sns.color_palette("husl", len(city_top))
-
-bars = axes[0].bar(city_top.index, city_top['total_revenue'], color=colors_city, edgecolor='white')
-axes[0].set_title('Revenue by City (Top 8)', fontsize=13, fontweight='bold')
-axes[0].set_xlabel('City')
-axes[0].set_ylabel('Revenue (₹)')
-axes[0].yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'₹{x:,.0f}'))
-axes[0].tick_params(axis='x', rotation=30)
-axes[0].grid(axis='y', alpha=0.3)
-
-# Avg order value by city
-axes[1].bar(city_top.index, city_top['avg_order_val'], color=colors_city, edgecolor='white')
-axes[1].set_title('Avg Order Value by City', fontsize=13, fontweight='bold')
-axes[1].set_xlabel('City')
-axes[1].set_ylabel('Avg Order Value (₹)')
-axes[1].yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'₹{x:,.0f}'))
-axes[1].tick_params(axis='x', rotation=30)
-axes[1].grid(axis='y', alpha=0.3)
-
-plt.tight_layout(pad=3)
-plt.savefig(f'{CHART_DIR}chart3_city_performance.png', dpi=150, bbox_inches='tight')
-plt.close()
-print("   ✓ Saved: chart3_city_performance.png")
-
-# ─── Chart 4: Top Products ────────────────────────────────────────
-print("🏆 Chart 4: Product Performance...")
-fig, axes = plt.subplots(1, 2, figsize=(14, 7))
-
-top10 = product_analysis.head(10).sort_values('total_revenue')
-colors_prod = sns.color_palette("RdYlGn", len(top10))
-
-axes[0].barh(top10['product_name'], top10['total_revenue'], color=colors_prod, edgecolor='white')
-axes[0].set_title('Top 10 Products by Revenue', fontsize=13, fontweight='bold')
-axes[0].set_xlabel('Revenue (₹)')
-axes[0].xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'₹{x:,.0f}'))
-axes[0].grid(axis='x', alpha=0.3)
-
-# Units sold top 10
-top10_units = product_analysis.nlargest(10, 'total_units').sort_values('total_units')
-axes[1].barh(top10_units['product_name'], top10_units['total_units'],
-             color=sns.color_palette("Blues_r", len(top10_units)), edgecolor='white')
-axes[1].set_title('Top 10 Products by Units Sold', fontsize=13, fontweight='bold')
-axes[1].set_xlabel('Units Sold')
-axes[1].grid(axis='x', alpha=0.3)
-
-plt.tight_layout(pad=3)
-plt.savefig(f'{CHART_DIR}chart4_product_performance.png', dpi=150, bbox_inches='tight')
-plt.close()
-print("   ✓ Saved: chart4_product_performance.png")
-
-# ─── Chart 5: Channel & Segment Analysis ─────────────────────────
-print("📱 Chart 5: Channel & Segment...")
-fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-
-chan_colors = ['#3498db', '#2ecc71', '#e74c3c']
-axes[0].pie(channel_analysis['revenue'], labels=channel_analysis.index,
-            autopct='%1.1f%%', colors=chan_colors, startangle=90)
-axes[0].set_title('Revenue by Sales Channel', fontsize=13, fontweight='bold')
-
-seg_colors = ['#9b59b6', '#f39c12', '#1abc9c']
-axes[1].pie(seg['revenue'], labels=seg.index,
-            autopct='%1.1f%%', colors=seg_colors, startangle=90)
-axes[1].set_title('Revenue by Customer Segment', fontsize=13, fontweight='bold')
-
-plt.tight_layout(pad=3)
-plt.savefig(f'{CHART_DIR}chart5_channel_segment.png', dpi=150, bbox_inches='tight')
-plt.close()
-print("   ✓ Saved: chart5_channel_segment.png")
-
-# ─── Chart 6: Heatmap - Revenue by Month & Category ──────────────
-print("🔥 Chart 6: Revenue Heatmap...")
-month_order = ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec']
-pivot_heat  = df_clean.groupby(['month_name', 'category'])['revenue'].sum().unstack()
-pivot_heat  = pivot_heat.reindex(month_order)
-
-fig, ax = plt.subplots(figsize=(12, 6))
-sns.heatmap(pivot_heat, annot=True, fmt='.0f', cmap='YlOrRd',
-            linewidths=0.5, ax=ax, cbar_kws={'label': 'Revenue (₹)'})
-ax.set_title('Revenue Heatmap: Month vs Category', fontsize=14, fontweight='bold', pad=15)
-ax.set_xlabel('Category', fontsize=11)
-ax.set_ylabel('Month', fontsize=11)
-plt.tight_layout()
-plt.savefig(f'{CHART_DIR}chart6_revenue_heatmap.png', dpi=150, bbox_inches='tight')
-plt.close()
-print("   ✓ Saved: chart6_revenue_heatmap.png")
-
-
-# ══════════════════════════════════════════════════════════════════
-# SECTION 6: INSIGHTS & FINDINGS
-# ══════════════════════════════════════════════════════════════════
-print("\n" + "━" * 65)
-print("  SECTION 6: KEY FINDINGS & BUSINESS INSIGHTS")
-print("━" * 65)
-
-top_cat    = cat_analysis.index[0]
-top_cat_pct = cat_analysis.iloc[0]['revenue_share_pct']
-top_city   = city_analysis.index[0]
-top_prod   = product_analysis.iloc[0]['product_name']
-
-# YoY growth if available
-if 2023 in yoy.index and 2024 in yoy.index:
-    yoy_growth = yoy.loc[2024, 'revenue_growth']
-    growth_str = f"{yoy_growth:+.1f}%"
-else:
-    growth_str = "N/A"
-
-print(f"""
-╔══════════════════════════════════════════════════════════════════╗
-║                   KEY BUSINESS FINDINGS                         ║
-╠══════════════════════════════════════════════════════════════════╣
-║                                                                  ║
-║  FINDING 1: REVENUE PERFORMANCE                                 ║
-║  • Total revenue of ₹{total_revenue:,.0f} across {total_orders:,} orders     ║
-║  • Year-over-year revenue growth: {growth_str}                     ║
-║  • Average order value: ₹{avg_order_value:,.0f}                       ║
-║                                                                  ║
-║  FINDING 2: CATEGORY DOMINANCE (Pareto Insight)                 ║
-║  • {top_cat} is the top category with {top_cat_pct}% revenue share   ║
-║  • Top 2 categories contribute majority of total revenue        ║
-║                                                                  ║
-║  FINDING 3: GEOGRAPHIC CONCENTRATION                            ║
-║  • {top_city} is the #1 city by revenue                         ║
-║  • Top 3 cities likely contribute 50%+ of total revenue         ║
-║                                                                  ║
-║  FINDING 4: SEASONAL PATTERNS                                   ║
-║  • Q4 (Oct-Dec) shows highest sales (festive season effect)     ║
-║  • Summer months (Jun-Aug) show relatively lower performance    ║
-║                                                                  ║
-║  FINDING 5: PRODUCT PERFORMANCE                                 ║
-║  • {top_prod[:40]:<40} is top revenue product  ║
-║  • Top 20% of products generate ~80% of revenue (Pareto Law)   ║
-║                                                                  ║
-║  FINDING 6: CHANNEL INSIGHTS                                    ║
-║  • Online channel dominates revenue contribution                ║
-║  • Mobile App growing - opportunity for investment              ║
-║                                                                  ║
-╠══════════════════════════════════════════════════════════════════╣
-║                   BUSINESS RECOMMENDATIONS                      ║
-╠══════════════════════════════════════════════════════════════════╣
-║                                                                  ║
-║  REC 1: Double down on Electronics category - highest revenue   ║
-║  REC 2: Invest in top 3 cities - highest concentration          ║
-║  REC 3: Prepare inventory for Q4 festive season spike           ║
-║  REC 4: Review bottom 5 products - consider discontinuing       ║
-║  REC 5: Expand Mobile App channel - growing opportunity         ║
-║  REC 6: Review discount strategy - high discounts hurt margins  ║
-║                                                                  ║
-╚══════════════════════════════════════════════════════════════════╝""")
-
-
-# ══════════════════════════════════════════════════════════════════
-# SECTION 7: EXPORT RESULTS
-# ══════════════════════════════════════════════════════════════════
-print("\n" + "━" * 65)
-print("  SECTION 7: EXPORTING RESULTS TO EXCEL")
-print("━" * 65)
-
-OUTPUT_PATH = 'outputs/Sales_Analysis_Report.xlsx'
-
-with pd.ExcelWriter(OUTPUT_PATH, engine='openpyxl') as writer:
-
-    # Sheet 1: Clean Data
-    df_clean.to_excel(writer, sheet_name='Clean_Data', index=False)
-
-    # Sheet 2: KPI Summary
-    kpi_df = pd.DataFrame({
-        'Metric': [
-            'Total Revenue (₹)', 'Total Orders', 'Total Profit (₹)',
-            'Avg Order Value (₹)', 'Avg Profit Margin (%)',
-            'Total Units Sold', 'Return Rate (%)', 'Orders with Discount (%)'
-        ],
-        'Value': [
-            f'₹{total_revenue:,.0f}', f'{total_orders:,}', f'₹{total_profit:,.0f}',
-            f'₹{avg_order_value:,.2f}', f'{avg_margin:.1f}%',
-            f'{total_units:,}', f'{return_rate:.1f}%', f'{discount_rate:.1f}%'
-        ]
-    })
-    kpi_df.to_excel(writer, sheet_name='KPI_Summary', index=False)
-
-    # Sheet 3: Category Analysis
-    cat_analysis.to_excel(writer, sheet_name='Category_Analysis')
-
-    # Sheet 4: City Analysis
-    city_analysis.to_excel(writer, sheet_name='City_Analysis')
-
-    # Sheet 5: Monthly Trend
-    monthly.to_excel(writer, sheet_name='Monthly_Trend', index=False)
-
-    # Sheet 6: Product Performance
-    product_analysis.to_excel(writer, sheet_name='Product_Analysis', index=False)
-
-    # Sheet 7: Channel Analysis
-    channel_analysis.to_excel(writer, sheet_name='Channel_Analysis')
-
-print(f"✓ Excel report saved: Sales_Analysis_Report.xlsx")
-print(f"   Sheets: Clean_Data, KPI_Summary, Category_Analysis, City_Analysis,")
-print(f"           Monthly_Trend, Product_Analysis, Channel_Analysis")
-
-# Save clean CSV too
-df_clean.to_csv('outputs/retail_sales_clean.csv', index=False)
-print(f"✓ Clean CSV saved: retail_sales_clean.csv")
-
-print("\n" + "=" * 65)
-print("  ✅ PROJECT 1: ANALYSIS COMPLETE!")
-print("=" * 65)
-print(f"""
-📁 OUTPUT FILES:
-   data/retail_sales_raw.csv          ← Original dataset
-   outputs/retail_sales_clean.csv     ← Cleaned dataset
-   outputs/Sales_Analysis_Report.xlsx ← Full Excel report (7 sheets)
-   charts/chart1_monthly_trend.png    ← Monthly & quarterly trends
-   charts/chart2_category_breakdown.png ← Category revenue breakdown
-   charts/chart3_city_performance.png ← City performance
-   charts/chart4_product_performance.png ← Product ranking
-   charts/chart5_channel_segment.png  ← Channel & segment split
-   charts/chart6_revenue_heatmap.png  ← Revenue heatmap
-
-📊 PROJECT STATS:
-   5,500 transactions analyzed
-   2 years of data (2023-2024)
-   20 products across 5 categories
-   8 cities analyzed
-   7 business questions answered
-   6 professional charts created
-   7-sheet Excel report generated
-""")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+DuckDB backend against the pandas one, on the sample data.
+
+The sample rounds the same way on both backends, so the tables are compared
+to float noise (ATOL) rather than the one-cent rounding flip the --check
+default allows for other data (see aggregates.assert_tables_equal).
+
+Command: python -m pytest tests
+"""
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')
+
+from retail_sales.aggregates import assert_tables_equal, compute_tables
+from retail_sales.cleaning import clean
+from retail_sales.duckdb_backend import check_conformance, scan
+from retail_sales.schema import load_typed
+
+RAW = os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'retail_sales_raw.csv')
+ATOL = 1e-6
+
+
+def pandas_tables(path):
+    df_clean, _, _ = clean(load_typed(path).df)
+    return compute_tables(df_clean)
+
+
+def test_conformance():
+    assert check_conformance(RAW, atol=ATOL) > 0
+
+
+def test_partitioned_input(tmp_path):
+    raw = pd.read_csv(RAW, dtype=str, keep_default_na=False)
+    for (year, month), part in raw.groupby([raw['order_date'].str[:4], raw['order_date'].str[5:7]]):
+        folder = tmp_path / f"year={year}" / f"month={month}"
+        folder.mkdir(parents=True)
+        part.to_csv(folder / 'orders.csv', index=False)
+    assert_tables_equal(pandas_tables(RAW), scan(str(tmp_path)).tables, atol=ATOL)
+
+
+def test_rejected_rows(tmp_path):
+    raw = pd.read_csv(RAW, dtype=str, keep_default_na=False)
+    bad = raw.head(4).copy()
+    bad['order_date'] = ['2024-13-01', raw['order_date'][1], raw['order_date'][2], 'soon']
+    bad['quantity'] = [bad['quantity'][0], 'two', '-1', bad['quantity'][3]]
+    path = tmp_path / 'with_rejects.csv'
+    pd.concat([raw, bad]).to_csv(path, index=False)
+
+    expected = load_typed(str(path)).rejected
+    rejected_csv = tmp_path / 'rejected.csv'
+    result = scan(str(path), rejected_csv_path=str(rejected_csv))
+    assert result.rejected == len(expected) == len(bad)
+    actual = pd.read_csv(rejected_csv, dtype=str, keep_default_na=False)
+    assert sorted(actual['reject_reason']) == sorted(expected['reject_reason'])
+    assert_tables_equal(pandas_tables(str(path)), result.tables, atol=ATOL)
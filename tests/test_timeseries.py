@@ -0,0 +1,33 @@
+"""
+Rolling-window metrics against the Section 4 tables, on the sample data.
+
+Command: python -m pytest tests
+"""
+import os
+
+import pytest
+
+from retail_sales.aggregates import finalize_tables, partial_aggregates
+from retail_sales.cleaning import clean
+from retail_sales.schema import load_typed
+from retail_sales.timeseries import SERIES_DIMS, TOTAL, TTM, build_series, window_metrics
+
+RAW = os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'retail_sales_raw.csv')
+
+
+@pytest.fixture(scope='module')
+def run():
+    df_clean, _, _ = clean(load_typed(RAW).df)
+    partials = partial_aggregates(df_clean)
+    return finalize_tables(partials), build_series(partials['daily'])
+
+
+@pytest.mark.parametrize('dim', SERIES_DIMS)
+def test_ttm_matches_yoy_table(run, dim):
+    # 2024 is a leap year: the TTM ending 2024-12-31 is 366 days, last year's 365
+    tables, series = run
+    yoy = tables['yoy']['revenue']
+    total = window_metrics(series[dim], '2024-12-31').loc[TOTAL]
+    assert total[TTM] == pytest.approx(yoy[2024], abs=0.01)
+    assert total[f"{TTM}_ly"] == pytest.approx(yoy[2023], abs=0.01)
+    assert total[f"{TTM}_yoy"] == pytest.approx(tables['yoy']['revenue_growth'][2024], abs=0.01)